@@ -0,0 +1,36 @@
+"""Add response_body_truncated flag to webhook_history
+
+Revision ID: 007_webhook_response_truncated
+Revises: 006_bdns_document_processing
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '007_webhook_response_truncated'
+down_revision: Union[str, Sequence[str], None] = '006_bdns_document_processing'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add response_body_truncated column to webhook_history table."""
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    columns = [col['name'] for col in inspector.get_columns('webhook_history')]
+
+    if 'response_body_truncated' not in columns:
+        op.add_column(
+            'webhook_history',
+            sa.Column('response_body_truncated', sa.Boolean(), default=False)
+        )
+
+
+def downgrade() -> None:
+    """Remove response_body_truncated column."""
+    op.drop_column('webhook_history', 'response_body_truncated')
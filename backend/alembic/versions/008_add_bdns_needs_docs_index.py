@@ -0,0 +1,46 @@
+"""Add partial index for BDNS grants still missing documents
+
+Revision ID: 008_bdns_needs_docs_index
+Revises: 007_webhook_response_truncated
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '008_bdns_needs_docs_index'
+down_revision: Union[str, Sequence[str], None] = '007_webhook_response_truncated'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create the partial index used by update_existing_bdns_grants.py."""
+    # Only BDNS rows without documents are indexed, so the scan stays small as
+    # the table grows; bdns_code is included so the query is index-only.
+    # CONCURRENTLY can't run inside the migration transaction.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'grants_bdns_needs_docs',
+            'grants',
+            ['id'],
+            postgresql_include=['bdns_code'],
+            postgresql_where=sa.text("source = 'BDNS' AND bdns_documents IS NULL"),
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Drop the partial index."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'grants_bdns_needs_docs',
+            table_name='grants',
+            postgresql_concurrently=True,
+            if_exists=True
+        )
@@ -4,7 +4,7 @@ Grants endpoints - List and filter grants
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import desc, asc
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 from typing import Optional, List, Dict
 from datetime import datetime
 
@@ -59,6 +59,11 @@ class GrantListItem(BaseModel):
         from_attributes = True
 
 
+# Validador compilado una sola vez: valida la página entera de grants en una
+# sola llamada en lugar de un model_validate por fila
+_GRANT_LIST_ADAPTER = TypeAdapter(List[GrantListItem])
+
+
 class GrantDetail(BaseModel):
     """Detalle completo de un grant"""
     id: str
@@ -211,7 +216,7 @@ async def list_grants(
 
     return GrantsListResponse(
         total=total,
-        grants=[GrantListItem.model_validate(g) for g in grants]
+        grants=_GRANT_LIST_ADAPTER.validate_python(grants)
     )
 
 
@@ -246,7 +251,7 @@ async def get_open_bdns_grants(
 
     return {
         "total": len(grants),
-        "grants": [GrantListItem.model_validate(g) for g in grants]
+        "grants": _GRANT_LIST_ADAPTER.validate_python(grants)
     }
 
 
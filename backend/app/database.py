@@ -1,17 +1,29 @@
 """
 Database connection and session management
 """
+import msgspec
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.config import settings
 
+_json_encoder = msgspec.json.Encoder()
+
+
+def _json_serializer(value) -> str:
+    """Encode JSON column values with msgspec (C) instead of the stdlib json module"""
+    return _json_encoder.encode(value).decode()
+
+
 # Create engine
 engine = create_engine(
     settings.database_url,
     echo=settings.db_echo,
     pool_pre_ping=True,
     pool_size=5,
-    max_overflow=10
+    max_overflow=10,
+    # JSON columns (bdns_documents, cpv_codes, regions...)
+    json_serializer=_json_serializer,
+    json_deserializer=msgspec.json.decode
 )
 
 # Session factory
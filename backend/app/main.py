@@ -7,6 +7,7 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from prometheus_client import make_asgi_app
 
 from app.config import settings
 from app.api.v1 import api_router
@@ -56,6 +57,9 @@ app.add_middleware(
 # Include API router
 app.include_router(api_router, prefix=settings.api_v1_prefix)
 
+# Prometheus metrics (webhook delivery counters)
+app.mount("/metrics", make_asgi_app())
+
 
 @app.get("/")
 async def root():
@@ -2,7 +2,7 @@
 Grant SQLAlchemy model - Complete fields for BOE and BDNS
 """
 from datetime import datetime
-from sqlalchemy import Column, String, Float, Boolean, DateTime, Integer, Text, JSON
+from sqlalchemy import Column, String, Float, Boolean, DateTime, Integer, Text, JSON, Index, text
 from sqlalchemy.sql import func
 
 from app.database import Base
@@ -11,6 +11,14 @@ from app.database import Base
 class Grant(Base):
     """Grant model with complete BOE and BDNS fields"""
     __tablename__ = "grants"
+    __table_args__ = (
+        # BDNS grants still waiting for their documents (update_existing_bdns_grants.py)
+        Index(
+            "grants_bdns_needs_docs", "id",
+            postgresql_include=["bdns_code"],
+            postgresql_where=text("source = 'BDNS' AND bdns_documents IS NULL")
+        ),
+    )
 
     # Primary key
     id = Column(String, primary_key=True, index=True)  # BOE-A-XXXX or BDNS-XXXX
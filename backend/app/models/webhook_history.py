@@ -2,7 +2,7 @@
 Webhook History model - Track all webhook delivery attempts
 """
 from datetime import datetime
-from sqlalchemy import Column, String, Boolean, DateTime, Integer, Text, JSON, Float
+from sqlalchemy import Column, String, Boolean, DateTime, Integer, Text, JSON, Float, inspect
 from sqlalchemy.sql import func
 
 from app.database import Base
@@ -33,6 +33,7 @@ class WebhookHistory(Base):
 
     # Response data
     response_body = Column(JSON, nullable=True)
+    response_body_truncated = Column(Boolean, default=False)
     error_message = Column(Text, nullable=True)
     error_type = Column(String, nullable=True)
 
@@ -47,8 +48,14 @@ class WebhookHistory(Base):
         return f"<WebhookHistory {self.id}: {self.grant_id} - {self.status}>"
 
     def to_dict(self):
-        """Convert to dictionary for JSON serialization"""
-        return {
+        """
+        Convert to dictionary for JSON serialization
+
+        response_body is left out when it wasn't loaded (deferred, e.g. by
+        get_webhook_history), so serializing a list of rows never issues one
+        lazy SELECT per row.
+        """
+        data = {
             "id": self.id,
             "grant_id": self.grant_id,
             "attempt_number": self.attempt_number,
@@ -58,9 +65,13 @@ class WebhookHistory(Base):
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "sent_at": self.sent_at.isoformat() if self.sent_at else None,
             "next_retry_at": self.next_retry_at.isoformat() if self.next_retry_at else None,
-            "response_body": self.response_body,
+            "response_body_truncated": self.response_body_truncated,
             "error_message": self.error_message,
             "error_type": self.error_type,
             "webhook_url": self.webhook_url,
             "response_time_ms": self.response_time_ms
         }
+        state = inspect(self)
+        if not (state.has_identity and "response_body" in state.unloaded):
+            data["response_body"] = self.response_body
+        return data
@@ -253,40 +253,15 @@ class BDNSService:
         import logging
         logger = logging.getLogger(__name__)
 
-        # Helper function to parse dates in multiple formats
-        def parse_bdns_date(date_str: str, field_name: str):
-            if not date_str:
-                return None
-
-            # Try multiple date formats
-            formats = [
-                "%Y-%m-%d",     # YYYY-MM-DD (ISO format)
-                "%d/%m/%Y",     # DD/MM/YYYY (Spanish format)
-                "%Y-%m-%dT%H:%M:%S",  # ISO with time
-                "%Y-%m-%d %H:%M:%S"   # SQL datetime format
-            ]
-
-            for fmt in formats:
-                try:
-                    result = datetime.strptime(date_str, fmt).date()
-                    logger.debug(f"✅ Parsed {field_name}: {date_str} → {result} using format {fmt}")
-                    return result
-                except ValueError:
-                    continue
-
-            # If no format worked, log the error
-            logger.warning(f"⚠️ Could not parse {field_name}: '{date_str}' - tried formats: {formats}")
-            return None
-
-        # Parse dates with debug logging
-        logger.info(f"📅 Parsing dates for BDNS-{detail.codigoBDNS}")
-        logger.debug(f"   Raw fechaRecepcion: {detail.fechaRecepcion}")
-        logger.debug(f"   Raw fechaInicioSolicitud: {detail.fechaInicioSolicitud}")
-        logger.debug(f"   Raw fechaFinSolicitud: {detail.fechaFinSolicitud}")
+        # Las fechas ya llegan parseadas como date desde BDNSConvocatoriaDetail
+        logger.info(f"📅 Dates for BDNS-{detail.codigoBDNS}")
+        logger.debug(f"   fechaRecepcion: {detail.fechaRecepcion}")
+        logger.debug(f"   fechaInicioSolicitud: {detail.fechaInicioSolicitud}")
+        logger.debug(f"   fechaFinSolicitud: {detail.fechaFinSolicitud}")
 
-        publication_date = parse_bdns_date(detail.fechaRecepcion, "fechaRecepcion")
-        application_start_date = parse_bdns_date(detail.fechaInicioSolicitud, "fechaInicioSolicitud")
-        application_end_date = parse_bdns_date(detail.fechaFinSolicitud, "fechaFinSolicitud")
+        publication_date = detail.fechaRecepcion
+        application_start_date = detail.fechaInicioSolicitud
+        application_end_date = detail.fechaFinSolicitud
 
         # Extract organ information
         department = None
@@ -404,32 +379,9 @@ class BDNSService:
         import logging
         logger = logging.getLogger(__name__)
 
-        # Use the same date parsing logic as _create_grant
-        def parse_bdns_date(date_str: str, field_name: str):
-            if not date_str:
-                return None
-
-            formats = [
-                "%Y-%m-%d",     # YYYY-MM-DD (ISO format)
-                "%d/%m/%Y",     # DD/MM/YYYY (Spanish format)
-                "%Y-%m-%dT%H:%M:%S",  # ISO with time
-                "%Y-%m-%d %H:%M:%S"   # SQL datetime format
-            ]
-
-            for fmt in formats:
-                try:
-                    result = datetime.strptime(date_str, fmt).date()
-                    logger.debug(f"✅ Parsed {field_name}: {date_str} → {result} using format {fmt}")
-                    return result
-                except ValueError:
-                    continue
-
-            logger.warning(f"⚠️ Could not parse {field_name}: '{date_str}'")
-            return None
-
-        # Parse dates
-        application_start_date = parse_bdns_date(detail.fechaInicioSolicitud, "fechaInicioSolicitud")
-        application_end_date = parse_bdns_date(detail.fechaFinSolicitud, "fechaFinSolicitud")
+        # Las fechas ya llegan parseadas como date desde BDNSConvocatoriaDetail
+        application_start_date = detail.fechaInicioSolicitud
+        application_end_date = detail.fechaFinSolicitud
 
         # Extract organ information
         department = None
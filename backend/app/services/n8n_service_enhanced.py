@@ -1,13 +1,15 @@
 """
 Enhanced N8n Service with retry logic, exponential backoff, and webhook history tracking
 """
+import json
 import time
 import httpx
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List
-from sqlalchemy.orm import Session
+from typing import Optional, Dict, Any, List, Tuple
+from sqlalchemy.orm import Session, defer
 from sqlalchemy import func
 import logging
+from prometheus_client import Counter, Histogram, REGISTRY
 
 from app.models import Grant
 from app.models.webhook_history import WebhookHistory
@@ -16,6 +18,46 @@ from app.config import get_settings
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+# Process-wide delivery metrics, exposed on /metrics
+WEBHOOK_SENT = Counter(
+    "n8n_webhook",
+    "N8n webhook delivery attempts by outcome",
+    ["status"]
+)
+WEBHOOK_LATENCY = Histogram(
+    "n8n_webhook_ms",
+    "N8n webhook response time in milliseconds",
+    buckets=(50, 100, 250, 500, 1000, 2500, 5000)
+)
+WEBHOOK_STATUSES = ("success", "retrying", "failed")
+
+# Maximum number of response bytes persisted to webhook_history.response_body
+RESPONSE_BODY_MAX_BYTES = 4096
+
+
+def _capped_response_body(response: httpx.Response) -> Tuple[Optional[Any], bool]:
+    """
+    Build the value stored in webhook_history.response_body
+
+    Bodies larger than RESPONSE_BODY_MAX_BYTES are cut and stored as text so
+    that verbose n8n debug responses don't bloat the history table.
+
+    Returns:
+        Tuple of (response body, truncated flag)
+    """
+    content = response.content
+    if not content:
+        return None, False
+
+    if len(content) > RESPONSE_BODY_MAX_BYTES:
+        text = content[:RESPONSE_BODY_MAX_BYTES].decode("utf-8", "replace")
+        return {"_truncated": text}, True
+
+    try:
+        return json.loads(content), False
+    except ValueError:
+        return {"_text": content.decode("utf-8", "replace")}, False
+
 
 class N8nServiceEnhanced:
     """Enhanced service for sending grants to N8n Cloud with retry logic"""
@@ -43,7 +85,8 @@ class N8nServiceEnhanced:
     async def send_grant_with_retry(
         self,
         grant_id: str,
-        max_retries: Optional[int] = None
+        max_retries: Optional[int] = None,
+        payload: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         Send grant to N8n with retry logic and exponential backoff
@@ -51,6 +94,8 @@ class N8nServiceEnhanced:
         Args:
             grant_id: ID of grant to send
             max_retries: Override default max retries
+            payload: Previously built payload (e.g. from webhook history) to
+                reuse instead of rebuilding it from the grant
 
         Returns:
             Dict with send result
@@ -65,7 +110,11 @@ class N8nServiceEnhanced:
                 "error": f"Grant {grant_id} not found"
             }
 
-        payload = grant.to_n8n_payload()
+        if payload is None:
+            payload = grant.to_n8n_payload()
+
+        webhook_url = self.webhook_url
+        sleep = asyncio.sleep
 
         # Create initial webhook history record
         history = WebhookHistory(
@@ -73,7 +122,7 @@ class N8nServiceEnhanced:
             attempt_number=1,
             max_retries=max_retries,
             status='pending',
-            webhook_url=self.webhook_url,
+            webhook_url=webhook_url,
             payload=payload
         )
         self.db.add(history)
@@ -82,16 +131,16 @@ class N8nServiceEnhanced:
         # Attempt to send with retries
         for attempt in range(1, max_retries + 1):
             try:
-                start_time = time.time()
+                start_ns = time.perf_counter_ns()
 
                 async with httpx.AsyncClient(timeout=30.0) as client:
                     response = await client.post(
-                        self.webhook_url,
+                        webhook_url,
                         json=payload,
                         headers={"Content-Type": "application/json"}
                     )
 
-                    response_time_ms = (time.time() - start_time) * 1000
+                    response_time_ms = (time.perf_counter_ns() - start_ns) / 1_000_000
 
                     response.raise_for_status()
 
@@ -102,9 +151,11 @@ class N8nServiceEnhanced:
 
                     # Update history
                     history.status = 'success'
+                    WEBHOOK_SENT.labels('success').inc()
+                    WEBHOOK_LATENCY.observe(response_time_ms)
                     history.http_status_code = response.status_code
                     history.sent_at = datetime.now()
-                    history.response_body = response.json() if response.text else None
+                    history.response_body, history.response_body_truncated = _capped_response_body(response)
                     history.response_time_ms = response_time_ms
                     self.db.commit()
 
@@ -132,15 +183,17 @@ class N8nServiceEnhanced:
                 if attempt < max_retries and e.response.status_code >= 500:
                     # Server error, retry
                     history.status = 'retrying'
+                    WEBHOOK_SENT.labels('retrying').inc()
                     history.next_retry_at = self._calculate_next_retry_at(attempt)
                     self.db.commit()
 
                     delay = self._calculate_retry_delay(attempt)
                     logger.info(f"⏳ Retrying grant {grant_id} in {delay}s...")
-                    await asyncio.sleep(delay)
+                    await sleep(delay)
                 else:
                     # Client error or max retries reached
                     history.status = 'failed'
+                    WEBHOOK_SENT.labels('failed').inc()
                     self.db.commit()
 
                     return {
@@ -163,14 +216,16 @@ class N8nServiceEnhanced:
 
                 if attempt < max_retries:
                     history.status = 'retrying'
+                    WEBHOOK_SENT.labels('retrying').inc()
                     history.next_retry_at = self._calculate_next_retry_at(attempt)
                     self.db.commit()
 
                     delay = self._calculate_retry_delay(attempt)
                     logger.info(f"⏳ Retrying grant {grant_id} in {delay}s...")
-                    await asyncio.sleep(delay)
+                    await sleep(delay)
                 else:
                     history.status = 'failed'
+                    WEBHOOK_SENT.labels('failed').inc()
                     self.db.commit()
 
                     return {
@@ -187,6 +242,7 @@ class N8nServiceEnhanced:
 
                 history.attempt_number = attempt
                 history.status = 'failed'
+                WEBHOOK_SENT.labels('failed').inc()
                 history.error_message = str(e)
                 history.error_type = 'unexpected_error'
                 self.db.commit()
@@ -272,9 +328,11 @@ class N8nServiceEnhanced:
         }
 
         for history in pending_retries:
+            # Reuse the payload persisted with the original attempt
             result = await self.send_grant_with_retry(
                 history.grant_id,
-                max_retries=history.max_retries
+                max_retries=history.max_retries,
+                payload=history.payload
             )
 
             if result["success"]:
@@ -290,6 +348,9 @@ class N8nServiceEnhanced:
         """
         Get webhook queue statistics
 
+        Aggregates the full webhook_history table; for a cheap live view use
+        get_webhook_metrics.
+
         Returns:
             Dict with statistics
         """
@@ -329,11 +390,34 @@ class N8nServiceEnhanced:
             "avg_response_time_ms": float(avg_response_time)
         }
 
+    def get_webhook_metrics(self) -> Dict[str, Any]:
+        """
+        Get in-process webhook counters
+
+        Unlike get_webhook_stats this doesn't touch the database; counts cover
+        attempts made by this process since it started.
+
+        Returns:
+            Dict with per-status counts and average response time
+        """
+        counts = {
+            status: int(REGISTRY.get_sample_value("n8n_webhook_total", {"status": status}) or 0)
+            for status in WEBHOOK_STATUSES
+        }
+        latency_sum = REGISTRY.get_sample_value("n8n_webhook_ms_sum") or 0
+        latency_count = REGISTRY.get_sample_value("n8n_webhook_ms_count") or 0
+
+        return {
+            **counts,
+            "avg_response_time_ms": (latency_sum / latency_count) if latency_count else 0
+        }
+
     def get_webhook_history(
         self,
         grant_id: Optional[str] = None,
         status: Optional[str] = None,
-        limit: int = 50
+        limit: int = 50,
+        include_bodies: bool = False
     ) -> List[WebhookHistory]:
         """
         Get webhook history
@@ -342,12 +426,21 @@ class N8nServiceEnhanced:
             grant_id: Filter by grant ID
             status: Filter by status
             limit: Maximum results
+            include_bodies: Also load the JSON payload/response_body columns
+                (otherwise to_dict() leaves response_body out)
 
         Returns:
             List of webhook history records
         """
         query = self.db.query(WebhookHistory)
 
+        if not include_bodies:
+            # The JSON columns dominate row size; only load them on demand
+            query = query.options(
+                defer(WebhookHistory.payload),
+                defer(WebhookHistory.response_body)
+            )
+
         if grant_id:
             query = query.filter(WebhookHistory.grant_id == grant_id)
 
@@ -11,12 +11,33 @@ import os
 import sys
 import re
 import json
+import shutil
+import asyncio
+import httpx
 import requests
 import logging
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, date
 import tempfile
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from itertools import islice
 from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# RE2 (google-re2) es opcional: motor de tiempo lineal, sin retroceso
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+# zstandard es opcional: sin él, la caché de texto se comprime con gzip
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+    import gzip
 
 
 # Configurar logging
@@ -26,10 +47,142 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+_MONTHS = r'(?:enero|febrero|marzo|abril|mayo|junio|julio|agosto|septiembre|octubre|noviembre|diciembre)'
+
+# Cabeceras comunes de las descargas (requests.Session y httpx.AsyncClient)
+_HTTP_HEADERS = {
+    'User-Agent': 'BOE-PDF-Processor/1.0',
+    'Accept-Encoding': 'gzip, deflate'
+}
+
+# Reintentos de las descargas (Retry de la sesión y _download_pdf_async):
+# espera _DOWNLOAD_BACKOFF * 2**intento entre reintentos
+_DOWNLOAD_RETRIES = 3
+_DOWNLOAD_BACKOFF = 0.5
+
+
+def _compile_pattern(pattern: str):
+    """
+    Compila un patrón de extracción (con RE2 si está instalado)
+    
+    Sin IGNORECASE: los patrones están en minúsculas y se buscan sobre el
+    texto ya en minúsculas, así el motor no compara plegando mayúsculas
+    carácter a carácter.
+    """
+    if re2 is not None:
+        return re2.compile(pattern)
+    return re.compile(pattern)
+
+
+_TEXT_CACHE_SUFFIX = '.txt.zst' if zstandard is not None else '.txt.gz'
+
+
+def _compress_text(text: str) -> bytes:
+    data = text.encode('utf-8')
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=6).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _decompress_text(data: bytes) -> str:
+    if zstandard is not None:
+        return zstandard.ZstdDecompressor().decompress(data).decode('utf-8')
+    return gzip.decompress(data).decode('utf-8')
+
+
+def _write_file_atomic(path: Path, data: bytes):
+    """Escribe en un temporal y renombra: nadie ve nunca el fichero a medias"""
+    fd, partial = tempfile.mkstemp(dir=path.parent, suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(partial, path)
+    except BaseException:
+        os.unlink(partial)
+        raise
+
+
+class _KeywordAlternation:
+    """
+    Patrones sin grupos (palabras clave) fusionados en una sola alternancia
+    
+    Una pasada por el texto en lugar de una por patrón. Solo vale para
+    patrones que no pueden solaparse entre sí: cada coincidencia se asigna al
+    patrón que la produjo, y en findall_each cada patrón ve las mismas
+    coincidencias que vería con su propio findall.
+    """
+    
+    def __init__(self, patterns: List[str]):
+        self.size = len(patterns)
+        self.regex = _compile_pattern('|'.join(f'({pattern})' for pattern in patterns))
+    
+    def findall_each(self, text: str, source: str, limit: int) -> List[List[str]]:
+        """findall de cada patrón original, en el orden de declaración (ver _findall_each)"""
+        found: List[List[str]] = [[] for _ in range(self.size)]
+        pending = self.size
+        for match in self.regex.finditer(text):
+            bucket = found[match.lastindex - 1]
+            if len(bucket) < limit:
+                bucket.append(source[match.start():match.end()])
+                if len(bucket) == limit:
+                    pending -= 1
+                    if not pending:
+                        break
+        return found
+
+
+def _compile_category(patterns: List[str]) -> List[Any]:
+    """
+    Compila los patrones de una categoría; las series consecutivas de
+    patrones sin grupos de captura se fusionan en una _KeywordAlternation
+    """
+    compiled: List[Any] = []
+    keywords: List[str] = []
+    for pattern in patterns + [None]:
+        if pattern is not None and re.compile(pattern).groups == 0:
+            keywords.append(pattern)
+            continue
+        if len(keywords) > 1:
+            compiled.append(_KeywordAlternation(keywords))
+        elif keywords:
+            compiled.append(_compile_pattern(keywords[0]))
+        keywords = []
+        if pattern is not None:
+            compiled.append(_compile_pattern(pattern))
+    return compiled
+
+
+def _findall_each(patterns: List[Any], text: str, source: str, limit: int):
+    """
+    findall(text)[:limit] de cada patrón de una categoría, en orden
+    
+    Busca en text (en minúsculas) pero devuelve los mismos trozos de source,
+    el texto con sus mayúsculas originales y la misma longitud. Deja de
+    recorrer el texto en cuanto cada patrón tiene limit coincidencias.
+    """
+    for pattern in patterns:
+        if isinstance(pattern, _KeywordAlternation):
+            yield from pattern.findall_each(text, source, limit)
+        else:
+            group = 1 if pattern.groups else 0
+            yield [source[match.start(group):match.end(group)]
+                   for match in islice(pattern.finditer(text), limit)]
+
 
 class PDFProcessor:
     """Procesador de PDFs del BOE para extraer información de subvenciones"""
     
+    # Extracción por categoría de self.patterns:
+    # (categoría, clave en el resultado, coincidencias por patrón, longitud mínima,
+    #  recorte (None = sin recortar), conservar mayúsculas del texto original)
+    EXTRACTION_RULES = (
+        ('deadline', 'deadlines', 3, 0, None, False),
+        ('amount', 'amounts', 5, 0, None, True),
+        ('beneficiaries', 'beneficiaries', 3, 11, 200, True),
+        ('requirements', 'requirements', 3, 11, 300, True),
+        ('purpose', 'purposes', 2, 11, 300, True),
+    )
+    
     def __init__(self, download_dir: Optional[str] = None):
         """
         Inicializa el procesador de PDFs
@@ -44,22 +197,35 @@ class PDFProcessor:
             self.download_dir = Path(tempfile.gettempdir()) / "boe_pdfs"
             self.download_dir.mkdir(parents=True, exist_ok=True)
         
+        # Sesión con pool de conexiones: reutiliza las conexiones TCP/TLS con
+        # boe.es entre descargas (process_grant_pdfs descarga en varios hilos)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32,
+                              max_retries=Retry(total=_DOWNLOAD_RETRIES,
+                                                backoff_factor=_DOWNLOAD_BACKOFF))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update(_HTTP_HEADERS)
+        
         # Patrones para extraer información clave
-        self.patterns = {
+        raw_patterns = {
+            # Huecos acotados (.{0,N}?) entre las palabras ancla: con .* el motor
+            # recorre hasta el final del texto (una sola línea tras normalizar)
+            # y retrocede desde allí por cada aparición de la palabra ancla
             'deadline': [
-                r'plazo.*solicitud.*(\d{1,2}.*(?:enero|febrero|marzo|abril|mayo|junio|julio|agosto|septiembre|octubre|noviembre|diciembre).*\d{4})',
-                r'fecha.*límite.*(\d{1,2}/\d{1,2}/\d{4})',
-                r'hasta.*(\d{1,2}.*(?:enero|febrero|marzo|abril|mayo|junio|julio|agosto|septiembre|octubre|noviembre|diciembre).*\d{4})',
-                r'(\d{1,2})\s+días.*publicación',
-                r'(\d{1,2})\s+días.*hábiles',
-                r'plazo.*(\d{1,2})\s+días'
+                rf'plazo.{{0,80}}?solicitud.{{0,80}}?(\d{{1,2}}.{{0,40}}?{_MONTHS}(?:\s+del?)?\s+\d{{4}})',
+                r'fecha.{0,20}?límite.{0,20}?(\d{1,2}/\d{1,2}/\d{4})',
+                rf'hasta.{{0,40}}?(\d{{1,2}}.{{0,20}}?{_MONTHS}(?:\s+del?)?\s+\d{{4}})',
+                r'(\d{1,2})\s+días.{0,80}?publicación',
+                r'(\d{1,2})\s+días.{0,40}?hábiles',
+                r'plazo.{0,80}?(\d{1,2})\s+días'
             ],
             'amount': [
-                r'(?:cuantía|importe|dotación).*?(\d{1,3}(?:\.\d{3})*(?:,\d{2})?\s*€)',
+                r'(?:cuantía|importe|dotación).{0,120}?(\d{1,3}(?:\.\d{3})*(?:,\d{2})?\s*€)',
                 r'(\d{1,3}(?:\.\d{3})*(?:,\d{2})?\s*euros?)',
-                r'presupuesto.*?(\d{1,3}(?:\.\d{3})*(?:,\d{2})?\s*€)',
-                r'máximo.*?(\d{1,3}(?:\.\d{3})*(?:,\d{2})?\s*€)',
-                r'hasta.*?(\d{1,3}(?:\.\d{3})*(?:,\d{2})?\s*€)',
+                r'presupuesto.{0,120}?(\d{1,3}(?:\.\d{3})*(?:,\d{2})?\s*€)',
+                r'máximo.{0,120}?(\d{1,3}(?:\.\d{3})*(?:,\d{2})?\s*€)',
+                r'hasta.{0,120}?(\d{1,3}(?:\.\d{3})*(?:,\d{2})?\s*€)',
                 r'millones?\s+de\s+euros'
             ],
             'beneficiaries': [
@@ -67,7 +233,7 @@ class PDFProcessor:
                 r'podrán ser beneficiarios[:\s]+([^.]+\.)',
                 r'dirigida a[:\s]+([^.]+\.)',
                 r'destinatarios?[:\s]+([^.]+\.)',
-                r'requisitos.*beneficiarios[:\s]+([^.]+\.)',
+                r'requisitos.{0,80}?beneficiarios[:\s]+([^.]+\.)',
                 r'pyme[s]?',
                 r'autónomos?',
                 r'empresas?',
@@ -93,6 +259,27 @@ class PDFProcessor:
                 r'con el fin de[:\s]+([^.]+\.)'
             ]
         }
+        
+        # Compilados una sola vez: re.findall() con el patrón en texto tiene que
+        # buscarlo en la caché de re (o volver a compilarlo) en cada llamada
+        self.patterns = {
+            category: _compile_category(pattern_list)
+            for category, pattern_list in raw_patterns.items()
+        }
+        
+        # Secciones importantes del texto (raw_extracts)
+        sections_to_extract = [
+            'objeto', 'beneficiarios', 'cuantía', 'plazo', 'requisitos',
+            'documentación', 'criterios', 'valoración', 'procedimiento'
+        ]
+        # Siempre con re: RE2 no admite repeticiones de más de 1000 (500 x 500 aquí).
+        # Cada frase ocupa al menos 2 caracteres, así que 500 frases cubren el
+        # extracto de 1000 caracteres que se guarda: no hace falta seguir hasta
+        # el final del texto
+        self.section_res = [
+            (section, re.compile(rf'{section}[:\s]+((?:[^.]{{1,500}}\.){{1,500}})'))
+            for section in sections_to_extract
+        ]
     
     def download_pdf(self, pdf_url: str, filename: Optional[str] = None) -> Optional[str]:
         """
@@ -106,13 +293,7 @@ class PDFProcessor:
             Ruta al archivo descargado o None si falla
         """
         try:
-            if not filename:
-                # Generar nombre de archivo desde la URL
-                filename = pdf_url.split('/')[-1]
-                if not filename.endswith('.pdf'):
-                    filename = f"boe_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-            
-            filepath = self.download_dir / filename
+            filepath = self._pdf_filepath(pdf_url, filename)
             
             # Verificar si ya existe
             if filepath.exists():
@@ -121,14 +302,21 @@ class PDFProcessor:
             
             # Descargar PDF
             logger.info(f"⬇️  Descargando PDF: {pdf_url}")
-            response = requests.get(pdf_url, timeout=60, stream=True)
+            response = self.session.get(pdf_url, timeout=60, stream=True)
             response.raise_for_status()
             
-            # Guardar a archivo
-            with open(filepath, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
+            # Guardar a archivo (copia directa del stream, descomprimiendo gzip si aplica).
+            # Se escribe en .part y se renombra: una descarga cortada no debe
+            # quedar en la caché como si fuera el PDF
+            response.raw.decode_content = True
+            fd, partial = tempfile.mkstemp(dir=self.download_dir, suffix='.part')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    shutil.copyfileobj(response.raw, f, length=1024 * 1024)
+                os.replace(partial, filepath)
+            except BaseException:
+                os.unlink(partial)
+                raise
             
             logger.info(f"✅ PDF descargado: {filepath} ({filepath.stat().st_size / 1024:.1f} KB)")
             return str(filepath)
@@ -140,6 +328,104 @@ class PDFProcessor:
             logger.error(f"❌ Error inesperado: {e}")
             return None
     
+    def _pdf_filepath(self, pdf_url: str, filename: Optional[str] = None) -> Path:
+        """
+        Ruta local donde se guarda (o ya está) el PDF de una URL
+        
+        Por defecto el nombre es el SHA-1 de la URL completa: el último
+        segmento de la ruta se repite entre secciones del BOE.
+        """
+        if not filename:
+            filename = hashlib.sha1(pdf_url.encode('utf-8')).hexdigest() + '.pdf'
+        
+        return self.download_dir / filename
+    
+    async def download_pdfs(self, pdf_urls: List[str], concurrency: int = 16) -> List[Optional[str]]:
+        """
+        Descarga varios PDFs de forma concurrente (asyncio + httpx)
+        
+        Las descargas son solo E/S: un único hilo mantiene hasta concurrency
+        descargas en vuelo, así que el lote tarda ~lo que la más lenta en vez
+        de la suma de todas.
+        
+        Args:
+            pdf_urls: URLs de los PDFs a descargar
+            concurrency: Descargas simultáneas como máximo
+            
+        Returns:
+            Ruta de cada PDF (None si falla), en el mismo orden que pdf_urls
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        limits = httpx.Limits(max_connections=32, max_keepalive_connections=32)
+        async with httpx.AsyncClient(timeout=60.0, limits=limits, headers=_HTTP_HEADERS,
+                                     follow_redirects=True) as client:
+            return await asyncio.gather(*(
+                self._download_pdf_async(client, semaphore, pdf_url) for pdf_url in pdf_urls
+            ))
+    
+    def download_many(self, pdf_urls: List[str], concurrency: int = 16) -> List[Optional[str]]:
+        """
+        Versión síncrona de download_pdfs (desde código async, usar await download_pdfs)
+        """
+        return asyncio.run(self.download_pdfs(pdf_urls, concurrency))
+    
+    async def _download_pdf_async(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore,
+                                  pdf_url: str) -> Optional[str]:
+        """download_pdf sobre un cliente httpx compartido"""
+        try:
+            filepath = self._pdf_filepath(pdf_url)
+            
+            # Verificar si ya existe
+            if filepath.exists():
+                logger.info(f"📄 PDF ya existe: {filepath}")
+                return str(filepath)
+            
+            # Reintenta errores de conexión y respuestas 5xx, como la sesión síncrona
+            for attempt in range(_DOWNLOAD_RETRIES + 1):
+                try:
+                    async with semaphore:
+                        logger.info(f"⬇️  Descargando PDF: {pdf_url}")
+                        size = await self._stream_pdf_async(client, pdf_url, filepath)
+                    break
+                except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                    retryable = (isinstance(e, httpx.TransportError)
+                                 or e.response.status_code >= 500)
+                    if not retryable or attempt == _DOWNLOAD_RETRIES:
+                        raise
+                    await asyncio.sleep(_DOWNLOAD_BACKOFF * 2 ** attempt)
+            
+            logger.info(f"✅ PDF descargado: {filepath} ({size / 1024:.1f} KB)")
+            return str(filepath)
+            
+        except httpx.HTTPError as e:
+            logger.error(f"❌ Error descargando PDF: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"❌ Error inesperado: {e}")
+            return None
+    
+    @staticmethod
+    async def _stream_pdf_async(client: httpx.AsyncClient, pdf_url: str, filepath: Path) -> int:
+        """
+        Vuelca la respuesta a disco por trozos, con el mismo .part + os.replace
+        que download_pdf; devuelve los bytes escritos
+        """
+        async with client.stream("GET", pdf_url) as response:
+            response.raise_for_status()
+            fd, partial = tempfile.mkstemp(dir=filepath.parent, suffix='.part')
+            try:
+                size = 0
+                with os.fdopen(fd, 'wb') as f:
+                    async for chunk in response.aiter_bytes(1024 * 1024):
+                        # Escritura a disco fuera del bucle de eventos
+                        await asyncio.to_thread(f.write, chunk)
+                        size += len(chunk)
+                os.replace(partial, filepath)
+            except BaseException:
+                os.unlink(partial)
+                raise
+        return size
+    
     def extract_text_from_pdf(self, pdf_path: str) -> str:
         """
         Extrae texto de un PDF
@@ -152,7 +438,23 @@ class PDFProcessor:
         """
         text = ""
         
-        # Primero intentar con PyPDF2 (más rápido)
+        # Primero intentar con PyMuPDF (motor en C, mucho más rápido)
+        try:
+            import fitz
+            
+            with fitz.open(pdf_path) as doc:
+                logger.info(f"📖 Extrayendo texto de {doc.page_count} páginas con PyMuPDF...")
+                text = "".join(page.get_text("text") + "\n" for page in doc)
+            
+            if text.strip():
+                return text
+                
+        except ImportError:
+            logger.warning("PyMuPDF no está instalado")
+        except Exception as e:
+            logger.warning(f"Error con PyMuPDF: {e}")
+        
+        # Después con PyPDF2
         try:
             import PyPDF2
             
@@ -203,11 +505,17 @@ class PDFProcessor:
             
             logger.info(f"📖 Aplicando OCR al PDF...")
             
-            pages = convert_from_path(pdf_path, 200)  # 200 DPI
-            for i, page in enumerate(pages):
-                logger.info(f"  Procesando página {i+1}/{len(pages)}...")
-                page_text = pytesseract.image_to_string(page, lang='spa')
-                text += page_text + "\n"
+            # Páginas en JPEG en disco en lugar de en memoria; tesseract es un
+            # proceso externo, así que los hilos reconocen páginas en paralelo
+            with tempfile.TemporaryDirectory() as image_dir:
+                pages = convert_from_path(pdf_path, 200, output_folder=image_dir, fmt='jpeg')  # 200 DPI
+                if pages:
+                    logger.info(f"  Procesando {len(pages)} páginas...")
+                    with ThreadPoolExecutor(max_workers=min(8, len(pages))) as pool:
+                        page_texts = list(pool.map(
+                            lambda page: pytesseract.image_to_string(page, lang='spa'), pages
+                        ))
+                    text += "".join(page_text + "\n" for page_text in page_texts)
             
         except ImportError:
             logger.error("pytesseract o pdf2image no están instalados")
@@ -216,6 +524,35 @@ class PDFProcessor:
         
         return text
     
+    def extract_text_cached(self, pdf_path: str) -> str:
+        """
+        extract_text_from_pdf con caché en disco junto al PDF
+        
+        El texto se guarda comprimido en <pdf>.txt.zst (o .txt.gz sin
+        zstandard): volver a procesar un PDF, sobre todo si necesitó OCR, no
+        repite la extracción.
+        
+        Args:
+            pdf_path: Ruta al archivo PDF
+            
+        Returns:
+            Texto extraído del PDF
+        """
+        cache_path = Path(pdf_path).with_suffix(_TEXT_CACHE_SUFFIX)
+        try:
+            if cache_path.exists():
+                return _decompress_text(cache_path.read_bytes())
+        except Exception as e:
+            logger.warning(f"Caché de texto ilegible ({cache_path}): {e}")
+        
+        text = self.extract_text_from_pdf(pdf_path)
+        if text:
+            try:
+                _write_file_atomic(cache_path, _compress_text(text))
+            except OSError as e:
+                logger.warning(f"No se pudo guardar la caché de texto ({cache_path}): {e}")
+        return text
+    
     def extract_key_information(self, text: str) -> Dict[str, Any]:
         """
         Extrae información clave del texto del PDF
@@ -238,59 +575,31 @@ class PDFProcessor:
         # Normalizar texto
         text_normalized = ' '.join(text.split())
         text_lower = text_normalized.lower()
-        
-        # Extraer plazos
-        for pattern in self.patterns['deadline']:
-            matches = re.findall(pattern, text_lower, re.IGNORECASE)
-            for match in matches[:3]:  # Limitar a 3 coincidencias
-                if match not in info['deadlines']:
-                    info['deadlines'].append(match)
-        
-        # Extraer cuantías
-        for pattern in self.patterns['amount']:
-            matches = re.findall(pattern, text_normalized, re.IGNORECASE)
-            for match in matches[:5]:  # Limitar a 5 coincidencias
-                if match not in info['amounts']:
-                    info['amounts'].append(match)
-        
-        # Extraer beneficiarios
-        for pattern in self.patterns['beneficiaries']:
-            matches = re.findall(pattern, text_normalized, re.IGNORECASE)
-            for match in matches[:3]:
-                if isinstance(match, str) and len(match) > 10:  # Filtrar resultados muy cortos
-                    clean_match = match[:200] if len(match) > 200 else match
-                    if clean_match not in info['beneficiaries']:
-                        info['beneficiaries'].append(clean_match)
-        
-        # Extraer requisitos
-        for pattern in self.patterns['requirements']:
-            matches = re.findall(pattern, text_normalized, re.IGNORECASE)
-            for match in matches[:3]:
-                if isinstance(match, str) and len(match) > 10:
-                    clean_match = match[:300] if len(match) > 300 else match
-                    if clean_match not in info['requirements']:
-                        info['requirements'].append(clean_match)
-        
-        # Extraer propósito/objeto
-        for pattern in self.patterns['purpose']:
-            matches = re.findall(pattern, text_normalized, re.IGNORECASE)
-            for match in matches[:2]:
-                if isinstance(match, str) and len(match) > 10:
-                    clean_match = match[:300] if len(match) > 300 else match
-                    if clean_match not in info['purposes']:
-                        info['purposes'].append(clean_match)
+        # Las búsquedas van sobre text_lower y se recortan de text_normalized.
+        # lower() conserva la longitud salvo en casos raros (p.ej. 'İ'): entonces
+        # se devuelven los trozos en minúsculas
+        text_source = text_normalized if len(text_lower) == len(text_normalized) else text_lower
+        
+        # Plazos, cuantías, beneficiarios, requisitos y propósito/objeto
+        for category, key, limit, min_length, max_length, keep_case in self.EXTRACTION_RULES:
+            source = text_source if keep_case else text_lower
+            found = info[key]
+            seen = set()  # Duplicados descartados en O(1); la lista mantiene el orden
+            for matches in _findall_each(self.patterns[category], text_lower, source, limit):
+                for match in matches:
+                    if len(match) < min_length:  # Filtrar resultados muy cortos
+                        continue
+                    if max_length:
+                        match = match[:max_length]
+                    if match not in seen:
+                        seen.add(match)
+                        found.append(match)
         
         # Extraer secciones importantes del texto
-        sections_to_extract = [
-            'objeto', 'beneficiarios', 'cuantía', 'plazo', 'requisitos',
-            'documentación', 'criterios', 'valoración', 'procedimiento'
-        ]
-        
-        for section in sections_to_extract:
-            pattern = rf'{section}[:\s]+((?:[^.]{{1,500}}\.)+)'
-            match = re.search(pattern, text_normalized, re.IGNORECASE)
+        for section, pattern in self.section_res:
+            match = pattern.search(text_lower)
             if match:
-                info['raw_extracts'][section] = match.group(1)[:1000]
+                info['raw_extracts'][section] = text_source[match.start(1):match.end(1)][:1000]
         
         return info
     
@@ -306,7 +615,7 @@ class PDFProcessor:
         Returns:
             Documento en formato Markdown
         """
-        markdown = f"""# {metadata.get('title', 'Convocatoria de Subvención')}
+        parts = [f"""# {metadata.get('title', 'Convocatoria de Subvención')}
 
 ## 📋 Información General
 
@@ -317,76 +626,76 @@ class PDFProcessor:
 
 ## 🎯 Objeto y Finalidad
 
-"""
+"""]
         
         # Añadir propósitos
         if extracted_info['purposes']:
             for purpose in extracted_info['purposes']:
-                markdown += f"- {purpose}\n"
+                parts.append(f"- {purpose}\n")
         elif 'objeto' in extracted_info['raw_extracts']:
-            markdown += extracted_info['raw_extracts']['objeto'] + "\n"
+            parts.append(extracted_info['raw_extracts']['objeto'] + "\n")
         else:
-            markdown += "*(No se pudo extraer automáticamente el objeto)*\n"
+            parts.append("*(No se pudo extraer automáticamente el objeto)*\n")
         
-        markdown += "\n## 👥 Beneficiarios\n\n"
+        parts.append("\n## 👥 Beneficiarios\n\n")
         
         # Añadir beneficiarios
         if extracted_info['beneficiaries']:
             for beneficiary in extracted_info['beneficiaries']:
-                markdown += f"- {beneficiary}\n"
+                parts.append(f"- {beneficiary}\n")
         elif 'beneficiarios' in extracted_info['raw_extracts']:
-            markdown += extracted_info['raw_extracts']['beneficiarios'] + "\n"
+            parts.append(extracted_info['raw_extracts']['beneficiarios'] + "\n")
         else:
-            markdown += "*(No se pudo extraer automáticamente los beneficiarios)*\n"
+            parts.append("*(No se pudo extraer automáticamente los beneficiarios)*\n")
         
-        markdown += "\n## 💰 Cuantía\n\n"
+        parts.append("\n## 💰 Cuantía\n\n")
         
         # Añadir cuantías
         if extracted_info['amounts']:
             for amount in extracted_info['amounts']:
-                markdown += f"- {amount}\n"
+                parts.append(f"- {amount}\n")
         elif 'cuantía' in extracted_info['raw_extracts']:
-            markdown += extracted_info['raw_extracts']['cuantía'] + "\n"
+            parts.append(extracted_info['raw_extracts']['cuantía'] + "\n")
         else:
-            markdown += "*(No se pudo extraer automáticamente la cuantía)*\n"
+            parts.append("*(No se pudo extraer automáticamente la cuantía)*\n")
         
-        markdown += "\n## ⏰ Plazos\n\n"
+        parts.append("\n## ⏰ Plazos\n\n")
         
         # Añadir plazos
         if extracted_info['deadlines']:
             for deadline in extracted_info['deadlines']:
-                markdown += f"- {deadline}\n"
+                parts.append(f"- {deadline}\n")
         elif 'plazo' in extracted_info['raw_extracts']:
-            markdown += extracted_info['raw_extracts']['plazo'] + "\n"
+            parts.append(extracted_info['raw_extracts']['plazo'] + "\n")
         else:
-            markdown += "*(No se pudo extraer automáticamente los plazos)*\n"
+            parts.append("*(No se pudo extraer automáticamente los plazos)*\n")
         
-        markdown += "\n## 📄 Requisitos y Documentación\n\n"
+        parts.append("\n## 📄 Requisitos y Documentación\n\n")
         
         # Añadir requisitos
         if extracted_info['requirements']:
             for req in extracted_info['requirements']:
-                markdown += f"- {req}\n"
+                parts.append(f"- {req}\n")
         elif 'requisitos' in extracted_info['raw_extracts']:
-            markdown += extracted_info['raw_extracts']['requisitos'] + "\n"
+            parts.append(extracted_info['raw_extracts']['requisitos'] + "\n")
         elif 'documentación' in extracted_info['raw_extracts']:
-            markdown += extracted_info['raw_extracts']['documentación'] + "\n"
+            parts.append(extracted_info['raw_extracts']['documentación'] + "\n")
         else:
-            markdown += "*(No se pudo extraer automáticamente los requisitos)*\n"
+            parts.append("*(No se pudo extraer automáticamente los requisitos)*\n")
         
         # Añadir criterios de valoración si existen
         if 'criterios' in extracted_info['raw_extracts'] or 'valoración' in extracted_info['raw_extracts']:
-            markdown += "\n## ⚖️ Criterios de Valoración\n\n"
+            parts.append("\n## ⚖️ Criterios de Valoración\n\n")
             if 'criterios' in extracted_info['raw_extracts']:
-                markdown += extracted_info['raw_extracts']['criterios'] + "\n"
+                parts.append(extracted_info['raw_extracts']['criterios'] + "\n")
             if 'valoración' in extracted_info['raw_extracts']:
-                markdown += extracted_info['raw_extracts']['valoración'] + "\n"
+                parts.append(extracted_info['raw_extracts']['valoración'] + "\n")
         
         # Añadir extracto del texto original (primeras 2000 caracteres)
-        markdown += f"\n## 📝 Extracto del Texto Original\n\n```\n{text[:2000]}...\n```\n"
+        parts.append(f"\n## 📝 Extracto del Texto Original\n\n```\n{text[:2000]}...\n```\n")
         
         # Añadir metadata de procesamiento
-        markdown += f"""
+        parts.append(f"""
 ---
 
 ### ℹ️ Información de Procesamiento
@@ -397,9 +706,9 @@ class PDFProcessor:
 
 > ⚠️ **Nota**: Esta información ha sido extraída automáticamente. 
 > Se recomienda consultar el documento original para confirmar todos los detalles.
-"""
+""")
         
-        return markdown
+        return ''.join(parts)
     
     def process_grant_pdf(self, pdf_url: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -412,6 +721,23 @@ class PDFProcessor:
         Returns:
             Diccionario con toda la información procesada
         """
+        # download_pdf no lanza excepciones: devuelve None si falla
+        pdf_path = self.download_pdf(pdf_url)
+        return self.process_downloaded_pdf(pdf_url, metadata, pdf_path)
+    
+    def process_downloaded_pdf(self, pdf_url: str, metadata: Dict[str, Any],
+                               pdf_path: Optional[str]) -> Dict[str, Any]:
+        """
+        Procesa un PDF ya descargado (texto, información clave y Markdown)
+        
+        Args:
+            pdf_url: URL original del PDF
+            metadata: Metadatos del documento (título, organismo, etc.)
+            pdf_path: Ruta local devuelta por download_pdf (None si la descarga falló)
+            
+        Returns:
+            Diccionario con toda la información procesada, como process_grant_pdf
+        """
         result = {
             'success': False,
             'pdf_url': pdf_url,
@@ -423,14 +749,12 @@ class PDFProcessor:
         }
         
         try:
-            # Descargar PDF
-            pdf_path = self.download_pdf(pdf_url)
             if not pdf_path:
                 result['error'] = 'No se pudo descargar el PDF'
                 return result
             
             # Extraer texto
-            text = self.extract_text_from_pdf(pdf_path)
+            text = self.extract_text_cached(pdf_path)
             if not text:
                 result['error'] = 'No se pudo extraer texto del PDF'
                 return result
@@ -453,6 +777,64 @@ class PDFProcessor:
             logger.error(f"❌ Error procesando PDF: {e}")
         
         return result
+    
+    def process_grant_pdfs(self, items: List[Tuple[str, Dict[str, Any]]],
+                           workers: Optional[int] = None,
+                           download_workers: int = 8) -> List[Dict[str, Any]]:
+        """
+        process_grant_pdf para un lote de PDFs
+        
+        Las descargas (E/S) van en un pool de hilos y la extracción (CPU:
+        parseo del PDF, regex, OCR) en un pool de procesos; cada PDF pasa a
+        extraerse en cuanto termina su descarga, así que red y CPU se solapan.
+        
+        Args:
+            items: Pares (pdf_url, metadata)
+            workers: Procesos de extracción (por defecto os.cpu_count())
+            download_workers: Descargas simultáneas
+            
+        Returns:
+            Un resultado por item, en el mismo orden que items
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        if not items:
+            return results
+        
+        with ThreadPoolExecutor(max_workers=download_workers) as downloads, \
+                ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                                    initializer=_init_pdf_worker,
+                                    initargs=(str(self.download_dir),)) as pool:
+            pending = {
+                downloads.submit(self.download_pdf, pdf_url): index
+                for index, (pdf_url, _) in enumerate(items)
+            }
+            extracting = {}
+            for future in as_completed(pending):
+                index = pending[future]
+                pdf_url, metadata = items[index]
+                job = pool.submit(_process_downloaded_pdf, (pdf_url, metadata, future.result()))
+                extracting[job] = index
+            
+            for job in as_completed(extracting):
+                results[extracting[job]] = job.result()
+        
+        return results
+
+
+# PDFProcessor de cada proceso del pool de process_grant_pdfs (patrones compilados una vez)
+_worker_processor: Optional[PDFProcessor] = None
+
+
+def _init_pdf_worker(download_dir: str):
+    """Inicializador del pool de PDFProcessor.process_grant_pdfs"""
+    global _worker_processor
+    _worker_processor = PDFProcessor(download_dir)
+
+
+def _process_downloaded_pdf(args: Tuple[str, Dict[str, Any], Optional[str]]) -> Dict[str, Any]:
+    """Worker de PDFProcessor.process_grant_pdfs"""
+    pdf_url, metadata, pdf_path = args
+    return _worker_processor.process_downloaded_pdf(pdf_url, metadata, pdf_path)
 
 
 def main():
@@ -512,7 +894,7 @@ def main():
         print(f"❌ Error: {result['error']}")
     
     print("\n💡 Nota: Para usar este procesador necesitas instalar:")
-    print("  pip install PyPDF2 pdfplumber")
+    print("  pip install PyMuPDF PyPDF2 pdfplumber")
     print("  (Opcional) pip install pytesseract pdf2image para OCR")
 
 
@@ -5,27 +5,62 @@ Service for capturing and processing grants/tenders from PLACSP.
 """
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Dict, Any, List, Optional
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 import time
 
 from app.models import Grant
 from app.shared.placsp_client import PLACSPClient
-from app.shared.codice_parser import CODICEParser
+from app.shared.codice_parser import CODICEParser, ParsedEntry
 from app.shared.filters import GrantFilter
 from app.config import get_settings
 
+try:
+    import ciso8601
+except ImportError:
+    ciso8601 = None
+
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+
+def _parse_iso_datetime(value: str) -> datetime:
+    """
+    Parse an Atom (ISO 8601) timestamp into an aware datetime.
+
+    Uses ciso8601's C parser when available (handles 'Z' natively) and
+    falls back to datetime.fromisoformat. Naive values are assumed UTC.
+    Raises ValueError on malformed input.
+    """
+    if ciso8601 is not None:
+        parsed = ciso8601.parse_datetime(value)
+    else:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
 class PLACSPService:
     """Service for capturing PLACSP tenders"""
 
+    # Consecutive entries older than the cutoff before we stop paging
+    MAX_CONSECUTIVE_OLD = 3
+    # Politeness delay between page requests (seconds)
+    PAGE_DELAY = 0.5
+    # Grants buffered before a bulk INSERT/UPDATE round trip
+    SAVE_BATCH_SIZE = 1000
+
     def __init__(self, db: Session):
         self.db = db
+        # Rows waiting to be written, keyed by grant id (a repeated entry
+        # in the feed just overwrites the earlier one)
+        self._pending_rows: Dict[str, Dict[str, Any]] = {}
         self.client = PLACSPClient()
-        self.parser = CODICEParser()
         self.filter_engine = GrantFilter()
         
     def capture_recent_grants(self, days_back: int = 1, max_pages: int = 10) -> Dict[str, Any]:
@@ -38,6 +73,10 @@ class PLACSPService:
             
         Returns:
             Statistics dictionary
+            
+        Raises:
+            SQLAlchemyError: If a batch of grants can't be written; batches
+                saved before it stay committed
         """
         stats = {
             "total_fetched": 0,
@@ -51,75 +90,83 @@ class PLACSPService:
         
         cutoff_date = datetime.now(timezone.utc) - timedelta(days=days_back)
         current_url = settings.placsp_feed_url
+        consecutive_old = 0
         
         logger.info(f"🚀 Starting PLACSP capture. Days back: {days_back}, Cutoff: {cutoff_date}")
         
+        # Single background worker that downloads the next page while the
+        # current one is being parsed and saved.
+        prefetcher = ThreadPoolExecutor(max_workers=1)
+        next_page = prefetcher.submit(self._fetch_page, current_url)
+        
         for page in range(max_pages):
             try:
                 logger.info(f"📄 Processing page {page+1}: {current_url}")
-                entries, next_link = self.client.fetch_feed(current_url)
+                entries, next_link = next_page.result()
                 stats["pages_processed"] += 1
                 
                 if not entries:
                     logger.info("   No entries found on this page.")
                     break
                     
+                if next_link and page + 1 < max_pages:
+                    next_page = prefetcher.submit(self._fetch_feed_politely, next_link)
+                    
                 page_processed_count = 0
                 stop_processing = False
                 
-                for entry in entries:
+                for data in entries:
                     stats["total_fetched"] += 1
                     
                     try:
-                        # Parse entry
-                        data = self.parser.parse_entry(entry)
+                        # Entries come already parsed from the prefetch worker
+                        if isinstance(data, Exception):
+                            raise data
                         
                         # Check date (updated)
-                        updated_str = data.get('updated')
+                        updated_str = data.updated
                         if updated_str:
                             # Parse Atom date format (ISO 8601)
                             # Example: 2023-10-01T12:00:00Z
                             # We need to handle potential format variations
                             try:
-                                updated_at = datetime.fromisoformat(updated_str.replace('Z', '+00:00'))
+                                updated_at = _parse_iso_datetime(updated_str)
                                 
-                                # If entry is older than cutoff, we might want to stop
-                                # BUT feeds are not always strictly ordered by updated, so be careful.
-                                # However, usually they are ordered new to old.
+                                # Feeds are usually ordered new to old, but not strictly,
+                                # so a single old entry is skipped and we only stop once
+                                # we see several consecutive entries older than the cutoff.
                                 if updated_at < cutoff_date:
-                                    logger.debug(f"   Entry {data.get('id')} is older than cutoff ({updated_at}). Stopping.")
-                                    stop_processing = True
-                                    # We don't break immediately here because there might be mixed dates, 
-                                    # but usually we can stop if we see a significant chunk of old dates.
-                                    # For safety in this v1, let's just skip this entry but continue page.
-                                    # If we want to optimize, we can break if we see consecutive old entries.
+                                    consecutive_old += 1
+                                    if consecutive_old >= self.MAX_CONSECUTIVE_OLD:
+                                        logger.debug(f"   Entry {data.id} is older than cutoff ({updated_at}). Stopping.")
+                                        stop_processing = True
+                                        break
+                                    continue
+                                consecutive_old = 0
                             except ValueError:
                                 logger.warning(f"   Could not parse date: {updated_str}")
-                        
-                        if stop_processing:
-                            # If we decided to stop based on date, we skip this entry
-                            # In a robust implementation, we might break the loop if we are sure about order.
-                            # For now, let's just skip.
-                            continue
 
                         # Filter for Nonprofit
                         # We construct a "grant_info" dict for the filter engine
                         grant_info = {
-                            'id': data.get('id'),
-                            'title': data.get('title'),
-                            'department': data.get('department', ''),
+                            'id': data.id,
+                            'title': data.title,
+                            'department': data.department or '',
                             'section': '',
                             'epigraph': ''
                         }
                         
                         # Use the 'test_placsp' profile for debugging/broad capture
-                        filter_result = self.filter_engine.evaluate_grant(grant_info, 'test_placsp')
+                        # Only passed/total_score are used: stop at the first failed required rule
+                        filter_result = self.filter_engine.evaluate_grant(
+                            grant_info, 'test_placsp', fast_fail=True, include_timestamps=False
+                        )
                         
                         if filter_result['passed']:
                             stats["total_nonprofit"] += 1
                             confidence = filter_result['total_score']
                             
-                            self._save_grant(data, confidence, stats)
+                            self._save_grant(data, confidence)
                         else:
                             stats["total_skipped"] += 1
                             logger.debug(f"Skipped: {grant_info['title']} (Score: {filter_result['total_score']:.2f})")
@@ -137,20 +184,57 @@ class PLACSPService:
                     break
                     
                 current_url = next_link
-                # Be nice to the server
-                time.sleep(0.5)
                 
             except Exception as e:
                 logger.error(f"Error processing page {page}: {e}")
                 stats["total_errors"] += 1
                 break
+            
+            # Written outside the per-entry/per-page error handling: a batch
+            # that can't be saved aborts the capture
+            if len(self._pending_rows) >= self.SAVE_BATCH_SIZE:
+                try:
+                    self._flush_grants(stats)
+                except Exception:
+                    prefetcher.shutdown(wait=False, cancel_futures=True)
+                    raise
                 
-        self.db.commit()
+        # Drop any prefetched page we no longer need
+        prefetcher.shutdown(wait=False, cancel_futures=True)
+        
+        self._flush_grants(stats)
         logger.info(f"✅ PLACSP capture finished. Stats: {stats}")
         return stats
 
-    def _save_grant(self, data: Dict[str, Any], confidence: float, stats: Dict[str, Any]):
-        """Save or update grant in database"""
+    def _fetch_page(self, url: str):
+        """
+        Fetch a feed page and parse its entries while streaming (runs in the prefetch worker)
+        
+        Each entry is parsed into a ParsedEntry as soon as it arrives and its
+        XML is freed, so a page never materializes as a full tree. Entries
+        that fail to parse are returned as the exception, to be counted by
+        the caller.
+        """
+        # The worker gets its own parser: compiled XPath objects aren't
+        # shared across threads
+        parser = CODICEParser()
+        
+        def parse(entry):
+            try:
+                return parser.parse_entry(entry)
+            except Exception as e:
+                return e
+        
+        return self.client.fetch_feed(url, parse_entry=parse)
+
+    def _fetch_feed_politely(self, url: str):
+        """Fetch a feed page after the politeness delay (runs in the prefetch worker)"""
+        # Be nice to the server
+        time.sleep(self.PAGE_DELAY)
+        return self._fetch_page(url)
+
+    def _save_grant(self, data: ParsedEntry, confidence: float):
+        """Queue a grant for saving; capture_recent_grants writes the queue with _flush_grants"""
         
         # ID strategy: PLACSP IDs are URLs like https://.../id
         # We want a shorter ID. We can use the last part or the folder_id.
@@ -158,7 +242,7 @@ class PLACSPService:
         # Or hash the ID URL.
         # For readability, let's try to find a code.
         
-        grant_id = data.get('id')
+        grant_id = data.id
         if not grant_id:
             return
 
@@ -167,24 +251,21 @@ class PLACSPService:
         short_id = grant_id.split('/')[-1]
         db_id = f"PLACSP-{short_id}"
         
-        # Check if exists
-        existing = self.db.query(Grant).filter(Grant.id == db_id).first()
-        
         # Parse dates
         pub_date = None
-        if data.get('updated'):
+        if data.updated:
             try:
-                pub_date = datetime.fromisoformat(data.get('updated').replace('Z', '+00:00'))
-            except:
+                pub_date = _parse_iso_datetime(data.updated)
+            except ValueError:
                 pass
                 
         end_date = None
-        if data.get('application_end_date'):
+        if data.application_end_date:
             try:
                 # Format from parser might be ISO or simple date
                 # Parser returns string.
                 # If it has T, it's iso-like
-                end_date_str = data.get('application_end_date')
+                end_date_str = data.application_end_date
                 if 'T' in end_date_str:
                     end_date = datetime.fromisoformat(end_date_str)
                 else:
@@ -192,56 +273,126 @@ class PLACSPService:
             except:
                 pass
 
-        if existing:
-            # Update
-            existing.title = data.get('title') or existing.title
-            existing.budget_amount = data.get('budget_amount')
-            existing.application_end_date = end_date
-            existing.processed_at = datetime.now()
-            existing.nonprofit_confidence = confidence
-            # Update new fields
-            existing.placsp_folder_id = data.get('folder_id')
-            existing.contract_type = data.get('contract_type')
-            existing.cpv_codes = data.get('cpv_codes')
-            existing.regions = data.get('regions')
-            existing.pdf_url = data.get('pdf_url')
-            existing.html_url = data.get('link')
-            if data.get('summary'):
-                existing.purpose = data.get('summary')
-            
-            stats["total_updated"] += 1
-        else:
-            # Create
-            grant = Grant(
-                id=db_id,
-                source="PLACSP",
-                title=data.get('title') or "Sin título",
-                department=data.get('department') or "PLACSP",
-                publication_date=pub_date,
-                captured_at=datetime.now(),
-                processed_at=datetime.now(),
-                
-                # PLACSP specific
-                placsp_folder_id=data.get('folder_id'),
-                contract_type=data.get('contract_type'),
-                cpv_codes=data.get('cpv_codes'),
-                
-                # Common
-                budget_amount=data.get('budget_amount'),
-                application_end_date=end_date,
-                regions=data.get('regions'),
-                pdf_url=data.get('pdf_url'),
-                html_url=data.get('link'), # Save official link
-                purpose=data.get('summary'), # Save Atom summary as purpose
-                
-                # Status
-                is_open=True, # Assume open if recently captured
-                is_nonprofit=True,
-                nonprofit_confidence=confidence,
-                
-                # Default empty for others
-                relevance_score=0.0
-            )
-            self.db.add(grant)
-            stats["total_new"] += 1
+        self._pending_rows[db_id] = {
+            "data": data,
+            "confidence": confidence,
+            "pub_date": pub_date,
+            "end_date": end_date,
+        }
 
+    def _flush_grants(self, stats: Dict[str, Any]):
+        """
+        Write buffered grants: one SELECT for existing ids, then a bulk INSERT
+        and a bulk UPDATE, committed as one batch
+        
+        On a database error the transaction is rolled back and the error
+        re-raised; the batch stays buffered.
+        """
+        if not self._pending_rows:
+            return
+        pending = self._pending_rows
+        
+        try:
+            new_count, updated_count = self._write_grants(pending)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        
+        self._pending_rows = {}
+        stats["total_new"] += new_count
+        stats["total_updated"] += updated_count
+
+    def _write_grants(self, pending: Dict[str, Dict[str, Any]]):
+        """Execute the statements for _flush_grants; returns (new, updated) counts"""
+        existing_ids = set(self.db.scalars(
+            select(Grant.id).where(Grant.id.in_(pending.keys()))
+        ))
+        now = datetime.now()
+        new_rows = []
+        updated_rows = []
+        
+        for db_id, row in pending.items():
+            data = row["data"]
+            if db_id in existing_ids:
+                # Update
+                updated_rows.append(self._update_values(db_id, row, now))
+            else:
+                # Create
+                new_rows.append({
+                    "id": db_id,
+                    "source": "PLACSP",
+                    "title": data.title or "Sin título",
+                    "department": data.department or "PLACSP",
+                    "publication_date": row["pub_date"],
+                    "captured_at": now,
+                    "processed_at": now,
+                    
+                    # PLACSP specific
+                    "placsp_folder_id": data.folder_id,
+                    "contract_type": data.contract_type,
+                    "cpv_codes": data.cpv_codes,
+                    
+                    # Common
+                    "budget_amount": data.budget_amount,
+                    "application_end_date": row["end_date"],
+                    "regions": data.regions,
+                    "pdf_url": data.pdf_url,
+                    "html_url": data.link, # Save official link
+                    "purpose": data.summary, # Save Atom summary as purpose
+                    
+                    # Status
+                    "is_open": True, # Assume open if recently captured
+                    "is_nonprofit": True,
+                    "nonprofit_confidence": row["confidence"],
+                    
+                    # Default empty for others
+                    "relevance_score": 0.0,
+                })
+        
+        # executemany: SQLAlchemy batches these into multi-row statements
+        inserted = 0
+        if new_rows:
+            # A concurrent capture may have inserted the same id meanwhile:
+            # RETURNING only yields the rows really inserted, and the
+            # skipped ones are updated like any other existing grant
+            inserted_ids = set(self.db.scalars(
+                insert(Grant)
+                .on_conflict_do_nothing(index_elements=["id"])
+                .returning(Grant.id),
+                new_rows,
+            ))
+            inserted = len(inserted_ids)
+            for values in new_rows:
+                db_id = values["id"]
+                if db_id not in inserted_ids:
+                    updated_rows.append(self._update_values(db_id, pending[db_id], now))
+        if updated_rows:
+            # Bulk UPDATE by primary key
+            self.db.execute(update(Grant), updated_rows)
+        return inserted, len(updated_rows)
+
+    @staticmethod
+    def _update_values(db_id: str, row: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+        """Column values refreshed on an already stored grant"""
+        data = row["data"]
+        values = {
+            "id": db_id,
+            "budget_amount": data.budget_amount,
+            "application_end_date": row["end_date"],
+            "processed_at": now,
+            "nonprofit_confidence": row["confidence"],
+            # Update new fields
+            "placsp_folder_id": data.folder_id,
+            "contract_type": data.contract_type,
+            "cpv_codes": data.cpv_codes,
+            "regions": data.regions,
+            "pdf_url": data.pdf_url,
+            "html_url": data.link,
+        }
+        # Keep the stored title/purpose when the feed has none
+        if data.title:
+            values["title"] = data.title
+        if data.summary:
+            values["purpose"] = data.summary
+        return values
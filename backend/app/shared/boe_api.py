@@ -11,19 +11,67 @@ Documentation: https://www.boe.es/datosabiertos/api/api.php
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+import asyncio
+import importlib.util
 import json
-from typing import Optional, Dict, List, Union, Any
+import sqlite3
+import threading
+from typing import Optional, Dict, List, Union, Any, Type, TypeVar, Iterator, AsyncIterator, TYPE_CHECKING
 from datetime import datetime, date
-from urllib.parse import quote
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+import random
 import time
 import logging
 
+import msgspec
+from lxml import etree as LET
+
+# httpx is only needed by AsyncBOEAPIClient and is imported there: it
+# roughly doubles the import time of this module for sync-only callers
+if TYPE_CHECKING:
+    import httpx
+
+from app.shared import boe_models_fast
+from app.shared.boe_models_fast import BOESummaryResponse
+
+T = TypeVar("T")
+
+# Untyped decoder for the dict-returning endpoints: same result as
+# response.json(), decoded straight from the response bytes
+_JSON_DECODER = msgspec.json.Decoder()
+
 
 class BOEAPIError(Exception):
     """Custom exception for BOE API errors"""
     pass
 
 
+@lru_cache(maxsize=4096)
+def _to_yyyymmdd(value: Union[str, date]) -> str:
+    """Format a date as the API's YYYYMMDD; strings are passed through"""
+    if isinstance(value, date):
+        # Plain formatting is several times faster than strftime
+        return f"{value.year:04d}{value.month:02d}{value.day:02d}"
+    return value
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
 class BOEAPIClient:
     """
     Client for the Spanish Official State Gazette (BOE) API
@@ -34,37 +82,72 @@ class BOEAPIClient:
     
     BASE_URL = "https://www.boe.es/datosabiertos/api"
     
-    def __init__(self, timeout: int = 30, max_retries: int = 3, retry_delay: float = 1.0):
+    # Kept-alive connections held per host
+    POOL_SIZE = 32
+    
+    # Status codes worth retrying; any other error status fails at once
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+    
+    # Upper bound for a single retry wait, including server Retry-After
+    MAX_RETRY_DELAY = 60.0
+    
+    # Bytes read per chunk when streaming XML documents
+    STREAM_CHUNK_SIZE = 65536
+    
+    def __init__(self, timeout: int = 30, max_retries: int = 3, retry_delay: float = 1.0,
+                 aux_cache_ttl: float = 86400, cache_path: Optional[str] = None):
         """
         Initialize the BOE API client
         
         Args:
             timeout: Request timeout in seconds
             max_retries: Maximum number of retry attempts
-            retry_delay: Delay between retry attempts in seconds
+            retry_delay: Base delay for the exponential retry backoff in seconds
+            aux_cache_ttl: Seconds the auxiliary tables (subjects, ranks...) are reused
+            cache_path: SQLite file persisting those tables across runs
+                (None keeps them in memory only). Use a private, per-user
+                location: entries read from it are trusted.
         """
         self.timeout = timeout
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self._init_aux_cache(aux_cache_ttl, cache_path)
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'BOE-API-Client/1.0'
         })
+        # requests already asks for gzip/deflate (br too when brotli is
+        # installed) and keeps connections alive; the adapter only widens the
+        # pool so concurrent callers reuse connections instead of discarding
+        # them. Retries are handled in _get.
+        self.session.mount('https://', HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=self.POOL_SIZE,
+            max_retries=0
+        ))
         
         self.logger = logging.getLogger(__name__)
     
-    def _make_request(self, url: str, params: Optional[Dict] = None, 
-                     accept: str = "application/json") -> Dict[str, Any]:
+    def _init_aux_cache(self, ttl: float, path: Optional[str]):
+        self.aux_cache_ttl = ttl
+        self.cache_path = path
+        self._aux_cache: Dict[str, Any] = {}
+        self._aux_cache_lock = threading.Lock()
+        self._aux_disk: Optional[sqlite3.Connection] = None
+    
+    def _get(self, url: str, params: Optional[Dict] = None,
+             accept: str = "application/json", stream: bool = False) -> requests.Response:
         """
-        Make HTTP request with retry logic and error handling
+        Perform a GET request with retry logic
         
         Args:
             url: API endpoint URL
             params: Query parameters
             accept: Accept header value
+            stream: Leave the body unread (the caller must consume or close it)
             
         Returns:
-            Parsed JSON response
+            Successful HTTP response
             
         Raises:
             BOEAPIError: If request fails after retries
@@ -78,31 +161,205 @@ class BOEAPIClient:
                     url, 
                     params=params, 
                     headers=headers, 
-                    timeout=self.timeout
+                    timeout=self.timeout,
+                    stream=stream
                 )
-                response.raise_for_status()
-                
-                if accept == "application/json":
-                    try:
-                        data = response.json()
-                    except ValueError as e:
-                        raise BOEAPIError(f"Invalid JSON response: {e}")
-                    
-                    # Check API status
-                    status = data.get("status", {})
-                    if status.get("code") != "200":
-                        raise BOEAPIError(f"API Error {status.get('code')}: {status.get('text')}")
-                    
-                    return data
-                else:
-                    return {"content": response.text, "status": {"code": "200"}}
                     
             except requests.exceptions.RequestException as e:
                 self.logger.warning(f"Request failed (attempt {attempt + 1}): {e}")
                 if attempt < self.max_retries:
-                    time.sleep(self.retry_delay)
-                else:
-                    raise BOEAPIError(f"Request failed after {self.max_retries + 1} attempts: {e}")
+                    time.sleep(self._backoff(attempt))
+                    continue
+                raise BOEAPIError(f"Request failed after {attempt + 1} attempts: {e}")
+            
+            if response.status_code in self.RETRY_STATUSES and attempt < self.max_retries:
+                self.logger.warning(f"Request failed (attempt {attempt + 1}): HTTP {response.status_code}")
+                response.close()
+                time.sleep(self._backoff(attempt, response.headers.get("Retry-After")))
+                continue
+            
+            try:
+                response.raise_for_status()
+            except requests.exceptions.HTTPError as e:
+                response.close()
+                raise BOEAPIError(f"Request failed after {attempt + 1} attempts: {e}")
+            return response
+    
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """
+        Seconds to wait before retrying
+        
+        Honors the server's Retry-After when given; otherwise backs off
+        exponentially from retry_delay with jitter, so clients that failed
+        together don't all retry at the same instant.
+        """
+        delay = _parse_retry_after(retry_after)
+        if delay is None:
+            base = self.retry_delay * (2 ** attempt)
+            delay = base / 2 + random.uniform(0, base / 2)
+        return min(delay, self.MAX_RETRY_DELAY)
+    
+    def _make_request(self, url: str, params: Optional[Dict] = None, 
+                     accept: str = "application/json") -> Dict[str, Any]:
+        """
+        Make HTTP request with retry logic and error handling
+        
+        Args:
+            url: API endpoint URL
+            params: Query parameters
+            accept: Accept header value
+            
+        Returns:
+            Parsed JSON response
+            
+        Raises:
+            BOEAPIError: If request fails after retries
+        """
+        response = self._get(url, params, accept)
+        return self._decode_response(response, accept)
+    
+    def _iterparse_xml(self, url: str, tag: str) -> Iterator[LET._Element]:
+        """
+        Stream an XML document and yield its `tag` elements as they are parsed
+        
+        Each element is cleared once the caller moves on to the next one, so
+        memory stays bounded by a single element instead of the whole document.
+        """
+        response = self._get(url, accept="application/xml", stream=True)
+        response.raw.decode_content = True
+        try:
+            for _, elem in LET.iterparse(response.raw, events=('end',), tag=tag):
+                yield elem
+                self._release(elem)
+        except LET.XMLSyntaxError as e:
+            raise BOEAPIError(f"Invalid XML response: {e}")
+        finally:
+            response.close()
+    
+    @staticmethod
+    def _release(elem: LET._Element):
+        """Free a processed element and the siblings parsed before it"""
+        elem.clear()
+        parent = elem.getparent()
+        if parent is not None:
+            while elem.getprevious() is not None:
+                del parent[0]
+    
+    def _make_cached_request(self, url: str) -> Dict[str, Any]:
+        """
+        _make_request for the auxiliary reference tables
+        
+        These change rarely, so responses are kept for aux_cache_ttl seconds
+        in memory and in the SQLite file at cache_path. The returned dict is
+        shared between callers; don't mutate it.
+        """
+        data = self._aux_cache_get(url)
+        if data is None:
+            data = self._make_request(url)
+            self._aux_cache_put(url, data)
+        return data
+    
+    def _aux_memory_get(self, url: str) -> Optional[Dict[str, Any]]:
+        """In-memory half of _aux_cache_get (no I/O, safe inside an event loop)"""
+        with self._aux_cache_lock:
+            entry = self._aux_cache.get(url)
+        if entry is None or time.time() >= entry[0]:
+            return None
+        return entry[1]
+    
+    def _aux_cache_get(self, url: str) -> Optional[Dict[str, Any]]:
+        data = self._aux_memory_get(url)
+        if data is not None or not self.cache_path:
+            return data
+        
+        with self._aux_cache_lock:
+            try:
+                row = self._aux_disk_conn().execute(
+                    "SELECT expires, data FROM aux_tables WHERE url = ?", (url,)
+                ).fetchone()
+            except Exception as e:
+                self.logger.debug(f"Disk cache read failed: {e}")
+                return None
+            if row is None or time.time() >= row[0]:
+                return None
+            # Stored as JSON, not pickled
+            entry = (row[0], _JSON_DECODER.decode(row[1]))
+            self._aux_cache[url] = entry
+        return entry[1]
+    
+    def _aux_cache_put(self, url: str, data: Dict[str, Any]):
+        entry = (time.time() + self.aux_cache_ttl, data)
+        with self._aux_cache_lock:
+            self._aux_cache[url] = entry
+            if self.cache_path:
+                try:
+                    self._aux_disk_conn().execute(
+                        "INSERT OR REPLACE INTO aux_tables (url, expires, data) VALUES (?, ?, ?)",
+                        (url, entry[0], msgspec.json.encode(data))
+                    )
+                except Exception as e:
+                    self.logger.debug(f"Disk cache write failed: {e}")
+    
+    def _aux_disk_conn(self) -> sqlite3.Connection:
+        """Open (once) the SQLite cache file; call under _aux_cache_lock"""
+        if self._aux_disk is None:
+            conn = sqlite3.connect(self.cache_path, check_same_thread=False, isolation_level=None)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS aux_tables "
+                "(url TEXT PRIMARY KEY, expires REAL NOT NULL, data BLOB NOT NULL)"
+            )
+            self._aux_disk = conn
+        return self._aux_disk
+    
+    @staticmethod
+    def _decode_response(response: Any, accept: str) -> Dict[str, Any]:
+        """Decode a successful requests/httpx response for _make_request"""
+        if accept == "application/json":
+            try:
+                data = _JSON_DECODER.decode(response.content)
+            except msgspec.DecodeError as e:
+                raise BOEAPIError(f"Invalid JSON response: {e}")
+            
+            # Check API status
+            status = data.get("status", {})
+            if status.get("code") != "200":
+                raise BOEAPIError(f"API Error {status.get('code')}: {status.get('text')}")
+            
+            return data
+        else:
+            return {"content": response.text, "status": {"code": "200"}}
+    
+    def _make_typed_request(self, url: str, response_type: Type[T],
+                            params: Optional[Dict] = None) -> T:
+        """
+        Make HTTP request and decode the JSON body into a msgspec response struct
+        
+        Args:
+            url: API endpoint URL
+            response_type: Response struct from boe_models_fast
+            params: Query parameters
+            
+        Returns:
+            Decoded response
+            
+        Raises:
+            BOEAPIError: If request fails or the response doesn't match the schema
+        """
+        response = self._get(url, params)
+        return self._decode_typed_response(response, response_type)
+    
+    @staticmethod
+    def _decode_typed_response(response: Any, response_type: Type[T]) -> T:
+        """Decode a successful requests/httpx response for _make_typed_request"""
+        try:
+            result = boe_models_fast.decode(response_type, response.content)
+        except msgspec.DecodeError as e:
+            raise BOEAPIError(f"Invalid JSON response: {e}")
+        
+        if result.status.code != "200":
+            raise BOEAPIError(f"API Error {result.status.code}: {result.status.text}")
+        
+        return result
     
     def get_legislation_list(self, 
                            from_date: Optional[Union[str, date]] = None,
@@ -127,13 +384,11 @@ class BOEAPIClient:
         params = {}
         
         if from_date:
-            if isinstance(from_date, date):
-                from_date = from_date.strftime("%Y%m%d")
+            from_date = _to_yyyymmdd(from_date)
             params["from"] = from_date
             
         if to_date:
-            if isinstance(to_date, date):
-                to_date = to_date.strftime("%Y%m%d")
+            to_date = _to_yyyymmdd(to_date)
             params["to"] = to_date
             
         if query:
@@ -190,6 +445,9 @@ class BOEAPIClient:
         """
         Get complete consolidated text of legislation
         
+        Loads the whole document; use iter_legislation_text_blocks to
+        process large texts block by block.
+        
         Args:
             doc_id: Document identifier
             
@@ -199,6 +457,20 @@ class BOEAPIClient:
         url = f"{self.BASE_URL}/legislacion-consolidada/id/{doc_id}/texto"
         return self._make_request(url, accept="application/xml")
     
+    def iter_legislation_text_blocks(self, doc_id: str) -> Iterator[LET._Element]:
+        """
+        Stream the consolidated text of legislation block by block
+        
+        Args:
+            doc_id: Document identifier
+            
+        Returns:
+            Iterator of <bloque> elements, parsed as the document arrives.
+            Each element is cleared when the next one is requested.
+        """
+        url = f"{self.BASE_URL}/legislacion-consolidada/id/{doc_id}/texto"
+        return self._iterparse_xml(url, "bloque")
+    
     def get_legislation_text_index(self, doc_id: str) -> Dict[str, Any]:
         """
         Get index of legislation text blocks
@@ -236,12 +508,26 @@ class BOEAPIClient:
         Returns:
             BOE summary for the specified date
         """
-        if isinstance(date_str, date):
-            date_str = date_str.strftime("%Y%m%d")
+        date_str = _to_yyyymmdd(date_str)
             
         url = f"{self.BASE_URL}/boe/sumario/{date_str}"
         return self._make_request(url)
     
+    def get_boe_summary_typed(self, date_str: Union[str, date]) -> BOESummaryResponse:
+        """
+        Get BOE daily summary decoded into typed structs
+        
+        Args:
+            date_str: Date in YYYYMMDD format or date object
+            
+        Returns:
+            BOE summary for the specified date as a BOESummaryResponse
+        """
+        date_str = _to_yyyymmdd(date_str)
+            
+        url = f"{self.BASE_URL}/boe/sumario/{date_str}"
+        return self._make_typed_request(url, BOESummaryResponse)
+    
     def get_borme_summary(self, date_str: Union[str, date]) -> Dict[str, Any]:
         """
         Get BORME daily summary
@@ -252,8 +538,7 @@ class BOEAPIClient:
         Returns:
             BORME summary for the specified date
         """
-        if isinstance(date_str, date):
-            date_str = date_str.strftime("%Y%m%d")
+        date_str = _to_yyyymmdd(date_str)
             
         url = f"{self.BASE_URL}/borme/sumario/{date_str}"
         return self._make_request(url)
@@ -261,37 +546,37 @@ class BOEAPIClient:
     def get_subjects(self) -> Dict[str, Any]:
         """Get auxiliary data: subject matters"""
         url = f"{self.BASE_URL}/datos-auxiliares/materias"
-        return self._make_request(url)
+        return self._make_cached_request(url)
     
     def get_scopes(self) -> Dict[str, Any]:
         """Get auxiliary data: scopes (national/regional)"""
         url = f"{self.BASE_URL}/datos-auxiliares/ambitos"
-        return self._make_request(url)
+        return self._make_cached_request(url)
     
     def get_consolidation_states(self) -> Dict[str, Any]:
         """Get auxiliary data: consolidation states"""
         url = f"{self.BASE_URL}/datos-auxiliares/estados-consolidacion"
-        return self._make_request(url)
+        return self._make_cached_request(url)
     
     def get_departments(self) -> Dict[str, Any]:
         """Get auxiliary data: government departments"""
         url = f"{self.BASE_URL}/datos-auxiliares/departamentos"
-        return self._make_request(url)
+        return self._make_cached_request(url)
     
     def get_ranks(self) -> Dict[str, Any]:
         """Get auxiliary data: legal document ranks"""
         url = f"{self.BASE_URL}/datos-auxiliares/rangos"
-        return self._make_request(url)
+        return self._make_cached_request(url)
     
     def get_previous_relations(self) -> Dict[str, Any]:
         """Get auxiliary data: previous legal relations"""
         url = f"{self.BASE_URL}/datos-auxiliares/relaciones-anteriores"
-        return self._make_request(url)
+        return self._make_cached_request(url)
     
     def get_subsequent_relations(self) -> Dict[str, Any]:
         """Get auxiliary data: subsequent legal relations"""
         url = f"{self.BASE_URL}/datos-auxiliares/relaciones-posteriores"
-        return self._make_request(url)
+        return self._make_cached_request(url)
     
     def search_legislation(self, 
                          title_contains: Optional[str] = None,
@@ -345,12 +630,10 @@ class BOEAPIClient:
         if date_from or date_to:
             range_query = {}
             if date_from:
-                if isinstance(date_from, date):
-                    date_from = date_from.strftime("%Y%m%d")
+                date_from = _to_yyyymmdd(date_from)
                 range_query["gte"] = date_from
             if date_to:
-                if isinstance(date_to, date):
-                    date_to = date_to.strftime("%Y%m%d")
+                date_to = _to_yyyymmdd(date_to)
                 range_query["lte"] = date_to
                 
             if "query" not in query:
@@ -360,12 +643,165 @@ class BOEAPIClient:
         return self.get_legislation_list(query=query if query else None, limit=limit)
 
 
+class AsyncBOEAPIClient(BOEAPIClient):
+    """
+    Asynchronous BOE API client
+    
+    Same endpoints as BOEAPIClient, over a pooled httpx.AsyncClient (HTTP/2
+    when h2 is installed). Every endpoint method returns a coroutine, so
+    independent calls can run concurrently with asyncio.gather:
+    
+        async with AsyncBOEAPIClient() as client:
+            subjects, ranks = await asyncio.gather(
+                client.get_subjects(), client.get_ranks())
+    """
+    
+    def __init__(self, timeout: int = 30, max_retries: int = 3, retry_delay: float = 1.0,
+                 aux_cache_ttl: float = 86400,
+                 cache_path: Optional[str] = None):
+        """
+        Initialize the async BOE API client
+        
+        Args:
+            timeout: Request timeout in seconds
+            max_retries: Maximum number of retry attempts
+            retry_delay: Base delay for the exponential retry backoff in seconds
+            aux_cache_ttl: Seconds the auxiliary tables (subjects, ranks...) are reused
+            cache_path: SQLite file persisting those tables across runs
+                (None keeps them in memory only). Use a private, per-user
+                location: entries read from it are trusted.
+        """
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._init_aux_cache(aux_cache_ttl, cache_path)
+        
+        import httpx
+        self._httpx = httpx
+        self.client = httpx.AsyncClient(
+            # httpx only speaks HTTP/2 when h2 is installed
+            http2=importlib.util.find_spec("h2") is not None,
+            timeout=timeout,
+            limits=httpx.Limits(max_keepalive_connections=self.POOL_SIZE),
+            headers={'User-Agent': 'BOE-API-Client/1.0'}
+        )
+        
+        self.logger = logging.getLogger(__name__)
+    
+    async def __aenter__(self) -> 'AsyncBOEAPIClient':
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+    
+    async def aclose(self):
+        """Close the pooled HTTP connections and the aux-table cache file"""
+        await self.client.aclose()
+        with self._aux_cache_lock:
+            if self._aux_disk is not None:
+                self._aux_disk.close()
+                self._aux_disk = None
+    
+    async def _get(self, url: str, params: Optional[Dict] = None,
+                   accept: str = "application/json", stream: bool = False) -> "httpx.Response":
+        """Async version of BOEAPIClient._get, with the same retry policy"""
+        headers = {"Accept": accept}
+        
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.logger.debug(f"Making request to {url}, attempt {attempt + 1}")
+                request = self.client.build_request("GET", url, params=params, headers=headers)
+                response = await self.client.send(request, stream=stream)
+                    
+            except self._httpx.HTTPError as e:
+                self.logger.warning(f"Request failed (attempt {attempt + 1}): {e}")
+                if attempt < self.max_retries:
+                    await asyncio.sleep(self._backoff(attempt))
+                    continue
+                raise BOEAPIError(f"Request failed after {attempt + 1} attempts: {e}")
+            
+            if response.status_code in self.RETRY_STATUSES and attempt < self.max_retries:
+                self.logger.warning(f"Request failed (attempt {attempt + 1}): HTTP {response.status_code}")
+                await response.aclose()
+                await asyncio.sleep(self._backoff(attempt, response.headers.get("Retry-After")))
+                continue
+            
+            try:
+                response.raise_for_status()
+            except self._httpx.HTTPStatusError as e:
+                await response.aclose()
+                raise BOEAPIError(f"Request failed after {attempt + 1} attempts: {e}")
+            return response
+    
+    async def _make_request(self, url: str, params: Optional[Dict] = None,
+                            accept: str = "application/json") -> Dict[str, Any]:
+        response = await self._get(url, params, accept)
+        return self._decode_response(response, accept)
+    
+    async def _iterparse_xml(self, url: str, tag: str) -> AsyncIterator[LET._Element]:
+        """Async version of BOEAPIClient._iterparse_xml, fed through a pull parser"""
+        response = await self._get(url, accept="application/xml", stream=True)
+        parser = LET.XMLPullParser(events=('end',), tag=tag)
+        try:
+            async for chunk in response.aiter_bytes(self.STREAM_CHUNK_SIZE):
+                parser.feed(chunk)
+                for _, elem in parser.read_events():
+                    yield elem
+                    self._release(elem)
+            parser.close()
+            for _, elem in parser.read_events():
+                yield elem
+                self._release(elem)
+        except LET.XMLSyntaxError as e:
+            raise BOEAPIError(f"Invalid XML response: {e}")
+        finally:
+            await response.aclose()
+    
+    async def _make_cached_request(self, url: str) -> Dict[str, Any]:
+        # The SQLite file is only touched from a worker thread, never from
+        # the event loop
+        data = self._aux_memory_get(url)
+        if data is None and self.cache_path:
+            data = await asyncio.to_thread(self._aux_cache_get, url)
+        if data is None:
+            data = await self._make_request(url)
+            if self.cache_path:
+                await asyncio.to_thread(self._aux_cache_put, url, data)
+            else:
+                self._aux_cache_put(url, data)
+        return data
+    
+    async def _make_typed_request(self, url: str, response_type: Type[T],
+                                  params: Optional[Dict] = None) -> T:
+        response = await self._get(url, params)
+        return self._decode_typed_response(response, response_type)
+    
+    async def get_all_legislation_parts(self, doc_id: str) -> Dict[str, Any]:
+        """
+        Get metadata, analysis and text index of a legislation document concurrently
+        
+        Args:
+            doc_id: Document identifier
+            
+        Returns:
+            Dict with "metadata", "analysis" and "text_index" responses
+        """
+        metadata, analysis, text_index = await asyncio.gather(
+            self.get_legislation_metadata(doc_id),
+            self.get_legislation_analysis(doc_id),
+            self.get_legislation_text_index(doc_id)
+        )
+        return {"metadata": metadata, "analysis": analysis, "text_index": text_index}
+
+
 class BOEQueryBuilder:
     """Helper class to build complex search queries"""
     
     def __init__(self):
         self.query = {"query": {}}
         self.sort = []
+        # query_string conditions, joined once in build()
+        self._conditions: List[str] = []
     
     def title_contains(self, text: str) -> 'BOEQueryBuilder':
         """Add title search condition"""
@@ -394,10 +830,8 @@ class BOEQueryBuilder:
     
     def date_range(self, from_date: Union[str, date], to_date: Union[str, date]) -> 'BOEQueryBuilder':
         """Add publication date range"""
-        if isinstance(from_date, date):
-            from_date = from_date.strftime("%Y%m%d")
-        if isinstance(to_date, date):
-            to_date = to_date.strftime("%Y%m%d")
+        from_date = _to_yyyymmdd(from_date)
+        to_date = _to_yyyymmdd(to_date)
             
         range_query = {"gte": from_date, "lte": to_date}
         self.query["query"]["range"] = {"fecha_publicacion": range_query}
@@ -411,17 +845,12 @@ class BOEQueryBuilder:
     
     def _add_query_string(self, condition: str):
         """Add query string condition"""
-        if "query_string" not in self.query["query"]:
-            self.query["query"]["query_string"] = {"query": ""}
-        
-        current = self.query["query"]["query_string"]["query"]
-        if current:
-            self.query["query"]["query_string"]["query"] = f"{current} and {condition}"
-        else:
-            self.query["query"]["query_string"]["query"] = condition
+        self._conditions.append(condition)
     
     def build(self) -> Dict:
         """Build the final query"""
+        if self._conditions:
+            self.query["query"]["query_string"] = {"query": " and ".join(self._conditions)}
         result = dict(self.query)
         if self.sort:
             result["sort"] = self.sort
@@ -4,53 +4,81 @@ Pydantic models for BOE API data structures
 Type-safe models for Spanish Official State Gazette (BOE) API responses
 """
 
-from pydantic import BaseModel, Field, HttpUrl, validator
-from typing import Optional, List, Dict, Any, Union
+from pydantic import AfterValidator, BaseModel, ConfigDict, Field, PrivateAttr, model_validator
+from pydantic.dataclasses import dataclass
+from typing import Annotated, Optional, List, Dict, Any, Union
 from datetime import datetime, date
 from enum import Enum
+from functools import lru_cache
 
 
-class StatusModel(BaseModel):
+class BOEModel(BaseModel):
+    """Base for BOE response models (immutable once validated)"""
+    model_config = ConfigDict(frozen=True)
+
+
+# Small, very frequent leaf types are slotted dataclasses: no per-instance __dict__
+_leaf = dataclass(frozen=True, slots=True, kw_only=True)
+
+
+class StatusModel(BOEModel):
     """API response status"""
     code: str
     text: str
 
 
-class CodeTextPair(BaseModel):
+@_leaf
+class CodeTextPair:
     """Common structure for code-text pairs"""
-    codigo: str = Field(alias="codigo")
-    texto: str = Field(alias="texto")
-    
-    model_config = {"populate_by_name": True}
+    codigo: str
+    texto: str
 
 
+@_leaf
 class Scope(CodeTextPair):
     """Legal scope (Estatal/Autonómico)"""
     pass
 
 
+@_leaf
 class Department(CodeTextPair):
     """Government department"""
     pass
 
 
+@_leaf
 class Rank(CodeTextPair):
     """Legal document rank (Ley, Real Decreto, etc.)"""
     pass
 
 
+@_leaf
 class ConsolidationState(CodeTextPair):
     """Consolidation state"""
     pass
 
 
-class LegislationMetadata(BaseModel):
+# Code-text pairs have tiny cardinality (a few dozen scopes, departments,
+# ranks...) but appear once per legislation item, so validated instances
+# are interned and shared. Safe because the leaf types are frozen.
+_CODE_TEXT_CACHE: Dict[tuple, CodeTextPair] = {}
+
+
+def _intern_code_text(pair: CodeTextPair) -> CodeTextPair:
+    key = (type(pair), pair.codigo, pair.texto)
+    return _CODE_TEXT_CACHE.setdefault(key, pair)
+
+
+Interned = AfterValidator(_intern_code_text)
+
+
+class LegislationMetadata(BOEModel):
     """Metadata for a piece of legislation"""
     fecha_actualizacion: str = Field(description="Last update timestamp (ISO 8601)")
     identificador: str = Field(description="Unique document identifier")
-    ambito: Scope = Field(description="Legal scope")
-    departamento: Department = Field(description="Government department")
-    rango: Rank = Field(description="Document rank")
+    ambito: Annotated[Scope, Interned] = Field(description="Legal scope")
+    departamento: Annotated[Department, Interned] = Field(description="Government department")
+    rango: Annotated[Rank, Interned] = Field(description="Document rank")
     fecha_disposicion: Optional[str] = Field(None, description="Disposition date (YYYYMMDD)")
     numero_oficial: Optional[str] = Field(None, description="Official number")
     titulo: str = Field(description="Title")
@@ -63,47 +91,40 @@ class LegislationMetadata(BaseModel):
     estatus_anulacion: Optional[str] = Field(None, description="Annulment status (S/N)")
     fecha_anulacion: Optional[str] = Field(None, description="Annulment date (YYYYMMDD)")
     vigencia_agotada: str = Field(description="Validity exhausted (S/N)")
-    estado_consolidacion: ConsolidationState = Field(description="Consolidation state")
-    url_eli: Optional[HttpUrl] = Field(None, description="ELI permalink")
-    url_html_consolidada: HttpUrl = Field(description="HTML consolidated URL")
-    
-    @validator('fecha_actualizacion', 'fecha_disposicion', 'fecha_publicacion', 
-              'fecha_vigencia', 'fecha_derogacion', 'fecha_anulacion', pre=True)
-    def validate_dates(cls, v):
-        """Validate date formats"""
-        if v is None:
-            return v
-        if isinstance(v, str) and len(v) >= 8:
-            return v
-        return v
-
-
-class Subject(BaseModel):
+    estado_consolidacion: Annotated[ConsolidationState, Interned] = Field(description="Consolidation state")
+    url_eli: Optional[str] = Field(None, description="ELI permalink")
+    url_html_consolidada: str = Field(description="HTML consolidated URL")
+
+
+@_leaf
+class Subject:
     """Legal subject matter"""
     codigo: str = Field(description="Subject code")
     texto: str = Field(description="Subject description")
 
 
-class Note(BaseModel):
+@_leaf
+class Note:
     """Legislation note"""
     texto: str = Field(description="Note text")
 
 
-class LegalReference(BaseModel):
+class LegalReference(BOEModel):
     """Reference to other legislation"""
     id_norma: str = Field(description="Referenced legislation ID")
-    relacion: CodeTextPair = Field(description="Type of relation")
+    relacion: Annotated[CodeTextPair, Interned] = Field(description="Type of relation")
     texto: str = Field(description="Relation description text")
 
 
-class LegislationAnalysis(BaseModel):
+class LegislationAnalysis(BOEModel):
     """Analysis data for legislation"""
     materias: Optional[List[Subject]] = Field(None, description="Subject matters")
     notas: Optional[List[Note]] = Field(None, description="Notes")
     referencias: Optional[Dict[str, List[LegalReference]]] = Field(None, description="Legal references")
 
 
-class TextVersion(BaseModel):
+@_leaf
+class TextVersion:
     """Version of legislation text"""
     fecha_publicacion: str = Field(description="Publication date (YYYYMMDD)")
     fecha_vigencia: Optional[str] = Field(None, description="Effective date (YYYYMMDD)")
@@ -111,7 +132,7 @@ class TextVersion(BaseModel):
     content: str = Field(description="HTML content")
 
 
-class TextBlock(BaseModel):
+class TextBlock(BOEModel):
     """Block of legislation text"""
     id: str = Field(description="Block ID")
     tipo: str = Field(description="Block type")
@@ -120,78 +141,86 @@ class TextBlock(BaseModel):
     versiones: List[TextVersion] = Field(description="Text versions")
 
 
-class LegislationText(BaseModel):
+class LegislationText(BOEModel):
     """Complete legislation text structure"""
     bloques: List[TextBlock] = Field(description="Text blocks")
 
 
-class TextIndexItem(BaseModel):
+class TextIndexItem(BOEModel):
     """Text index item"""
     id: str = Field(description="Block ID")
     titulo: str = Field(description="Block title") 
     fecha_actualizacion: str = Field(description="Last update date (YYYYMMDD)")
-    url: HttpUrl = Field(description="Block URL")
+    url: str = Field(description="Block URL")
 
 
-class PDFInfo(BaseModel):
+class PDFInfo(BOEModel):
     """PDF file information"""
     szBytes: str = Field(description="Size in bytes")
     szKBytes: str = Field(description="Size in KB")
     pagina_inicial: Optional[str] = Field(None, description="Start page")
     pagina_final: Optional[str] = Field(None, description="End page")
-    texto: HttpUrl = Field(description="PDF URL")
+    texto: str = Field(description="PDF URL")
 
 
-class BOEItem(BaseModel):
+class BOEItem(BOEModel):
     """Individual BOE item"""
     identificador: str = Field(description="Item ID")
     control: str = Field(description="Control number")
     titulo: str = Field(description="Item title")
     url_pdf: PDFInfo = Field(description="PDF information")
-    url_html: HttpUrl = Field(description="HTML URL")
-    url_xml: HttpUrl = Field(description="XML URL")
+    url_html: str = Field(description="HTML URL")
+    url_xml: str = Field(description="XML URL")
 
 
-class BOEEpigraph(BaseModel):
+class BOEEpigraph(BOEModel):
     """BOE epigraph/section"""
     nombre: str = Field(description="Epigraph name")
-    item: Union[BOEItem, List[BOEItem]] = Field(description="Items in this epigraph")
+    item: List[BOEItem] = Field(description="Items in this epigraph")
+    
+    @model_validator(mode="before")
+    @classmethod
+    def wrap_single_item(cls, data: Any) -> Any:
+        """The API sends a bare object when an epigraph has one item; always use a list"""
+        if isinstance(data, dict) and isinstance(data.get("item"), dict):
+            data = {**data, "item": [data["item"]]}
+        return data
 
 
-class BOEDepartment(BaseModel):
+class BOEDepartment(BOEModel):
     """BOE department section"""
     codigo: str = Field(description="Department code")
     nombre: str = Field(description="Department name")
     epigrafe: List[BOEEpigraph] = Field(description="Epigraphs")
 
 
-class BOESection(BaseModel):
+class BOESection(BOEModel):
     """BOE section"""
     codigo: str = Field(description="Section code")
     nombre: str = Field(description="Section name")
     departamento: List[BOEDepartment] = Field(description="Departments")
 
 
-class BOEDiary(BaseModel):
+class BOEDiary(BOEModel):
     """BOE diary information"""
     numero: str = Field(description="Diary number")
     sumario_diario: Dict[str, Any] = Field(description="Daily summary info")
     seccion: List[BOESection] = Field(description="Sections")
 
 
-class BOESummaryMetadata(BaseModel):
+class BOESummaryMetadata(BOEModel):
     """BOE summary metadata"""
     publicacion: str = Field(description="Publication name")
     fecha_publicacion: str = Field(description="Publication date (YYYYMMDD)")
 
 
-class BOESummary(BaseModel):
+class BOESummary(BOEModel):
     """BOE daily summary"""
     metadatos: BOESummaryMetadata = Field(description="Metadata")
     diario: List[BOEDiary] = Field(description="Diary entries")
 
 
-class BOEResponse(BaseModel):
+class BOEResponse(BOEModel):
     """Generic BOE API response"""
     status: StatusModel = Field(description="Response status")
     data: Any = Field(description="Response data")
@@ -232,39 +261,21 @@ class SearchQuery(BaseModel):
     query: Optional[Dict[str, Any]] = None
     sort: Optional[List[Dict[str, str]]] = None
     
+    # Conditions are collected here and joined once in to_dict()
+    _conditions: List[str] = PrivateAttr(default_factory=list)
+    _range: Optional[Dict[str, Any]] = PrivateAttr(default=None)
+    
     def add_title_search(self, text: str):
         """Add title search condition"""
-        if not self.query:
-            self.query = {"query_string": {"query": ""}}
-        elif "query_string" not in self.query:
-            self.query["query_string"] = {"query": ""}
-            
-        current = self.query["query_string"]["query"]
-        condition = f"titulo:{text}"
-        
-        if current:
-            self.query["query_string"]["query"] = f"{current} and {condition}"
-        else:
-            self.query["query_string"]["query"] = condition
+        self._conditions.append(f"titulo:{text}")
     
     def add_subject_codes(self, codes: List[int]):
         """Add subject code search"""
         if not codes:
             return
-            
-        if not self.query:
-            self.query = {"query_string": {"query": ""}}
-        elif "query_string" not in self.query:
-            self.query["query_string"] = {"query": ""}
-            
-        current = self.query["query_string"]["query"]
-        subject_conditions = " or ".join([f"materia@codigo:{code}" for code in codes])
-        condition = f"({subject_conditions})"
         
-        if current:
-            self.query["query_string"]["query"] = f"{current} and {condition}"
-        else:
-            self.query["query_string"]["query"] = condition
+        subject_conditions = " or ".join(f"materia@codigo:{code}" for code in codes)
+        self._conditions.append(f"({subject_conditions})")
     
     def add_date_range(self, from_date: Union[str, date], to_date: Union[str, date]):
         """Add publication date range"""
@@ -272,11 +283,8 @@ class SearchQuery(BaseModel):
             from_date = from_date.strftime("%Y%m%d")
         if isinstance(to_date, date):
             to_date = to_date.strftime("%Y%m%d")
-            
-        if not self.query:
-            self.query = {}
-            
-        self.query["range"] = {
+        
+        self._range = {
             "fecha_publicacion": {
                 "gte": from_date,
                 "lte": to_date
@@ -293,9 +301,19 @@ class SearchQuery(BaseModel):
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for API request"""
+        query = dict(self.query) if self.query else {}
+        
+        if self._conditions:
+            existing = query.get("query_string", {}).get("query")
+            conditions = [existing, *self._conditions] if existing else self._conditions
+            query["query_string"] = {"query": " and ".join(conditions)}
+        
+        if self._range:
+            query["range"] = self._range
+        
         result = {}
-        if self.query:
-            result["query"] = self.query
+        if query:
+            result["query"] = query
         if self.sort:
             result["sort"] = self.sort
         return result
@@ -333,8 +351,17 @@ def parse_boe_date(date_str: Optional[str]) -> Optional[date]:
     """Parse BOE date format (YYYYMMDD) to Python date"""
     if not date_str or len(date_str) != 8:
         return None
+    return _parse_boe_date_cached(date_str)
+
+
+@lru_cache(maxsize=4096)
+def _parse_boe_date_cached(date_str: str) -> Optional[date]:
+    # BOE responses repeat the same few dates across many items.
+    # Fixed-width digits, so slice directly instead of going through strptime.
+    if not date_str.isdigit():
+        return None
     try:
-        return datetime.strptime(date_str, "%Y%m%d").date()
+        return date(int(date_str[0:4]), int(date_str[4:6]), int(date_str[6:8]))
     except ValueError:
         return None
 
@@ -350,7 +377,17 @@ def parse_boe_datetime(datetime_str: str) -> Optional[datetime]:
     """Parse BOE datetime format (YYYYMMDDTHHMMSSZ) to Python datetime"""
     if not datetime_str or len(datetime_str) < 15:
         return None
+    return _parse_boe_datetime_cached(datetime_str)
+
+
+@lru_cache(maxsize=4096)
+def _parse_boe_datetime_cached(datetime_str: str) -> Optional[datetime]:
+    s = datetime_str
+    if (len(s) != 16 or s[8] != "T" or s[15] != "Z"
+            or not s[0:8].isdigit() or not s[9:15].isdigit()):
+        return None
     try:
-        return datetime.strptime(datetime_str, "%Y%m%dT%H%M%SZ")
+        return datetime(int(s[0:4]), int(s[4:6]), int(s[6:8]),
+                        int(s[9:11]), int(s[11:13]), int(s[13:15]))
     except ValueError:
-        return None
\ No newline at end of file
+        return None
@@ -0,0 +1,210 @@
+"""
+msgspec models for BOE API responses
+
+Decode-only mirrors of the response types in boe_models.py. Raw JSON bytes
+are decoded and validated in a single C pass, without the per-field
+validation overhead of pydantic. URLs are kept as plain strings (BOE URLs
+come from a trusted, fixed domain).
+
+Use the pydantic models in boe_models.py when pydantic semantics are needed;
+to_pydantic() converts a decoded struct into its pydantic counterpart.
+"""
+
+from typing import Optional, List, Dict, Any, Union, Type, TypeVar
+
+import msgspec
+
+
+class StatusModel(msgspec.Struct, frozen=True, gc=False):
+    """API response status"""
+    code: str
+    text: str
+
+
+class CodeTextPair(msgspec.Struct, frozen=True, gc=False):
+    """Common structure for code-text pairs"""
+    codigo: str
+    texto: str
+
+
+class Scope(CodeTextPair, frozen=True, gc=False):
+    """Legal scope (Estatal/Autonómico)"""
+    pass
+
+
+class Department(CodeTextPair, frozen=True, gc=False):
+    """Government department"""
+    pass
+
+
+class Rank(CodeTextPair, frozen=True, gc=False):
+    """Legal document rank (Ley, Real Decreto, etc.)"""
+    pass
+
+
+class ConsolidationState(CodeTextPair, frozen=True, gc=False):
+    """Consolidation state"""
+    pass
+
+
+class LegislationMetadata(msgspec.Struct, frozen=True, gc=False, kw_only=True):
+    """Metadata for a piece of legislation"""
+    fecha_actualizacion: str
+    identificador: str
+    ambito: Scope
+    departamento: Department
+    rango: Rank
+    fecha_disposicion: Optional[str] = None
+    numero_oficial: Optional[str] = None
+    titulo: str
+    diario: str
+    fecha_publicacion: str
+    diario_numero: str
+    fecha_vigencia: Optional[str] = None
+    estatus_derogacion: Optional[str] = None
+    fecha_derogacion: Optional[str] = None
+    estatus_anulacion: Optional[str] = None
+    fecha_anulacion: Optional[str] = None
+    vigencia_agotada: str
+    estado_consolidacion: ConsolidationState
+    url_eli: Optional[str] = None
+    url_html_consolidada: str
+
+
+class TextIndexItem(msgspec.Struct, frozen=True, gc=False):
+    """Text index item"""
+    id: str
+    titulo: str
+    fecha_actualizacion: str
+    url: str
+
+
+class PDFInfo(msgspec.Struct, frozen=True, gc=False, kw_only=True):
+    """PDF file information"""
+    szBytes: str
+    szKBytes: str
+    pagina_inicial: Optional[str] = None
+    pagina_final: Optional[str] = None
+    texto: str
+
+
+class BOEItem(msgspec.Struct, frozen=True, gc=False):
+    """Individual BOE item"""
+    identificador: str
+    control: str
+    titulo: str
+    url_pdf: PDFInfo
+    url_html: str
+    url_xml: str
+
+
+class BOEEpigraph(msgspec.Struct, frozen=True, gc=False):
+    """BOE epigraph/section"""
+    nombre: str
+    # The API sends a bare object when there's a single item; it is wrapped
+    # on decode so `item` is always a list
+    item: Union[BOEItem, List[BOEItem]]
+
+    def __post_init__(self):
+        if isinstance(self.item, BOEItem):
+            msgspec.structs.force_setattr(self, "item", [self.item])
+
+
+class BOEDepartment(msgspec.Struct, frozen=True, gc=False):
+    """BOE department section"""
+    codigo: str
+    nombre: str
+    epigrafe: List[BOEEpigraph]
+
+
+class BOESection(msgspec.Struct, frozen=True, gc=False):
+    """BOE section"""
+    codigo: str
+    nombre: str
+    departamento: List[BOEDepartment]
+
+
+class BOEDiary(msgspec.Struct, frozen=True, gc=False):
+    """BOE diary information"""
+    numero: str
+    sumario_diario: Dict[str, Any]
+    seccion: List[BOESection]
+
+
+class BOESummaryMetadata(msgspec.Struct, frozen=True, gc=False):
+    """BOE summary metadata"""
+    publicacion: str
+    fecha_publicacion: str
+
+
+class BOESummary(msgspec.Struct, frozen=True, gc=False):
+    """BOE daily summary"""
+    metadatos: BOESummaryMetadata
+    diario: List[BOEDiary]
+
+
+class LegislationListResponse(msgspec.Struct, frozen=True, gc=False):
+    """Response for legislation list"""
+    status: StatusModel
+    data: List[LegislationMetadata]
+
+
+class TextIndexResponse(msgspec.Struct, frozen=True, gc=False):
+    """Response for text index"""
+    status: StatusModel
+    data: List[TextIndexItem]
+
+
+class BOESummaryResponse(msgspec.Struct, frozen=True, gc=False):
+    """Response for BOE summary"""
+    status: StatusModel
+    data: Dict[str, BOESummary]
+
+
+class AuxiliaryDataResponse(msgspec.Struct, frozen=True, gc=False):
+    """Response for auxiliary data"""
+    status: StatusModel
+    data: Dict[str, str]  # Code -> Description mapping
+
+
+T = TypeVar("T")
+
+# Decoders compile their schema on construction, so build each one once
+# at import and reuse it for the lifetime of the process
+SUMMARY_DECODER = msgspec.json.Decoder(BOESummaryResponse)
+LEGISLATION_LIST_DECODER = msgspec.json.Decoder(LegislationListResponse)
+TEXT_INDEX_DECODER = msgspec.json.Decoder(TextIndexResponse)
+AUX_DECODER = msgspec.json.Decoder(AuxiliaryDataResponse)
+
+_DECODERS: Dict[type, msgspec.json.Decoder] = {
+    BOESummaryResponse: SUMMARY_DECODER,
+    LegislationListResponse: LEGISLATION_LIST_DECODER,
+    TextIndexResponse: TEXT_INDEX_DECODER,
+    AuxiliaryDataResponse: AUX_DECODER,
+}
+
+
+def decode(response_type: Type[T], raw: bytes) -> T:
+    """
+    Decode raw JSON bytes into a response struct
+
+    Args:
+        response_type: One of the response structs defined in this module
+        raw: Raw JSON response body
+
+    Returns:
+        Decoded and validated struct
+
+    Raises:
+        ValueError: If no decoder is registered for response_type
+        msgspec.ValidationError: If the payload doesn't match the schema
+    """
+    decoder = _DECODERS.get(response_type)
+    if decoder is None:
+        raise ValueError(f"No decoder registered for {response_type.__name__}")
+    return decoder.decode(raw)
+
+
+def to_pydantic(model_cls, obj: msgspec.Struct):
+    """Convert a decoded struct into the equivalent pydantic model from boe_models"""
+    return model_cls.model_validate(msgspec.to_builtins(obj))
@@ -5,143 +5,325 @@ Parser for CODICE XML format used in PLACSP.
 Extracts relevant fields for the Grant model.
 """
 
-import xml.etree.ElementTree as ET
-from typing import Dict, Any, Optional, List
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Optional, List, Iterator, IO, Union
 import logging
 from datetime import datetime
 
+from lxml import etree as LET
+
+NAMESPACES = {
+    'atom': 'http://www.w3.org/2005/Atom',
+    'cac': 'urn:dgpe:names:draft:codice:schema:xsd:CommonAggregateComponents-2',
+    'cbc': 'urn:dgpe:names:draft:codice:schema:xsd:CommonBasicComponents-2',
+    'cac-place-ext': 'urn:dgpe:names:draft:codice-place-ext:schema:xsd:CommonAggregateComponents-2',
+    'cbc-place-ext': 'urn:dgpe:names:draft:codice-place-ext:schema:xsd:CommonBasicComponents-2',
+}
+
+# Department fallback from the Atom summary ("...; Órgano de Contratación: X; ...").
+# Anchored to the start of a ';'-separated fragment so the key only matches
+# as a field name, not inside another field's value.
+_DEPARTMENT_RE = re.compile(r'(?:^|;)\s*Órgano de Contratación:\s*([^;]+)')
+
+
+def _tag(prefix: str, local: str) -> str:
+    """Clark-notation tag name ('{uri}Local') for use with Element.iter()"""
+    return '{%s}%s' % (NAMESPACES[prefix], local)
+
+
+# Tags walked with iter() instead of descendant ('//') XPath steps
+_TAG_ATTACHMENT = _tag('cac', 'Attachment')
+_TAG_URI = _tag('cbc', 'URI')
+_TAG_COMMODITY_CLASSIFICATION = _tag('cac', 'RequiredCommodityClassification')
+_TAG_CLASSIFICATION_CODE = _tag('cbc', 'ItemClassificationCode')
+_TAG_REALIZED_LOCATION = _tag('cac', 'RealizedLocation')
+_TAG_COUNTRY_SUBENTITY = _tag('cbc', 'CountrySubentity')
+_TAG_END_DATE = _tag('cbc', 'EndDate')
+_TAG_END_TIME = _tag('cbc', 'EndTime')
+
+
+def _set_text(field: str):
+    def setter(data: 'ParsedEntry', elem: LET._Element):
+        setattr(data, field, elem.text)
+    return setter
+
+
+def _set_summary(data: 'ParsedEntry', elem: LET._Element):
+    data.summary = elem.text or None
+
+
+def _set_link(data: 'ParsedEntry', elem: LET._Element):
+    data.link = elem.get('href')
+
+
+# Direct Atom children of an <entry>, by tag: filled in one pass over the
+# children instead of one XPath evaluation per field
+_ENTRY_DISPATCH = {
+    _tag('atom', 'id'): _set_text('id'),
+    _tag('atom', 'title'): _set_text('title'),
+    _tag('atom', 'updated'): _set_text('updated'),
+    # PLACSP doesn't always specify rel="alternate", so just get the first link
+    _tag('atom', 'link'): _set_link,
+    _tag('atom', 'summary'): _set_summary,
+}
+
+
+def _first(xpath: LET.XPath, node: LET._Element) -> Optional[LET._Element]:
+    """Evaluate a compiled XPath and return the first matching element (or None)"""
+    result = xpath(node)
+    return result[0] if result else None
+
+
+class ParsedEntry:
+    """
+    Data extracted from a single PLACSP entry.
+
+    Slotted record instead of a per-entry dict. Fields not found in the
+    entry are None. Supports data['key'] and data.get('key', default) for
+    dict-style callers, and to_dict() where a real dict is needed.
+    """
+
+    __slots__ = (
+        'id', 'title', 'updated', 'link', 'summary', 'folder_id', 'department',
+        'budget_amount', 'currency', 'contract_type', 'cpv_codes', 'regions',
+        'application_end_date', 'pdf_url', 'documents',
+    )
+
+    def __init__(self):
+        for field in self.__slots__:
+            setattr(self, field, None)
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = getattr(self, key, None)
+        return default if value is None else value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __repr__(self) -> str:
+        return f"ParsedEntry({self.to_dict()!r})"
+
+
 class CODICEParser:
     """
     Parser for CODICE XML structures.
+
+    Works on lxml elements (e.g. from PLACSPClient.fetch_feed) and evaluates
+    XPath expressions compiled once per parser instance.
     """
     
-    NAMESPACES = {
-        'atom': 'http://www.w3.org/2005/Atom',
-        'cac': 'urn:dgpe:names:draft:codice:schema:xsd:CommonAggregateComponents-2',
-        'cbc': 'urn:dgpe:names:draft:codice:schema:xsd:CommonBasicComponents-2',
-        'cac-place-ext': 'urn:dgpe:names:draft:codice-place-ext:schema:xsd:CommonAggregateComponents-2',
-        'cbc-place-ext': 'urn:dgpe:names:draft:codice-place-ext:schema:xsd:CommonBasicComponents-2',
+    NAMESPACES = NAMESPACES
+
+    # name -> expression; each is compiled into a callable `self._xp_<name>`
+    XPATHS = {
+        'folder_status': './/cac-place-ext:ContractFolderStatus',
+        'folder_id': 'cbc:ContractFolderID',
+        'party': './/cac-place-ext:LocatedContractingParty',
+        'party_name': './/cac:PartyName/cbc:Name',
+        'party_party_name': './/cac:Party//cac:PartyName/cbc:Name',
+        'project': './/cac:ProcurementProject',
+        'name': 'cbc:Name',
+        'budget': './/cac:BudgetAmount/cbc:TotalAmount',
+        'type_code': 'cbc:TypeCode',
+        'process': './/cac:TenderingProcess',
+        'deadline_period': './/cac:TenderSubmissionDeadlinePeriod',
     }
 
     def __init__(self):
         self.logger = logging.getLogger(__name__)
 
-    def parse_entry(self, entry: ET.Element) -> Dict[str, Any]:
+        # Plain instance attributes rather than a dict lookup per call:
+        # the hot path is then a single C call, e.g. self._xp_budget(project)
+        for name, expr in self.XPATHS.items():
+            setattr(self, f'_xp_{name}', LET.XPath(expr, namespaces=self.NAMESPACES))
+
+    def parse_entry(self, entry: LET._Element) -> ParsedEntry:
         """
         Parse a PLACSP Atom entry and extract grant-like data.
         """
-        data = {}
+        data = ParsedEntry()
         
-        # 1. Basic Atom Fields
-        id_elem = entry.find('atom:id', self.NAMESPACES)
-        title_elem = entry.find('atom:title', self.NAMESPACES)
-        updated_elem = entry.find('atom:updated', self.NAMESPACES)
-        # Link - PLACSP doesn't always specify rel="alternate", so just get the first link
-        link_elem = entry.find("atom:link", self.NAMESPACES)
-        
-        data['id'] = id_elem.text if id_elem is not None else None
-        data['title'] = title_elem.text if title_elem is not None else None
-        data['updated'] = updated_elem.text if updated_elem is not None else None
-        data['link'] = link_elem.get('href') if link_elem is not None else None
+        # 1. Basic Atom Fields (and summary)
+        # Walked last to first so that, as with a find(), the first element
+        # of each kind is the one that sticks
+        for child in reversed(entry):
+            setter = _ENTRY_DISPATCH.get(child.tag)
+            if setter is not None:
+                setter(data, child)
 
         # 2. CODICE Fields (ContractFolderStatus)
-        # Extract summary from Atom entry if available
-        summary_elem = entry.find('atom:summary', self.NAMESPACES)
-        if summary_elem is not None and summary_elem.text:
-            data['summary'] = summary_elem.text
-        
         # Parse ContractFolderStatus (the main content)
-        folder_status = entry.find('.//cac-place-ext:ContractFolderStatus', self.NAMESPACES)
+        folder_status = _first(self._xp_folder_status, entry)
         
         if folder_status is not None:
             self._parse_folder_status(folder_status, data)
         else:
-            self.logger.debug(f"No ContractFolderStatus found for entry {data.get('id')}")
+            self.logger.debug(f"No ContractFolderStatus found for entry {data.id}")
             
         return data
 
-    def _parse_folder_status(self, folder: ET.Element, data: Dict[str, Any]):
+    def iter_parse_feed(self, source: Union[str, IO[bytes]]) -> Iterator[ParsedEntry]:
+        """
+        Stream-parse an Atom feed, yielding parsed data for each entry.
+
+        Each entry is cleared (and detached from the tree) once parsed, so
+        memory stays bounded by a single entry regardless of feed size.
+        Prefer this over parsing the whole feed and looping over
+        root.findall('atom:entry') for large feeds.
+
+        Args:
+            source: File path or binary file-like object with the feed XML
+        """
+        for entry in self._iter_entry_elements(source):
+            yield self.parse_entry(entry)
+
+    def parse_feed_parallel(
+        self,
+        source: Union[str, IO[bytes]],
+        workers: Optional[int] = None,
+        chunk_size: int = 1000
+    ) -> List[ParsedEntry]:
+        """
+        Parse a (large) Atom feed across several processes.
+
+        Entries are streamed with iterparse, serialized in chunks of
+        chunk_size and parsed in a process pool. Entries are independent,
+        so this scales with the number of cores. For small feeds the
+        process start-up cost dominates; use iter_parse_feed instead.
+
+        Args:
+            source: File path or binary file-like object with the feed XML
+            workers: Number of worker processes (defaults to os.cpu_count())
+            chunk_size: Number of entries sent to a worker at a time
+
+        Returns:
+            Parsed entries, in feed order
+        """
+        futures = []
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            chunk = []
+            for entry in self._iter_entry_elements(source):
+                chunk.append(LET.tostring(entry))
+                if len(chunk) >= chunk_size:
+                    futures.append(pool.submit(_parse_entry_chunk, chunk))
+                    chunk = []
+            if chunk:
+                futures.append(pool.submit(_parse_entry_chunk, chunk))
+
+            results = []
+            for future in futures:
+                results.extend(future.result())
+        return results
+
+    def _iter_entry_elements(self, source: Union[str, IO[bytes]]) -> Iterator[LET._Element]:
+        """Yield Atom <entry> elements one at a time, freeing each after use"""
+        context = LET.iterparse(
+            source,
+            events=('end',),
+            tag='{%s}entry' % self.NAMESPACES['atom']
+        )
+        for _, entry in context:
+            yield entry
+            entry.clear()
+            while entry.getprevious() is not None:
+                del entry.getparent()[0]
+        del context
+
+    def _parse_folder_status(self, folder: LET._Element, data: ParsedEntry):
         """Extract data from ContractFolderStatus"""
         
         # ContractFolderID (in cbc namespace)
-        folder_id = folder.find('cbc:ContractFolderID', self.NAMESPACES)
+        folder_id = _first(self._xp_folder_id, folder)
         if folder_id is not None:
-            data['folder_id'] = folder_id.text
+            data.folder_id = folder_id.text
 
         # 3. Department (LocatedContractingParty)
         # Try multiple paths for department
-        party = folder.find('.//cac-place-ext:LocatedContractingParty', self.NAMESPACES)
+        party = _first(self._xp_party, folder)
         if party is not None:
             # Try PartyName/Name
-            party_name = party.find('.//cac:PartyName/cbc:Name', self.NAMESPACES)
+            party_name = _first(self._xp_party_name, party)
             if party_name is not None and party_name.text:
-                data['department'] = party_name.text
+                data.department = party_name.text
             else:
                 # Try Party/PartyName/Name
-                party_name = party.find('.//cac:Party//cac:PartyName/cbc:Name', self.NAMESPACES)
+                party_name = _first(self._xp_party_party_name, party)
                 if party_name is not None and party_name.text:
-                    data['department'] = party_name.text
+                    data.department = party_name.text
 
         # If still no department, try to extract from summary
-        if not data.get('department') and data.get('summary'):
+        if not data.department and data.summary:
             # Summary format: Id licitación: ...; Órgano de Contratación: ...; Importe: ...
-            parts = data['summary'].split(';')
-            for part in parts:
-                if 'Órgano de Contratación:' in part:
-                    data['department'] = part.split(':', 1)[1].strip()
-                    break
+            match = _DEPARTMENT_RE.search(data.summary)
+            if match:
+                data.department = match.group(1).strip()
 
         # 4. Budget Amount
         # ProcurementProject (Main details)
         # ProcurementProject is in cac
-        project = folder.find('.//cac:ProcurementProject', self.NAMESPACES)
+        project = _first(self._xp_project, folder)
         if project is not None:
             # Name (Title)
-            name = project.find('cbc:Name', self.NAMESPACES)
+            name = _first(self._xp_name, project)
             if name is not None:
-                data['title'] = name.text
+                data.title = name.text
                 
             # Budget
-            budget = project.find('.//cac:BudgetAmount/cbc:TotalAmount', self.NAMESPACES)
-            if budget is not None:
+            budget = _first(self._xp_budget, project)
+            if budget is not None and budget.text:
                 try:
-                    data['budget_amount'] = float(budget.text)
-                    data['currency'] = budget.get('currencyID')
-                except (ValueError, TypeError):
+                    data.budget_amount = float(budget.text)
+                except ValueError:
                     pass
+                else:
+                    data.currency = budget.attrib.get('currencyID')
             
             # Type code
-            type_code = project.find('cbc:TypeCode', self.NAMESPACES)
+            type_code = _first(self._xp_type_code, project)
             if type_code is not None:
-                data['contract_type'] = type_code.text
+                data.contract_type = type_code.text
                 
             # CPV Codes
-            cpvs = []
-            for item in project.findall('.//cac:RequiredCommodityClassification/cbc:ItemClassificationCode', self.NAMESPACES):
-                cpvs.append(item.text)
-            data['cpv_codes'] = cpvs
+            data.cpv_codes = [
+                item.text
+                for classification in project.iter(_TAG_COMMODITY_CLASSIFICATION)
+                for item in classification.iterchildren(_TAG_CLASSIFICATION_CODE)
+            ]
             
             # Location
-            locations = []
-            for loc in project.findall('.//cac:RealizedLocation/cbc:CountrySubentity', self.NAMESPACES):
-                locations.append(loc.text)
-            data['regions'] = locations
+            data.regions = [
+                loc.text
+                for location in project.iter(_TAG_REALIZED_LOCATION)
+                for loc in location.iterchildren(_TAG_COUNTRY_SUBENTITY)
+            ]
         else:
-            self.logger.debug(f"No ProcurementProject found for entry {data.get('id')}")
+            self.logger.debug(f"No ProcurementProject found for entry {data.id}")
 
         # TenderingProcess (Deadlines)
         # TenderingProcess is in cac
-        process = folder.find('.//cac:TenderingProcess', self.NAMESPACES)
+        process = _first(self._xp_process, folder)
         if process is not None:
-            # TenderSubmissionDeadlinePeriod
-            deadline = process.find('.//cac:TenderSubmissionDeadlinePeriod/cbc:EndDate', self.NAMESPACES)
-            deadline_time = process.find('.//cac:TenderSubmissionDeadlinePeriod/cbc:EndTime', self.NAMESPACES)
+            # TenderSubmissionDeadlinePeriod: located once, then its
+            # EndDate/EndTime children
+            period = _first(self._xp_deadline_period, process)
+            deadline = deadline_time = None
+            if period is not None:
+                deadline = period.find(_TAG_END_DATE)
+                deadline_time = period.find(_TAG_END_TIME)
             
             if deadline is not None:
                 date_str = deadline.text
                 if deadline_time is not None:
                     date_str += f"T{deadline_time.text}"
-                data['application_end_date'] = date_str
+                data.application_end_date = date_str
 
         # General Document Links (Pliegos)
         # GeneralDocument is in cac-place-ext? No, check XML.
@@ -151,11 +333,24 @@ class CODICEParser:
         # Inside: <ns4:ExternalReference>
         # Inside: <ns2:URI> -> ns2 is cbc
         
-        documents = []
         # Find all Attachment URIs anywhere in folder
-        for attachment in folder.findall('.//cac:Attachment//cbc:URI', self.NAMESPACES):
-            documents.append(attachment.text)
+        documents = [
+            uri.text
+            for attachment in folder.iter(_TAG_ATTACHMENT)
+            for uri in attachment.iter(_TAG_URI)
+        ]
         
         if documents:
-            data['pdf_url'] = documents[0] # Pick first as primary for now
-            data['documents'] = documents
+            data.pdf_url = documents[0] # Pick first as primary for now
+            data.documents = documents
+
+
+_worker_parser: Optional[CODICEParser] = None
+
+
+def _parse_entry_chunk(chunk: List[bytes]) -> List[ParsedEntry]:
+    """Process-pool worker for CODICEParser.parse_feed_parallel"""
+    global _worker_parser
+    if _worker_parser is None:
+        _worker_parser = CODICEParser()
+    return [_worker_parser.parse_entry(LET.fromstring(raw)) for raw in chunk]
@@ -7,13 +7,30 @@ subvenciones y ayudas relevantes, incluyendo filtros por sector, cuantía,
 beneficiarios y palabras clave personalizables.
 """
 
+import os
 import re
+import sys
+import copy
 import json
 import logging
-from typing import Dict, List, Set, Optional, Any, Tuple
-from dataclasses import dataclass, asdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Set, Optional, Any, Tuple, Iterable, Union
+from dataclasses import dataclass, asdict, fields, replace
 from datetime import datetime, date
 from enum import Enum
+from itertools import count
+from bisect import bisect_left
+from functools import lru_cache
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 logger = logging.getLogger(__name__)
@@ -29,6 +46,54 @@ class FilterType(Enum):
     DEPARTMENT = "department"  # Filtro por organismo
 
 
+# Tipos cuyo value es una lista de palabras clave
+_KEYWORD_FILTER_TYPES = (FilterType.INCLUDE, FilterType.EXCLUDE, FilterType.DEPARTMENT)
+
+# Cada cambio en una regla le asigna una versión nueva, para detectar
+# cambios en las reglas de un perfil
+_rule_versions = count()
+
+# Tramos de get_filter_statistics: (límite superior incluido, etiqueta)
+_SCORE_BUCKET_EDGES = (0.2, 0.4, 0.6, 0.8)
+_SCORE_BUCKET_LABELS = ('0-0.2', '0.2-0.4', '0.4-0.6', '0.6-0.8', '0.8-1.0')
+
+# Números en formato español (1.234.567,89) dentro de un texto de cuantía
+_AMOUNT_NUM_RE = re.compile(r'(\d{1,3}(?:\.\d{3})*(?:,\d{2})?)')
+
+
+# Minúscula de cada carácter Latin-1 (todos tienen una minúscula Latin-1 de un carácter)
+_LATIN1_LOWER = bytes(ord(chr(code).lower()) for code in range(256))
+
+
+def _fast_lower(text: str) -> str:
+    """
+    text.lower() para el texto completo de una subvención.
+
+    str.lower() es rápido con ASCII pero lento con acentos; el texto en
+    español casi siempre cabe en Latin-1, donde una tabla de bytes da el
+    mismo resultado varias veces más rápido. Otros textos usan str.lower().
+    """
+    if text.isascii():
+        return text.lower()
+    try:
+        raw = text.encode('latin-1')
+    except UnicodeEncodeError:
+        return text.lower()
+    return raw.translate(_LATIN1_LOWER).decode('latin-1')
+
+
+@lru_cache(maxsize=8192)
+def _parse_es_amounts(amount_text: str) -> Tuple[float, ...]:
+    """
+    Cantidades de un texto de cuantía, de formato español a float.
+    Cacheado: las mismas cifras se repiten en muchas convocatorias.
+    """
+    return tuple(
+        float(num_str.replace('.', '').replace(',', '.'))
+        for num_str in _AMOUNT_NUM_RE.findall(amount_text)
+    )
+
+
 @dataclass
 class FilterRule:
     """Regla de filtro individual"""
@@ -42,6 +107,117 @@ class FilterRule:
     def __post_init__(self):
         if isinstance(self.filter_type, str):
             self.filter_type = FilterType(self.filter_type)
+        self._prepare()
+
+    def __setattr__(self, name: str, value: Any):
+        super().__setattr__(name, value)
+        # La regla puede modificarse tras crearla (p.ej. value desde la API)
+        if '_version' in self.__dict__:
+            if name in ('filter_type', 'value'):
+                self._prepare()
+            else:
+                object.__setattr__(self, '_version', next(_rule_versions))
+
+    def __copy__(self) -> 'FilterRule':
+        # Lo derivado (tuplas, autómata, regex) no se modifica nunca en sitio:
+        # se comparte en lugar de recalcularlo. Solo value dict (AMOUNT/DATE) se copia
+        clone = object.__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        if isinstance(self.value, dict):
+            clone.__dict__['value'] = dict(self.value)
+        return clone
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Solo los campos: lo derivado (autómata, regex, versión) se recalcula al deserializar
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        self._prepare()
+
+    def _prepare(self):
+        """
+        Precalcula las palabras clave en minúsculas y su autómata
+        (INCLUDE/EXCLUDE/DEPARTMENT) y la regex compilada (REGEX), una vez
+        por regla en lugar de en cada evaluación.
+        """
+        if self.filter_type in _KEYWORD_FILTER_TYPES and isinstance(self.value, (list, tuple)):
+            # Tupla: las coincidencias y el autómata indexan value, que no debe
+            # cambiar por dentro (para cambiarla, reasignar rule.value)
+            object.__setattr__(self, 'value', tuple(self.value))
+            value_lower = tuple(sys.intern(keyword.lower()) for keyword in self.value)
+        else:
+            value_lower = ()
+        object.__setattr__(self, '_value_lower', value_lower)
+
+        automaton = None
+        if ahocorasick is not None and self.filter_type in _KEYWORD_FILTER_TYPES:
+            automaton = self._build_automaton()
+        object.__setattr__(self, '_automaton', automaton)
+
+        compiled = None
+        if self.filter_type == FilterType.REGEX:
+            try:
+                compiled = re.compile(self.value, re.IGNORECASE)
+            except re.error as e:
+                logger.warning(f"⚠️  Regex inválida '{self.value}' en regla {self.name}: {e}")
+        object.__setattr__(self, '_compiled', compiled)
+
+        object.__setattr__(self, '_version', next(_rule_versions))
+
+    def find_keywords(self, text_lower: str) -> Tuple[str, ...]:
+        """
+        Devuelve las palabras clave de `value` presentes en `text_lower`
+        (en el orden en que están declaradas en la regla).
+
+        Es la única primitiva de búsqueda de keywords de INCLUDE, EXCLUDE y
+        DEPARTMENT. Con pyahocorasick todas las palabras se buscan en una sola
+        pasada sobre el texto; sin él, se comprueba cada palabra con `in`.
+        """
+        if self.filter_type not in _KEYWORD_FILTER_TYPES:
+            return ()
+        if self._automaton is None:
+            return tuple(keyword for keyword, keyword_lower in zip(self.value, self._value_lower)
+                         if keyword_lower in text_lower)
+
+        automaton, always = self._automaton
+        if automaton is None:
+            return tuple(self.value[index] for index in always)
+
+        found = set(always)
+        for _, indices in automaton.iter(text_lower):
+            found.update(indices)
+        return tuple(self.value[index] for index in sorted(found))
+
+    def _build_automaton(self) -> Tuple[Optional[Any], List[int]]:
+        """Autómata Aho-Corasick: keyword en minúsculas -> índices en value"""
+        return _build_keyword_automaton(
+            (key, index) for index, key in enumerate(self._value_lower)
+        )
+
+
+def _build_keyword_automaton(entries: Iterable[Tuple[str, Any]]) -> Tuple[Optional[Any], List[Any]]:
+    """
+    Construye un autómata Aho-Corasick a partir de pares (keyword en minúsculas, etiqueta).
+
+    Cada keyword se asocia a la lista de sus etiquetas (puede repetirse). Devuelve
+    (autómata o None si no hay keywords, etiquetas de keywords vacías), ya que ''
+    está contenido en cualquier texto y el autómata no lo admite.
+    """
+    automaton = ahocorasick.Automaton()
+    always = []
+    for key, tag in entries:
+        if not key:
+            always.append(tag)
+        elif key in automaton:
+            automaton.get(key).append(tag)
+        else:
+            automaton.add_word(key, [tag])
+
+    if len(automaton) == 0:
+        return None, always
+    automaton.make_automaton()
+    return automaton, always
 
 
 @dataclass
@@ -56,14 +232,242 @@ class FilterProfile:
     def __post_init__(self):
         if not self.created_at:
             self.created_at = datetime.now().isoformat()
+        self._reset_caches()
+
+    def _reset_caches(self):
+        self._scanner = None
+        self._scanner_key = None
+        self._ordered_rules = None
+        self._ordered_key = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        self._reset_caches()
+
+    def rules_required_first(self) -> List[Tuple[int, FilterRule]]:
+        """(índice en rules, regla), con las reglas required primero (orden estable)"""
+        key = tuple(rule._version for rule in self.rules)
+        if key != self._ordered_key:
+            self._ordered_rules = sorted(enumerate(self.rules), key=lambda item: not item[1].required)
+            self._ordered_key = key
+        return self._ordered_rules
+
+    def scan_keywords(self, text_lower: str) -> Dict[int, Tuple[str, ...]]:
+        """
+        Busca en una sola pasada las palabras clave de todas las reglas
+        INCLUDE/EXCLUDE del perfil.
+
+        Returns:
+            {índice de la regla en rules: keywords encontradas, en orden de declaración}
+        """
+        rules = self.rules
+        if ahocorasick is None:
+            return {index: rule.find_keywords(text_lower) for index, rule in enumerate(rules)
+                    if rule.filter_type in (FilterType.INCLUDE, FilterType.EXCLUDE)}
+
+        # Las reglas (y su value) pueden cambiar tras crear el perfil
+        key = tuple(rule._version for rule in rules)
+        if key != self._scanner_key:
+            self._scanner = _build_keyword_automaton(
+                (keyword_lower, (rule_index, keyword_index))
+                for rule_index, rule in enumerate(rules)
+                if rule.filter_type in (FilterType.INCLUDE, FilterType.EXCLUDE)
+                for keyword_index, keyword_lower in enumerate(rule._value_lower)
+            )
+            self._scanner_key = key
+        automaton, always = self._scanner
+
+        found: Dict[int, Set[int]] = {}
+        for rule_index, keyword_index in always:
+            found.setdefault(rule_index, set()).add(keyword_index)
+        if automaton is not None:
+            for _, tags in automaton.iter(text_lower):
+                for rule_index, keyword_index in tags:
+                    found.setdefault(rule_index, set()).add(keyword_index)
+
+        return {rule_index: tuple(rules[rule_index].value[i] for i in sorted(indices))
+                for rule_index, indices in found.items()}
+
+
+def _build_default_profiles() -> List[FilterProfile]:
+    """Perfiles de filtros predeterminados"""
+    profiles = []
+    
+    # Perfil para Startups y PYMEs Tech
+    startup_rules = [
+        FilterRule("startup_keywords", FilterType.INCLUDE, 
+                  ["startup", "pyme", "pequeña empresa", "microempresa", "emprendedor", 
+                   "innovación", "i+d+i", "digitalización", "transformación digital"], 
+                  weight=2.0, description="Palabras clave para startups"),
+        
+        FilterRule("tech_keywords", FilterType.INCLUDE,
+                  ["tecnología", "software", "app", "inteligencia artificial", "ia", 
+                   "blockchain", "fintech", "healthtech", "edtech", "cleantech"],
+                  weight=1.5, description="Sectores tecnológicos"),
+        
+        FilterRule("next_generation", FilterType.INCLUDE,
+                  ["next generation", "ngeu", "prtr", "plan de recuperación", "fondos europeos"],
+                  weight=2.5, description="Fondos Next Generation EU"),
+        
+        FilterRule("exclude_large", FilterType.EXCLUDE,
+                  ["gran empresa", "multinacional", "sector público", "administración"],
+                  weight=1.0, description="Excluir grandes empresas"),
+        
+        FilterRule("min_amount", FilterType.AMOUNT,
+                  {"min": 5000, "max": 500000},  # Entre 5K y 500K euros
+                  weight=1.2, description="Rango de cuantía adecuado"),
+    ]
+    
+    profiles.append(FilterProfile(
+        "startup_tech", 
+        "Startups y PYMEs tecnológicas",
+        startup_rules,
+        min_score=0.6
+    ))
+    
+    # Perfil para Sostenibilidad y Medio Ambiente
+    green_rules = [
+        FilterRule("green_keywords", FilterType.INCLUDE,
+                  ["sostenibilidad", "medioambiente", "medio ambiente", "economía circular",
+                   "energías renovables", "eficiencia energética", "carbono neutral",
+                   "transición ecológica", "green", "bio", "eco"],
+                  weight=2.0, description="Palabras sostenibilidad"),
+        
+        FilterRule("climate_keywords", FilterType.INCLUDE,
+                  ["cambio climático", "emisiones", "descarbonización", "biodiversidad",
+                   "agua", "residuos", "reciclaje", "movilidad sostenible"],
+                  weight=1.8, description="Cambio climático y recursos"),
+        
+        FilterRule("eu_green_deal", FilterType.INCLUDE,
+                  ["green deal", "pacto verde", "taxonomía verde", "fit for 55"],
+                  weight=2.2, description="Green Deal Europeo"),
+    ]
+    
+    profiles.append(FilterProfile(
+        "sostenibilidad",
+        "Proyectos de sostenibilidad y medio ambiente", 
+        green_rules,
+        min_score=0.5
+    ))
+    
+    # Perfil para Investigación y Desarrollo
+    rd_rules = [
+        FilterRule("research_keywords", FilterType.INCLUDE,
+                  ["investigación", "desarrollo", "i+d", "i+d+i", "ciencia", "innovación",
+                   "proyecto de investigación", "centro tecnológico", "universidad"],
+                  weight=2.0, description="Investigación y desarrollo"),
+        
+        FilterRule("scientific_areas", FilterType.INCLUDE,
+                  ["biotecnología", "nanotecnología", "materiales avanzados", "medicina",
+                   "farmacéutico", "aeroespacial", "robótica", "automatización"],
+                  weight=1.7, description="Áreas científicas"),
+        
+        FilterRule("collaboration", FilterType.INCLUDE,
+                  ["consorcio", "colaboración", "transferencia tecnológica", "spin-off"],
+                  weight=1.5, description="Colaboración científica"),
+    ]
+    
+    profiles.append(FilterProfile(
+        "investigacion",
+        "Investigación, desarrollo e innovación",
+        rd_rules,
+        min_score=0.4
+    ))
+    
+    # Perfil para Formación y Empleo
+    training_rules = [
+        FilterRule("training_keywords", FilterType.INCLUDE,
+                  ["formación", "capacitación", "cualificación", "recualificación",
+                   "upskilling", "reskilling", "certificación", "competencias"],
+                  weight=1.8, description="Formación y capacitación"),
+        
+        FilterRule("employment_keywords", FilterType.INCLUDE,
+                  ["empleo", "inserción laboral", "orientación laboral", "autoempleo",
+                   "trabajo", "contratación", "inclusión laboral"],
+                  weight=1.5, description="Empleo y trabajo"),
+        
+        FilterRule("vulnerable_groups", FilterType.INCLUDE,
+                  ["jóvenes", "mujeres", "desempleados", "parados de larga duración",
+                   "personas con discapacidad", "mayores de 45", "rural"],
+                  weight=1.3, description="Grupos vulnerables"),
+    ]
+    
+    profiles.append(FilterProfile(
+        "formacion_empleo",
+        "Formación, empleo e inclusión social",
+        training_rules,
+        min_score=0.4
+    ))
+
+    # Perfil para Organizaciones Sin Ánimo de Lucro
+    nonprofit_rules = [
+        FilterRule("nonprofit_required", FilterType.INCLUDE,
+                  ["sin ánimo de lucro", "sin animo de lucro", "sin fines de lucro",
+                   "entidad sin ánimo de lucro", "entidad sin animo de lucro",
+                   "organización sin ánimo de lucro", "organizacion sin animo de lucro"],
+                  weight=3.0, required=True, description="Palabras clave REQUERIDAS para nonprofit"),
+
+        FilterRule("entity_types", FilterType.INCLUDE,
+                  ["fundación", "fundacion", "asociación", "asociacion",
+                   "ONG", "entidad social", "tercer sector", "cooperativa social",
+                   "entidades no lucrativas"],
+                  weight=2.0, description="Tipos de entidades sin ánimo de lucro"),
+
+        FilterRule("social_activities", FilterType.INCLUDE,
+                  ["actividades sociales", "acción social", "servicios sociales",
+                   "voluntariado", "solidaridad", "beneficencia", "asistencia social",
+                   "interés general", "utilidad pública"],
+                  weight=1.5, description="Actividades de interés social"),
+
+        FilterRule("exclude_profit", FilterType.EXCLUDE,
+                  ["con ánimo de lucro", "empresa privada", "sociedad mercantil",
+                   "sociedad anónima", "sociedad limitada", "S.A.", "S.L."],
+                  weight=2.0, description="Excluir entidades con ánimo de lucro"),
+    ]
+
+    profiles.append(FilterProfile(
+        "nonprofit",
+        "Organizaciones sin ánimo de lucro (ONGs, fundaciones, asociaciones)",
+        nonprofit_rules,
+        min_score=0.8  # Score alto para alta precisión
+    ))
+
+    # Perfil de prueba para PLACSP (muy permisivo)
+    test_placsp_rules = [
+        FilterRule("generic_terms", FilterType.INCLUDE,
+                   ["contrato", "suministro", "servicio", "obra", "acuerdo marco", "licitación"],
+                   weight=1.0, required=True, description="Términos genéricos de contratación"),
+    ]
+
+    profiles.append(FilterProfile(
+        "test_placsp",
+        "Perfil de prueba para capturar todo de PLACSP",
+        test_placsp_rules,
+        min_score=0.1
+    ))
+
+    return profiles
+
+
+# Construidos una vez por proceso; cada GrantFilter trabaja sobre copias
+_DEFAULT_PROFILES: Tuple[FilterProfile, ...] = tuple(_build_default_profiles())
 
 
 class GrantFilter:
     """Motor de filtros para subvenciones del BOE"""
     
+    # Resultados de evaluación cacheados (FIFO) para textos repetidos
+    RESULT_CACHE_SIZE = 10000
+    
     def __init__(self, profiles_file: str = "filter_profiles.json"):
-        self.profiles = {}
+        # Perfiles cargados de fichero se guardan como dict y se construyen
+        # (reglas, autómatas, regex) la primera vez que se usan: ver get_profile
+        self.profiles: Dict[str, Union[FilterProfile, Dict[str, Any]]] = {}
         self.profiles_file = profiles_file
+        self._result_cache: Dict[tuple, Dict[str, Any]] = {}
         
         # Try to load from file, otherwise init defaults
         try:
@@ -76,159 +480,8 @@ class GrantFilter:
     
     def _init_default_profiles(self):
         """Inicializa perfiles de filtros predeterminados"""
-        
-        # Perfil para Startups y PYMEs Tech
-        startup_rules = [
-            FilterRule("startup_keywords", FilterType.INCLUDE, 
-                      ["startup", "pyme", "pequeña empresa", "microempresa", "emprendedor", 
-                       "innovación", "i+d+i", "digitalización", "transformación digital"], 
-                      weight=2.0, description="Palabras clave para startups"),
-            
-            FilterRule("tech_keywords", FilterType.INCLUDE,
-                      ["tecnología", "software", "app", "inteligencia artificial", "ia", 
-                       "blockchain", "fintech", "healthtech", "edtech", "cleantech"],
-                      weight=1.5, description="Sectores tecnológicos"),
-            
-            FilterRule("next_generation", FilterType.INCLUDE,
-                      ["next generation", "ngeu", "prtr", "plan de recuperación", "fondos europeos"],
-                      weight=2.5, description="Fondos Next Generation EU"),
-            
-            FilterRule("exclude_large", FilterType.EXCLUDE,
-                      ["gran empresa", "multinacional", "sector público", "administración"],
-                      weight=1.0, description="Excluir grandes empresas"),
-            
-            FilterRule("min_amount", FilterType.AMOUNT,
-                      {"min": 5000, "max": 500000},  # Entre 5K y 500K euros
-                      weight=1.2, description="Rango de cuantía adecuado"),
-        ]
-        
-        self.add_profile(FilterProfile(
-            "startup_tech", 
-            "Startups y PYMEs tecnológicas",
-            startup_rules,
-            min_score=0.6
-        ))
-        
-        # Perfil para Sostenibilidad y Medio Ambiente
-        green_rules = [
-            FilterRule("green_keywords", FilterType.INCLUDE,
-                      ["sostenibilidad", "medioambiente", "medio ambiente", "economía circular",
-                       "energías renovables", "eficiencia energética", "carbono neutral",
-                       "transición ecológica", "green", "bio", "eco"],
-                      weight=2.0, description="Palabras sostenibilidad"),
-            
-            FilterRule("climate_keywords", FilterType.INCLUDE,
-                      ["cambio climático", "emisiones", "descarbonización", "biodiversidad",
-                       "agua", "residuos", "reciclaje", "movilidad sostenible"],
-                      weight=1.8, description="Cambio climático y recursos"),
-            
-            FilterRule("eu_green_deal", FilterType.INCLUDE,
-                      ["green deal", "pacto verde", "taxonomía verde", "fit for 55"],
-                      weight=2.2, description="Green Deal Europeo"),
-        ]
-        
-        self.add_profile(FilterProfile(
-            "sostenibilidad",
-            "Proyectos de sostenibilidad y medio ambiente", 
-            green_rules,
-            min_score=0.5
-        ))
-        
-        # Perfil para Investigación y Desarrollo
-        rd_rules = [
-            FilterRule("research_keywords", FilterType.INCLUDE,
-                      ["investigación", "desarrollo", "i+d", "i+d+i", "ciencia", "innovación",
-                       "proyecto de investigación", "centro tecnológico", "universidad"],
-                      weight=2.0, description="Investigación y desarrollo"),
-            
-            FilterRule("scientific_areas", FilterType.INCLUDE,
-                      ["biotecnología", "nanotecnología", "materiales avanzados", "medicina",
-                       "farmacéutico", "aeroespacial", "robótica", "automatización"],
-                      weight=1.7, description="Áreas científicas"),
-            
-            FilterRule("collaboration", FilterType.INCLUDE,
-                      ["consorcio", "colaboración", "transferencia tecnológica", "spin-off"],
-                      weight=1.5, description="Colaboración científica"),
-        ]
-        
-        self.add_profile(FilterProfile(
-            "investigacion",
-            "Investigación, desarrollo e innovación",
-            rd_rules,
-            min_score=0.4
-        ))
-        
-        # Perfil para Formación y Empleo
-        training_rules = [
-            FilterRule("training_keywords", FilterType.INCLUDE,
-                      ["formación", "capacitación", "cualificación", "recualificación",
-                       "upskilling", "reskilling", "certificación", "competencias"],
-                      weight=1.8, description="Formación y capacitación"),
-            
-            FilterRule("employment_keywords", FilterType.INCLUDE,
-                      ["empleo", "inserción laboral", "orientación laboral", "autoempleo",
-                       "trabajo", "contratación", "inclusión laboral"],
-                      weight=1.5, description="Empleo y trabajo"),
-            
-            FilterRule("vulnerable_groups", FilterType.INCLUDE,
-                      ["jóvenes", "mujeres", "desempleados", "parados de larga duración",
-                       "personas con discapacidad", "mayores de 45", "rural"],
-                      weight=1.3, description="Grupos vulnerables"),
-        ]
-        
-        self.add_profile(FilterProfile(
-            "formacion_empleo",
-            "Formación, empleo e inclusión social",
-            training_rules,
-            min_score=0.4
-        ))
-
-        # Perfil para Organizaciones Sin Ánimo de Lucro
-        nonprofit_rules = [
-            FilterRule("nonprofit_required", FilterType.INCLUDE,
-                      ["sin ánimo de lucro", "sin animo de lucro", "sin fines de lucro",
-                       "entidad sin ánimo de lucro", "entidad sin animo de lucro",
-                       "organización sin ánimo de lucro", "organizacion sin animo de lucro"],
-                      weight=3.0, required=True, description="Palabras clave REQUERIDAS para nonprofit"),
-
-            FilterRule("entity_types", FilterType.INCLUDE,
-                      ["fundación", "fundacion", "asociación", "asociacion",
-                       "ONG", "entidad social", "tercer sector", "cooperativa social",
-                       "entidades no lucrativas"],
-                      weight=2.0, description="Tipos de entidades sin ánimo de lucro"),
-
-            FilterRule("social_activities", FilterType.INCLUDE,
-                      ["actividades sociales", "acción social", "servicios sociales",
-                       "voluntariado", "solidaridad", "beneficencia", "asistencia social",
-                       "interés general", "utilidad pública"],
-                      weight=1.5, description="Actividades de interés social"),
-
-            FilterRule("exclude_profit", FilterType.EXCLUDE,
-                      ["con ánimo de lucro", "empresa privada", "sociedad mercantil",
-                       "sociedad anónima", "sociedad limitada", "S.A.", "S.L."],
-                      weight=2.0, description="Excluir entidades con ánimo de lucro"),
-        ]
-
-        self.add_profile(FilterProfile(
-            "nonprofit",
-            "Organizaciones sin ánimo de lucro (ONGs, fundaciones, asociaciones)",
-            nonprofit_rules,
-            min_score=0.8  # Score alto para alta precisión
-        ))
-
-        # Perfil de prueba para PLACSP (muy permisivo)
-        test_placsp_rules = [
-            FilterRule("generic_terms", FilterType.INCLUDE,
-                       ["contrato", "suministro", "servicio", "obra", "acuerdo marco", "licitación"],
-                       weight=1.0, required=True, description="Términos genéricos de contratación"),
-        ]
-
-        self.add_profile(FilterProfile(
-            "test_placsp",
-            "Perfil de prueba para capturar todo de PLACSP",
-            test_placsp_rules,
-            min_score=0.1
-        ))
+        for profile in _DEFAULT_PROFILES:
+            self.add_profile(replace(profile, rules=[copy.copy(rule) for rule in profile.rules]))
 
     def add_profile(self, profile: FilterProfile):
         """Añade un nuevo perfil de filtros"""
@@ -245,7 +498,24 @@ class GrantFilter:
     
     def get_profile(self, profile_name: str) -> Optional[FilterProfile]:
         """Obtiene un perfil de filtros"""
-        return self.profiles.get(profile_name)
+        profile = self.profiles.get(profile_name)
+        if isinstance(profile, dict):
+            profile = self._build_profile(profile_name, profile)
+        return profile
+    
+    def _build_profile(self, profile_name: str, profile_dict: Dict[str, Any]) -> Optional[FilterProfile]:
+        """Construye un perfil cargado de fichero y lo sustituye en self.profiles"""
+        try:
+            # FilterRule convierte filter_type de string a FilterType
+            rules_objects = [FilterRule(**rule) for rule in profile_dict['rules']]
+            profile = FilterProfile(**{**profile_dict, 'rules': rules_objects})
+        except Exception as e:
+            logger.error(f"❌ Error cargando perfil {profile_name}: {e}")
+            del self.profiles[profile_name]
+            return None
+        
+        self.profiles[profile_name] = profile
+        return profile
     
     def list_profiles(self) -> List[str]:
         """Lista todos los perfiles disponibles"""
@@ -255,6 +525,10 @@ class GrantFilter:
         """Guarda los perfiles a un archivo JSON"""
         profiles_data = {}
         for name, profile in self.profiles.items():
+            if isinstance(profile, dict):
+                # Sin usar desde que se cargó: se guarda tal cual
+                profiles_data[name] = profile
+                continue
             profile_dict = asdict(profile)
             # Convertir FilterType enum a string
             for rule in profile_dict['rules']:
@@ -273,29 +547,20 @@ class GrantFilter:
                 profiles_data = json.load(f)
             
             for name, profile_dict in profiles_data.items():
-                # Convertir string a FilterType enum
-                # Convertir string a FilterType enum y crear objetos FilterRule
-                rules_objects = []
-                for rule in profile_dict['rules']:
-                    rule['filter_type'] = FilterType(rule['filter_type'])
-                    rules_objects.append(FilterRule(**rule))
-                
-                profile_dict['rules'] = rules_objects
-                profile = FilterProfile(**profile_dict)
-                self.profiles[name] = profile
+                # Se construye al primer uso (get_profile)
+                self.profiles[name] = profile_dict
             
             logger.info(f"📁 Perfiles cargados desde: {filename}")
         except Exception as e:
             logger.error(f"❌ Error cargando perfiles: {e}")
     
-    def _apply_include_filter(self, text: str, keywords: List[str]) -> Tuple[bool, float, List[str]]:
-        """Aplica filtro de inclusión"""
-        text_lower = text.lower()
-        matches = []
-        
-        for keyword in keywords:
-            if keyword.lower() in text_lower:
-                matches.append(keyword)
+    def _apply_include_filter(self, rule: FilterRule,
+                              matches: Tuple[str, ...]) -> Tuple[bool, float, Tuple[str, ...]]:
+        """
+        Aplica filtro de inclusión (matches: keywords de la regla encontradas en el texto).
+        También lo usa DEPARTMENT, que solo cambia el texto donde se buscan.
+        """
+        keywords = rule.value
         
         # Score basado en porcentaje de keywords encontradas
         score = len(matches) / len(keywords) if keywords else 0
@@ -303,31 +568,24 @@ class GrantFilter:
         
         return passed, score, matches
     
-    def _apply_exclude_filter(self, text: str, keywords: List[str]) -> Tuple[bool, float, List[str]]:
-        """Aplica filtro de exclusión"""
-        text_lower = text.lower()
-        matches = []
-        
-        for keyword in keywords:
-            if keyword.lower() in text_lower:
-                matches.append(keyword)
-        
+    def _apply_exclude_filter(self, rule: FilterRule,
+                              matches: Tuple[str, ...]) -> Tuple[bool, float, Tuple[str, ...]]:
+        """Aplica filtro de exclusión (matches: keywords de la regla encontradas en el texto)"""
         # Pasa si NO encuentra ninguna palabra excluida
         passed = len(matches) == 0
         score = 0.0 if matches else 1.0
         
         return passed, score, matches
     
-    def _apply_regex_filter(self, text: str, pattern: str) -> Tuple[bool, float, List[str]]:
+    def _apply_regex_filter(self, text: str, rule: FilterRule) -> Tuple[bool, float, Tuple[str, ...]]:
         """Aplica filtro de expresión regular"""
-        try:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            passed = len(matches) > 0
-            score = min(len(matches) / 3, 1.0)  # Máximo score con 3+ coincidencias
-            return passed, score, matches
-        except re.error as e:
-            logger.warning(f"⚠️  Regex inválida '{pattern}': {e}")
-            return False, 0.0, []
+        if rule._compiled is None:
+            # Regex inválida (ya avisada al crear la regla)
+            return False, 0.0, ()
+        matches = tuple(rule._compiled.findall(text))
+        passed = len(matches) > 0
+        score = min(len(matches) / 3, 1.0)  # Máximo score con 3+ coincidencias
+        return passed, score, matches
     
     def _apply_amount_filter(self, extracted_info: Dict[str, Any], 
                            amount_criteria: Dict[str, float]) -> Tuple[bool, float]:
@@ -339,51 +597,45 @@ class GrantFilter:
         min_amount = amount_criteria.get('min', 0)
         max_amount = amount_criteria.get('max', float('inf'))
         
-        # Extraer números de las cuantías encontradas
-        found_amounts = []
-        for amount_text in amounts:
-            # Buscar números en el texto
-            numbers = re.findall(r'(\d{1,3}(?:\.\d{3})*(?:,\d{2})?)', str(amount_text))
-            for num_str in numbers:
-                try:
-                    # Convertir formato español a float
-                    num = float(num_str.replace('.', '').replace(',', '.'))
-                    found_amounts.append(num)
-                except ValueError:
-                    continue
+        # Extraer números de las cuantías encontradas (formato español a float)
+        found_amounts = [
+            amount
+            for amount_text in amounts
+            for amount in _parse_es_amounts(str(amount_text))
+        ]
         
         if not found_amounts:
             return False, 0.0
         
-        # Verificar si alguna cantidad está en el rango
-        for amount in found_amounts:
-            if min_amount <= amount <= max_amount:
-                # Score basado en qué tan cerca está del punto medio del rango
-                mid_point = (min_amount + max_amount) / 2
-                distance = abs(amount - mid_point) / (max_amount - min_amount)
-                score = max(0.3, 1.0 - distance)  # Mínimo 0.3, máximo 1.0
-                return True, score
+        # Primera cantidad que está en el rango
+        if np is not None:
+            values = np.fromiter(found_amounts, dtype=np.float64, count=len(found_amounts))
+            in_range = np.flatnonzero((values >= min_amount) & (values <= max_amount))
+            if not in_range.size:
+                return False, 0.0
+            amount = found_amounts[in_range[0]]
+        else:
+            amount = next((a for a in found_amounts if min_amount <= a <= max_amount), None)
+            if amount is None:
+                return False, 0.0
         
-        return False, 0.0
+        # Score basado en qué tan cerca está del punto medio del rango
+        mid_point = (min_amount + max_amount) / 2
+        distance = abs(amount - mid_point) / (max_amount - min_amount)
+        score = max(0.3, 1.0 - distance)  # Mínimo 0.3, máximo 1.0
+        return True, score
     
     def _apply_department_filter(self, grant_info: Dict[str, Any], 
-                               departments: List[str]) -> Tuple[bool, float, List[str]]:
+                               rule: FilterRule) -> Tuple[bool, float, Tuple[str, ...]]:
         """Aplica filtro por departamento/organismo"""
         grant_dept = grant_info.get('department', '').lower()
-        matches = []
-        
-        for dept_keyword in departments:
-            if dept_keyword.lower() in grant_dept:
-                matches.append(dept_keyword)
-        
-        passed = len(matches) > 0
-        score = len(matches) / len(departments) if departments else 0
-        
-        return passed, score, matches
+        return self._apply_include_filter(rule, rule.find_keywords(grant_dept))
     
     def evaluate_grant(self, grant_info: Dict[str, Any], 
                       profile_name: str,
-                      extracted_info: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+                      extracted_info: Optional[Dict[str, Any]] = None,
+                      fast_fail: bool = False,
+                      include_timestamps: bool = True) -> Dict[str, Any]:
         """
         Evalúa una subvención contra un perfil de filtros
         
@@ -391,15 +643,59 @@ class GrantFilter:
             grant_info: Información de la subvención
             profile_name: Nombre del perfil de filtros a usar
             extracted_info: Información extraída del PDF (opcional)
+            fast_fail: Evaluar primero las reglas obligatorias (también van primero
+                en rule_results) y parar en la primera que falle: passed=False,
+                total_score=0.0 y solo las reglas evaluadas en rule_results.
+                Útil cuando solo interesa si la subvención pasa.
+            include_timestamps: Si es False, evaluation_time queda a None
+                (evita formatear la hora en bucles largos)
             
         Returns:
             Resultado de la evaluación
         """
-        profile = self.profiles.get(profile_name)
+        profile = self._require_profile(profile_name)
+        full_text, full_text_lower = self._grant_texts(grant_info, extracted_info)
+        evaluation_time = datetime.now().isoformat() if include_timestamps else None
+        return self._evaluate_grant_prepared(profile_name, profile, grant_info,
+                                             full_text, full_text_lower, evaluation_time,
+                                             extracted_info, fast_fail)
+    
+    def _require_profile(self, profile_name: str) -> FilterProfile:
+        profile = self.get_profile(profile_name)
         if not profile:
             raise ValueError(f"Perfil '{profile_name}' no encontrado")
+        return profile
+    
+    @classmethod
+    def precompute_full_text(cls, grant_info: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Guarda en grant_info el texto completo ('_full_text') y en minúsculas
+        ('_full_text_lower') para que las evaluaciones sin extracted_info no lo
+        recompongan. Útil al cargar subvenciones una vez y evaluarlas muchas.
+        Hay que volver a llamarlo si cambian title/department/section/epigraph.
+        """
+        full_text = cls._compose_full_text(grant_info)
+        grant_info['_full_text'] = full_text
+        grant_info['_full_text_lower'] = _fast_lower(full_text)
+        return grant_info
+    
+    @classmethod
+    def _grant_texts(cls, grant_info: Dict[str, Any],
+                     extracted_info: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
+        """(texto completo, texto en minúsculas), usando los precalculados si los hay"""
+        if not extracted_info:
+            full_text = grant_info.get('_full_text')
+            if full_text is not None:
+                full_text_lower = grant_info.get('_full_text_lower')
+                return full_text, full_text_lower if full_text_lower is not None else _fast_lower(full_text)
         
-        # Texto completo para análisis
+        full_text = cls._compose_full_text(grant_info, extracted_info)
+        return full_text, _fast_lower(full_text)
+    
+    @staticmethod
+    def _compose_full_text(grant_info: Dict[str, Any],
+                           extracted_info: Optional[Dict[str, Any]] = None) -> str:
+        """Texto completo para análisis"""
         full_text = " ".join([
             grant_info.get('title', ''),
             grant_info.get('department', ''),
@@ -413,6 +709,57 @@ class GrantFilter:
                 if isinstance(values, list):
                     full_text += " " + " ".join(str(v) for v in values)
         
+        return full_text
+    
+    def _evaluate_grant_prepared(self, profile_name: str,
+                                 profile: FilterProfile,
+                                 grant_info: Dict[str, Any],
+                                 full_text: str,
+                                 full_text_lower: str,
+                                 evaluation_time: Optional[str],
+                                 extracted_info: Optional[Dict[str, Any]] = None,
+                                 fast_fail: bool = False) -> Dict[str, Any]:
+        """
+        Núcleo de evaluate_grant con el texto ya compuesto y en minúsculas,
+        para reutilizarlo entre reglas y entre perfiles.
+        
+        Muchas subvenciones/licitaciones comparten título y organismo, así que
+        el resultado se cachea por perfil (y versión de sus reglas) y texto.
+        Sin caché cuando hay extracted_info: el filtro AMOUNT depende de él.
+        """
+        if extracted_info:
+            return self._apply_profile_rules(profile_name, profile, grant_info, full_text,
+                                             full_text_lower, evaluation_time, extracted_info,
+                                             fast_fail)
+        
+        cache_key = (profile_name, profile.min_score, tuple(rule._version for rule in profile.rules),
+                     full_text, grant_info.get('department', ''), fast_fail)
+        cached = self._result_cache.get(cache_key)
+        if cached is None:
+            cached = self._apply_profile_rules(profile_name, profile, grant_info, full_text,
+                                               full_text_lower, evaluation_time, fast_fail=fast_fail)
+            if len(self._result_cache) >= self.RESULT_CACHE_SIZE:
+                del self._result_cache[next(iter(self._result_cache))]
+            self._result_cache[cache_key] = cached
+        
+        # Copia para que el llamante pueda modificar su resultado
+        result = dict(cached)
+        result['grant_id'] = grant_info.get('id')
+        result['evaluation_time'] = evaluation_time
+        # (matches son tuplas inmutables: se comparten sin copiar)
+        result['rule_results'] = [dict(rule_result) for rule_result in cached['rule_results']]
+        result['matches_found'] = dict(cached['matches_found'])
+        return result
+    
+    def _apply_profile_rules(self, profile_name: str,
+                             profile: FilterProfile,
+                             grant_info: Dict[str, Any],
+                             full_text: str,
+                             full_text_lower: str,
+                             evaluation_time: Optional[str],
+                             extracted_info: Optional[Dict[str, Any]] = None,
+                             fast_fail: bool = False) -> Dict[str, Any]:
+        """Evalúa las reglas del perfil sobre el texto (ver fast_fail en evaluate_grant)"""
         result = {
             'grant_id': grant_info.get('id'),
             'profile_used': profile_name,
@@ -422,7 +769,7 @@ class GrantFilter:
             'min_score_required': profile.min_score,
             'rule_results': [],
             'matches_found': {},
-            'evaluation_time': datetime.now().isoformat()
+            'evaluation_time': evaluation_time
         }
         
         total_weight = 0
@@ -430,8 +777,12 @@ class GrantFilter:
         required_rules_passed = 0
         required_rules_total = 0
         
+        # Todas las keywords INCLUDE/EXCLUDE del perfil, en una sola pasada
+        keyword_hits = profile.scan_keywords(full_text_lower)
+        
         # Evaluar cada regla
-        for rule in profile.rules:
+        rules = profile.rules_required_first() if fast_fail else enumerate(profile.rules)
+        for rule_index, rule in rules:
             rule_result = {
                 'rule_name': rule.name,
                 'rule_type': rule.filter_type.value,
@@ -439,7 +790,7 @@ class GrantFilter:
                 'score': 0.0,
                 'weight': rule.weight,
                 'required': rule.required,
-                'matches': []
+                'matches': ()
             }
             
             if rule.required:
@@ -447,15 +798,19 @@ class GrantFilter:
             
             # Aplicar filtro según tipo
             if rule.filter_type == FilterType.INCLUDE:
-                passed, score, matches = self._apply_include_filter(full_text, rule.value)
-                rule_result.update({'passed': passed, 'score': score, 'matches': matches})
+                # keyword_hits hace de índice invertido (keyword -> regla): una regla
+                # sin coincidencias se queda en passed=False, score=0.0
+                rule_matches = keyword_hits.get(rule_index)
+                if rule_matches:
+                    passed, score, matches = self._apply_include_filter(rule, rule_matches)
+                    rule_result.update({'passed': passed, 'score': score, 'matches': matches})
                 
             elif rule.filter_type == FilterType.EXCLUDE:
-                passed, score, matches = self._apply_exclude_filter(full_text, rule.value)
+                passed, score, matches = self._apply_exclude_filter(rule, keyword_hits.get(rule_index, ()))
                 rule_result.update({'passed': passed, 'score': score, 'matches': matches})
                 
             elif rule.filter_type == FilterType.REGEX:
-                passed, score, matches = self._apply_regex_filter(full_text, rule.value)
+                passed, score, matches = self._apply_regex_filter(full_text, rule)
                 rule_result.update({'passed': passed, 'score': score, 'matches': matches})
                 
             elif rule.filter_type == FilterType.AMOUNT and extracted_info:
@@ -463,7 +818,7 @@ class GrantFilter:
                 rule_result.update({'passed': passed, 'score': score})
                 
             elif rule.filter_type == FilterType.DEPARTMENT:
-                passed, score, matches = self._apply_department_filter(grant_info, rule.value)
+                passed, score, matches = self._apply_department_filter(grant_info, rule)
                 rule_result.update({'passed': passed, 'score': score, 'matches': matches})
             
             # Acumular scores
@@ -480,6 +835,12 @@ class GrantFilter:
                     result['matches_found'][rule.name] = rule_result['matches']
             
             result['rule_results'].append(rule_result)
+            
+            if fast_fail and rule.required and not rule_result['passed']:
+                # Ya no puede pasar: el resto de reglas no cambia el resultado
+                result['required_rules_passed'] = required_rules_passed
+                result['required_rules_total'] = sum(1 for r in profile.rules if r.required)
+                return result
         
         # Calcular scores finales
         result['total_score'] = weighted_score_sum / total_weight if total_weight > 0 else 0.0
@@ -498,7 +859,8 @@ class GrantFilter:
     
     def evaluate_multiple_profiles(self, grant_info: Dict[str, Any],
                                  profile_names: List[str],
-                                 extracted_info: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+                                 extracted_info: Optional[Dict[str, Any]] = None,
+                                 include_timestamps: bool = True) -> Dict[str, Any]:
         """
         Evalúa una subvención contra múltiples perfiles
         
@@ -506,39 +868,144 @@ class GrantFilter:
             grant_info: Información de la subvención
             profile_names: Lista de nombres de perfiles
             extracted_info: Información extraída del PDF (opcional)
+            include_timestamps: Si es False, evaluation_time queda a None
             
         Returns:
             Resultados consolidados de la evaluación
         """
-        results = {
-            'grant_id': grant_info.get('id'),
-            'profiles_evaluated': profile_names,
-            'best_match': None,
-            'best_score': 0.0,
-            'passed_profiles': [],
-            'all_results': {},
-            'evaluation_time': datetime.now().isoformat()
-        }
+        return self.evaluate_corpus([grant_info], profile_names, [extracted_info],
+                                    include_timestamps)[0]
+    
+    def evaluate_corpus(self, grants: List[Dict[str, Any]],
+                        profile_names: List[str],
+                        extracted_infos: Optional[List[Optional[Dict[str, Any]]]] = None,
+                        include_timestamps: bool = True) -> List[Dict[str, Any]]:
+        """
+        Evalúa un lote de subvenciones contra múltiples perfiles
         
-        for profile_name in profile_names:
+        Equivale a llamar a evaluate_multiple_profiles por cada subvención, pero
+        el texto de cada una se compone y se pasa a minúsculas una sola vez, y
+        cada perfil se resuelve una vez y recorre el lote completo con su autómata.
+        
+        Args:
+            grants: Información de las subvenciones
+            profile_names: Lista de nombres de perfiles
+            extracted_infos: Información extraída del PDF de cada subvención (opcional,
+                mismo orden que grants)
+            include_timestamps: Si es False, evaluation_time queda a None; si no,
+                todo el lote lleva la misma hora de evaluación
+            
+        Returns:
+            Un resultado por subvención, con el formato de evaluate_multiple_profiles
+        """
+        if extracted_infos is None:
+            extracted_infos = [None] * len(grants)
+        evaluation_time = datetime.now().isoformat() if include_timestamps else None
+        
+        all_results = []
+        texts = []
+        for grant_info, extracted_info in zip(grants, extracted_infos):
+            all_results.append({
+                'grant_id': grant_info.get('id'),
+                'profiles_evaluated': profile_names,
+                'best_match': None,
+                'best_score': 0.0,
+                'passed_profiles': [],
+                'all_results': {},
+                'evaluation_time': evaluation_time
+            })
             try:
-                profile_result = self.evaluate_grant(grant_info, profile_name, extracted_info)
-                results['all_results'][profile_name] = profile_result
-                
-                if profile_result['passed']:
-                    results['passed_profiles'].append(profile_name)
-                
-                # Actualizar mejor match
-                if profile_result['total_score'] > results['best_score']:
-                    results['best_score'] = profile_result['total_score']
-                    results['best_match'] = profile_name
-                    
+                texts.append(self._grant_texts(grant_info, extracted_info))
             except Exception as e:
-                logger.error(f"❌ Error evaluando perfil {profile_name}: {e}")
-                results['all_results'][profile_name] = {'error': str(e)}
+                # Se reporta como error en cada perfil, igual que evaluate_grant
+                texts.append(e)
+        
+        for profile_name in profile_names:
+            profile = self.get_profile(profile_name)
+            
+            for grant_info, extracted_info, text, results in zip(grants, extracted_infos,
+                                                                 texts, all_results):
+                try:
+                    if not profile:
+                        raise ValueError(f"Perfil '{profile_name}' no encontrado")
+                    if isinstance(text, Exception):
+                        raise text
+                    full_text, full_text_lower = text
+                    profile_result = self._evaluate_grant_prepared(
+                        profile_name, profile, grant_info, full_text, full_text_lower,
+                        evaluation_time, extracted_info
+                    )
+                    results['all_results'][profile_name] = profile_result
+                    
+                    if profile_result['passed']:
+                        results['passed_profiles'].append(profile_name)
+                    
+                    # Actualizar mejor match
+                    if profile_result['total_score'] > results['best_score']:
+                        results['best_score'] = profile_result['total_score']
+                        results['best_match'] = profile_name
+                        
+                except Exception as e:
+                    logger.error(f"❌ Error evaluando perfil {profile_name}: {e}")
+                    results['all_results'][profile_name] = {'error': str(e)}
+        
+        return all_results
+    
+    def evaluate_corpus_parallel(self, grants: List[Dict[str, Any]],
+                                 profile_names: List[str],
+                                 extracted_infos: Optional[List[Optional[Dict[str, Any]]]] = None,
+                                 include_timestamps: bool = True,
+                                 workers: Optional[int] = None,
+                                 chunk_size: int = 500) -> List[Dict[str, Any]]:
+        """
+        evaluate_corpus repartido en varios procesos
+        
+        Cada proceso recibe una vez los perfiles pedidos y evalúa trozos de
+        chunk_size subvenciones. Compensa con lotes grandes (miles de
+        subvenciones); para lotes pequeños usar evaluate_corpus.
+        
+        Args:
+            grants, profile_names, extracted_infos, include_timestamps: como en evaluate_corpus
+            workers: Número de procesos (por defecto os.cpu_count())
+            chunk_size: Subvenciones enviadas a un proceso cada vez
+            
+        Returns:
+            Un resultado por subvención, en el mismo orden que grants
+        """
+        if extracted_infos is None:
+            extracted_infos = [None] * len(grants)
+        
+        # Solo los perfiles existentes; los que falten se reportan como error en el worker
+        profiles = {}
+        for profile_name in profile_names:
+            profile = self.get_profile(profile_name)
+            if profile is not None:
+                profiles[profile_name] = profile
+        
+        chunks = [
+            (grants[i:i + chunk_size], extracted_infos[i:i + chunk_size],
+             profile_names, include_timestamps)
+            for i in range(0, len(grants), chunk_size)
+        ]
+        
+        results = []
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                                 initializer=_init_corpus_worker,
+                                 initargs=(profiles,)) as pool:
+            for chunk_results in pool.map(_evaluate_corpus_chunk, chunks):
+                results.extend(chunk_results)
         
         return results
     
+    @classmethod
+    def from_profiles(cls, profiles: Dict[str, FilterProfile]) -> 'GrantFilter':
+        """Motor con los perfiles dados, sin leer ningún fichero"""
+        engine = cls.__new__(cls)
+        engine.profiles = dict(profiles)
+        engine.profiles_file = None
+        engine._result_cache = {}
+        return engine
+    
     def get_filter_statistics(self, evaluation_results: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Genera estadísticas de los resultados de filtrado
@@ -552,17 +1019,21 @@ class GrantFilter:
         if not evaluation_results:
             return {}
         
+        if np is not None:
+            return self._filter_statistics_vectorized(evaluation_results)
+        
         stats = {
             'total_evaluated': len(evaluation_results),
             'total_passed': 0,
             'average_score': 0.0,
             'profile_performance': {},
             'top_matches': [],
-            'score_distribution': {'0-0.2': 0, '0.2-0.4': 0, '0.4-0.6': 0, '0.6-0.8': 0, '0.8-1.0': 0}
+            'score_distribution': {}
         }
         
         score_sum = 0
         profile_stats = {}
+        buckets = [0] * len(_SCORE_BUCKET_LABELS)
         
         for result in evaluation_results:
             score = result.get('total_score', 0)
@@ -571,17 +1042,8 @@ class GrantFilter:
             if result.get('passed'):
                 stats['total_passed'] += 1
             
-            # Distribución de scores
-            if score <= 0.2:
-                stats['score_distribution']['0-0.2'] += 1
-            elif score <= 0.4:
-                stats['score_distribution']['0.2-0.4'] += 1
-            elif score <= 0.6:
-                stats['score_distribution']['0.4-0.6'] += 1
-            elif score <= 0.8:
-                stats['score_distribution']['0.6-0.8'] += 1
-            else:
-                stats['score_distribution']['0.8-1.0'] += 1
+            # Distribución de scores (cada tramo incluye su límite superior)
+            buckets[bisect_left(_SCORE_BUCKET_EDGES, score)] += 1
             
             # Estadísticas por perfil
             profile_name = result.get('profile_used')
@@ -604,6 +1066,7 @@ class GrantFilter:
         
         # Calcular promedios
         stats['average_score'] = round(score_sum / len(evaluation_results), 3)
+        stats['score_distribution'] = dict(zip(_SCORE_BUCKET_LABELS, buckets))
         
         for profile, data in profile_stats.items():
             stats['profile_performance'][profile] = {
@@ -618,6 +1081,78 @@ class GrantFilter:
                                     key=lambda x: x['score'], reverse=True)[:10]
         
         return stats
+    
+    @staticmethod
+    def _filter_statistics_vectorized(evaluation_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """get_filter_statistics con NumPy: mismas estadísticas, sin bucle por resultado"""
+        n = len(evaluation_results)
+        scores = np.fromiter((r.get('total_score', 0) for r in evaluation_results),
+                             dtype=np.float64, count=n)
+        passed = np.fromiter((bool(r.get('passed')) for r in evaluation_results),
+                             dtype=np.bool_, count=n)
+        
+        # Código por perfil en orden de aparición; -1 si el resultado no tiene perfil
+        profile_codes: Dict[str, int] = {}
+        codes = np.fromiter(
+            (profile_codes.setdefault(name, len(profile_codes)) if name else -1
+             for name in (r.get('profile_used') for r in evaluation_results)),
+            dtype=np.intp, count=n
+        )
+        
+        # Distribución de scores (cada tramo incluye su límite superior)
+        buckets = np.bincount(np.searchsorted(_SCORE_BUCKET_EDGES, scores, side='left'),
+                              minlength=len(_SCORE_BUCKET_LABELS))
+        
+        # Estadísticas por perfil
+        with_profile = codes >= 0
+        profile_ids = codes[with_profile]
+        n_profiles = len(profile_codes)
+        evaluated = np.bincount(profile_ids, minlength=n_profiles)
+        passed_count = np.bincount(profile_ids, weights=passed[with_profile], minlength=n_profiles)
+        score_sums = np.bincount(profile_ids, weights=scores[with_profile], minlength=n_profiles)
+        
+        # Top matches: score > 0.6, de mayor a menor (estable en empates)
+        top = np.flatnonzero(scores > 0.6)
+        top = top[np.argsort(-scores[top], kind='stable')][:10]
+        
+        return {
+            'total_evaluated': n,
+            'total_passed': int(passed.sum()),
+            'average_score': round(float(scores.sum()) / n, 3),
+            'profile_performance': {
+                name: {
+                    'evaluated': int(evaluated[code]),
+                    'passed': int(passed_count[code]),
+                    'pass_rate': round(int(passed_count[code]) / int(evaluated[code]), 3),
+                    'average_score': round(float(score_sums[code]) / int(evaluated[code]), 3)
+                }
+                for name, code in profile_codes.items()
+            },
+            'top_matches': [
+                {
+                    'grant_id': evaluation_results[i].get('grant_id'),
+                    'score': evaluation_results[i].get('total_score', 0),
+                    'profile': evaluation_results[i].get('profile_used')
+                }
+                for i in top.tolist()
+            ],
+            'score_distribution': dict(zip(_SCORE_BUCKET_LABELS, buckets.tolist()))
+        }
+
+
+_worker_filter: Optional[GrantFilter] = None
+
+
+def _init_corpus_worker(profiles: Dict[str, FilterProfile]):
+    """Inicializador del pool de GrantFilter.evaluate_corpus_parallel"""
+    global _worker_filter
+    _worker_filter = GrantFilter.from_profiles(profiles)
+
+
+def _evaluate_corpus_chunk(args: Tuple[Any, ...]) -> List[Dict[str, Any]]:
+    """Worker de GrantFilter.evaluate_corpus_parallel"""
+    grants, extracted_infos, profile_names, include_timestamps = args
+    return _worker_filter.evaluate_corpus(grants, profile_names, extracted_infos, include_timestamps)
 
 
 def main():
@@ -8,10 +8,11 @@ via Atom Syndication Format.
 import requests
 import logging
 import time
-import xml.etree.ElementTree as ET
-from typing import Optional, Dict, List, Any, Tuple
+from typing import Optional, Dict, List, Any, Tuple, Callable
 from datetime import datetime
 
+from lxml import etree as LET
+
 class PLACSPClient:
     """
     Client for interacting with PLACSP Atom feeds.
@@ -25,6 +26,9 @@ class PLACSPClient:
         'dgpe': 'http://contrataciondelestado.es/codice/placsp',
         'n2016': 'http://contrataciondelestado.es/codice/cl/2.04/Nuts-2016'
     }
+    
+    _ATOM_ENTRY = '{http://www.w3.org/2005/Atom}entry'
+    _ATOM_LINK = '{http://www.w3.org/2005/Atom}link'
 
     def __init__(self, timeout: int = 30, max_retries: int = 3, retry_delay: float = 1.0):
         self.timeout = timeout
@@ -36,12 +40,12 @@ class PLACSPClient:
         })
         self.logger = logging.getLogger(__name__)
 
-    def _make_request(self, url: str) -> requests.Response:
+    def _make_request(self, url: str, stream: bool = False) -> requests.Response:
         """Make HTTP request with retry logic"""
         for attempt in range(self.max_retries + 1):
             try:
                 self.logger.debug(f"Fetching {url}, attempt {attempt + 1}")
-                response = self.session.get(url, timeout=self.timeout)
+                response = self.session.get(url, timeout=self.timeout, stream=stream)
                 response.raise_for_status()
                 return response
             except requests.exceptions.RequestException as e:
@@ -51,37 +55,59 @@ class PLACSPClient:
                 else:
                     raise e
 
-    def fetch_feed(self, url: str) -> Tuple[List[ET.Element], Optional[str]]:
+    def fetch_feed(self, url: str,
+                   parse_entry: Optional[Callable[[LET._Element], Any]] = None
+                   ) -> Tuple[List[Any], Optional[str]]:
         """
         Fetch and parse an Atom feed.
         
+        Args:
+            url: Feed page URL
+            parse_entry: Optional callback applied to each <entry> as soon as
+                it has been parsed. Its results are returned instead of the
+                elements and each entry is freed right after the callback,
+                so only one entry's tree is held in memory at a time.
+        
         Returns:
             Tuple containing:
-            - List of <entry> elements (as xml.etree.ElementTree.Element)
+            - List of <entry> elements (as lxml elements), or the callback
+              results when parse_entry is given
             - URL of the 'next' page (if available)
         """
-        response = self._make_request(url)
+        # The body is parsed as it arrives (lxml iterparse over the raw
+        # stream) instead of buffering response.content and parsing it afterwards
+        response = self._make_request(url, stream=True)
+        response.raw.decode_content = True
         
+        entries = []
+        next_link = None
         try:
-            root = ET.fromstring(response.content)
-        except ET.ParseError as e:
+            context = LET.iterparse(response.raw, events=('end',), tag=(self._ATOM_ENTRY, self._ATOM_LINK))
+            for _, elem in context:
+                parent = elem.getparent()
+                # Only feed-level entries and links
+                if parent is None or parent.getparent() is not None:
+                    continue
+                if elem.tag == self._ATOM_LINK:
+                    # Read while streaming: the header may be freed below
+                    if next_link is None and elem.get('rel') == 'next':
+                        next_link = elem.get('href')
+                elif parse_entry is None:
+                    entries.append(elem)
+                else:
+                    entries.append(parse_entry(elem))
+                    elem.clear()
+                    while elem.getprevious() is not None:
+                        del parent[0]
+        except LET.XMLSyntaxError as e:
             self.logger.error(f"Failed to parse XML from {url}: {e}")
             raise
-
-        # Find entries
-        entries = root.findall('atom:entry', self.NAMESPACES)
-        
-        # Find next link
-        next_link = None
-        links = root.findall('atom:link', self.NAMESPACES)
-        for link in links:
-            if link.get('rel') == 'next':
-                next_link = link.get('href')
-                break
+        finally:
+            response.close()
                 
         return entries, next_link
 
-    def get_entry_xml(self, entry: ET.Element) -> Optional[ET.Element]:
+    def get_entry_xml(self, entry: LET._Element) -> Optional[LET._Element]:
         """
         Extract the CODICE XML content from an Atom entry.
         The content is usually inside <content> tag, but might need parsing if it's escaped.
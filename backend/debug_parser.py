@@ -2,7 +2,6 @@ import sys
 import os
 sys.path.append(os.getcwd())
 import logging
-import xml.etree.ElementTree as ET
 from app.shared.placsp_client import PLACSPClient
 from app.shared.codice_parser import CODICEParser
 from app.config import get_settings
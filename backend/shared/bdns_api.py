@@ -5,13 +5,31 @@ Robust client for interacting with the BDNS (Base de Datos Nacional de Subvencio
 Includes retry logic, error handling, and rate limiting.
 """
 
-import requests
+import os
+import re
+import json
+import sqlite3
+import asyncio
+import threading
+import httpx
 import time
 import logging
-from typing import Dict, List, Optional, Any
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, Tuple, AsyncIterator, Iterator
 from datetime import datetime, date
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from pydantic import ValidationError
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# httpx only speaks HTTP/2 when h2 is installed
+try:
+    import h2
+except ImportError:
+    h2 = None
 
 from .bdns_models import (
     BDNSSearchParams,
@@ -30,6 +48,233 @@ class BDNSAPIError(Exception):
     pass
 
 
+_MAX_AGE_RE = re.compile(r'max-age=(\d+)')
+
+
+def user_cache_path(name: str) -> str:
+    """
+    Path for an on-disk cache file in the user's own cache directory
+
+    The directory ($XDG_CACHE_HOME or ~/.cache, under 'subvenciones') is
+    created private to the user (0700), so other local users can neither
+    read nor plant cache entries.
+    """
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    directory = os.path.join(base, 'subvenciones')
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    return os.path.join(directory, name)
+
+
+class _ResponseCache:
+    """
+    Two-tier cache for idempotent GET responses
+
+    Entries live in an in-process LRU and, when a path is given, in a SQLite
+    file on disk so they survive restarts (plain columns, nothing is
+    unpickled). Each entry stores the decoded JSON,
+    the response validators (ETag / Last-Modified) and when it stops being
+    fresh: after the response's Cache-Control max-age if it sent one,
+    otherwise after `ttl`. Cached data is shared between callers and must be
+    treated as read-only.
+    """
+
+    _FIELDS = ('body', 'etag', 'last_modified', 'stored_at', 'expires')
+
+    def __init__(self, ttl: float, maxsize: int, path: Optional[str]):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.path = path
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._disk: Optional[sqlite3.Connection] = None
+
+    @staticmethod
+    def make_key(endpoint: str, params: Optional[Dict]) -> str:
+        """Key independent of parameter order"""
+        return json.dumps([endpoint, params or {}], sort_keys=True, default=str, ensure_ascii=False)
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        return time.time() < entry.get('expires', entry['stored_at'] + self.ttl)
+
+    @staticmethod
+    def has_validators(entry: Dict[str, Any]) -> bool:
+        return bool(entry.get('etag') or entry.get('last_modified'))
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the entry for key (fresh or not), or None"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry
+
+        entry = self._disk_get(key)
+        if entry is not None:
+            self._remember(key, entry)
+        return entry
+
+    def store(self, key: str, body: bytes, headers: Any,
+              previous: Optional[Dict[str, Any]] = None,
+              ttl: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Store a raw response body with the caching metadata from the response headers
+
+        `previous` is the entry being revalidated (on 304); its validators
+        are kept when the 304 doesn't repeat them. `ttl` overrides the
+        default freshness for responses without max-age. Responses marked
+        no-store are not cached.
+        """
+        cache_control = (headers.get('Cache-Control') or '').lower()
+        if 'no-store' in cache_control:
+            return None
+
+        max_age = self.ttl if ttl is None else ttl
+        if 'no-cache' in cache_control:
+            max_age = 0
+        else:
+            match = _MAX_AGE_RE.search(cache_control)
+            if match:
+                max_age = int(match.group(1))
+
+        previous = previous or {}
+        now = time.time()
+        entry = {
+            'body': body,
+            'etag': headers.get('ETag') or previous.get('etag'),
+            'last_modified': headers.get('Last-Modified') or previous.get('last_modified'),
+            'stored_at': now,
+            'expires': now + max_age
+        }
+        self._remember(key, entry)
+        self._disk_put(key, entry)
+        return entry
+
+    def _remember(self, key: str, entry: Dict[str, Any]):
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.maxsize:
+                self._memory.popitem(last=False)
+
+    def _disk_conn(self) -> sqlite3.Connection:
+        """Open (once) the SQLite file holding the entries; call under _disk_lock"""
+        if self._disk is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, body BLOB NOT NULL, etag TEXT, last_modified TEXT, "
+                "stored_at REAL NOT NULL, expires REAL NOT NULL)"
+            )
+            self._disk = conn
+        return self._disk
+
+    def close(self):
+        with self._disk_lock:
+            if self._disk is not None:
+                self._disk.close()
+                self._disk = None
+
+    def _disk_get(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.path:
+            return None
+        try:
+            with self._disk_lock:
+                row = self._disk_conn().execute(
+                    "SELECT body, etag, last_modified, stored_at, expires FROM responses WHERE key = ?",
+                    (key,)
+                ).fetchone()
+        except Exception as e:
+            logger.debug("Disk cache read failed: %s", e)
+            return None
+
+        if row is None:
+            return None
+        entry = dict(zip(self._FIELDS, row))
+        # Stale entries are only worth keeping if they can be revalidated
+        if not self.has_validators(entry) and not self.is_fresh(entry):
+            return None
+        return entry
+
+    def _disk_put(self, key: str, entry: Dict[str, Any]):
+        if not self.path:
+            return
+        try:
+            with self._disk_lock:
+                self._disk_conn().execute(
+                    "INSERT OR REPLACE INTO responses (key, body, etag, last_modified, stored_at, expires) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, *(entry[field] for field in self._FIELDS))
+                )
+        except Exception as e:
+            logger.debug("Disk cache write failed: %s", e)
+
+
+class _TTLCache:
+    """Small thread-safe LRU whose entries expire `ttl` seconds after being stored"""
+
+    def __init__(self, ttl: float, maxsize: int):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Any:
+        """Return the cached value, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() >= entry[0]:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: Any, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+class _TokenBucket:
+    """
+    Token bucket rate limiter shared by threads and coroutines
+
+    Tokens refill at `rate` per second up to `burst`. Each acquire reserves a
+    token immediately (the balance may go negative) and then waits outside
+    the lock until it is due, so waiters are served in arrival order.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take one token and return the seconds to wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self):
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
 class BDNSAPIClient:
     """Client for BDNS API with robust error handling"""
 
@@ -65,7 +310,26 @@ class BDNSAPIClient:
         ]
     }
 
-    def __init__(self, timeout: int = 30, max_retries: int = 3, backoff_factor: float = 0.5):
+    # Score contribution of each positive keyword category found in the text.
+    # Any 'excluded' keyword rules the text out regardless of score.
+    KEYWORD_WEIGHTS = {
+        'primary': 0.4,
+        'entity_types': 0.15
+    }
+
+    # Kept-alive connections held by the HTTP clients
+    POOL_SIZE = 32
+    MAX_CONNECTIONS = 64
+
+    # Status codes retried by both the sync and the async request paths
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(self, timeout: int = 30, max_retries: int = 3, backoff_factor: float = 0.5,
+                 max_concurrency: int = 8, rate_limit: float = 2.0, rate_burst: int = 5,
+                 cache_ttl: float = 180,
+                 cache_maxsize: int = 512, cache_path: Optional[str] = None,
+                 detail_cache_ttl: float = 3600, detail_cache_maxsize: int = 4096,
+                 detail_disk_ttl: float = 86400):
         """
         Initialize BDNS API client
 
@@ -73,98 +337,233 @@ class BDNSAPIClient:
             timeout: Request timeout in seconds
             max_retries: Maximum number of retry attempts
             backoff_factor: Backoff factor for retries
+            max_concurrency: Maximum requests in flight during async pagination
+                and parallel detail fetching
+            rate_limit: Sustained requests per second allowed
+            rate_burst: Requests that may be sent back to back before throttling
+            cache_ttl: Seconds a cached response is served without revalidation
+                when the API sends no Cache-Control max-age
+            cache_maxsize: Maximum responses kept in the in-memory cache
+            cache_path: SQLite file for the on-disk cache (None keeps it in memory
+                only); see user_cache_path() for a private per-user location
+            detail_cache_ttl: Seconds a parsed convocatoria detail is reused
+            detail_cache_maxsize: Maximum parsed details kept in memory
+            detail_disk_ttl: Seconds a cached detail response stays fresh (in
+                memory and on disk) when the API sends no Cache-Control max-age
         """
         self.timeout = timeout
-        self.session = requests.Session()
-
-        # Configure retry strategy
-        retry_strategy = Retry(
-            total=max_retries,
-            backoff_factor=backoff_factor,
-            status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods=["GET", "POST"]
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_concurrency = max_concurrency
+        # One pooled client shared by all threads; with HTTP/2 available,
+        # concurrent detail fetches are multiplexed over a single connection
+        self.http2 = h2 is not None
+        self._client = httpx.Client(
+            http2=self.http2,
+            timeout=timeout,
+            limits=self._limits(),
+            headers={
+                'Accept': 'application/json',
+                'Accept-Encoding': 'gzip, deflate',
+                'User-Agent': 'BDNS-API-Client/1.0'
+            }
         )
 
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        self.session.mount("http://", adapter)
-        self.session.mount("https://", adapter)
+        # Rate limiting (2 req/s sustained by default, shared by all threads)
+        self._rate_limiter = _TokenBucket(rate_limit, rate_burst)
 
-        # Set headers
-        self.session.headers.update({
-            'Accept': 'application/json',
-            'User-Agent': 'BDNS-API-Client/1.0'
-        })
+        # Response cache (GET requests are idempotent)
+        self._cache = _ResponseCache(cache_ttl, cache_maxsize, cache_path)
 
-        # Rate limiting
-        self.last_request_time = 0
-        self.min_request_interval = 0.5  # 500ms between requests
+        # Parsed details by (num_conv, vpd); a detail doesn't change within a session
+        self._detail_cache = _TTLCache(detail_cache_ttl, detail_cache_maxsize)
+        # Details barely change, so their raw responses are reused across runs
+        # for longer than search pages
+        self.detail_disk_ttl = detail_disk_ttl
 
-        logger.info("✅ BDNS API Client initialized")
+        self._build_keyword_index()
 
-    def _rate_limit(self):
-        """Implement rate limiting between requests"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
+        logger.info("✅ BDNS API Client initialized")
 
-        if time_since_last < self.min_request_interval:
-            sleep_time = self.min_request_interval - time_since_last
-            time.sleep(sleep_time)
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_keepalive_connections=self.POOL_SIZE,
+            max_connections=self.MAX_CONNECTIONS
+        )
 
-        self.last_request_time = time.time()
+    def close(self):
+        """Close the pooled HTTP connections and the on-disk cache"""
+        self._client.close()
+        self._cache.close()
 
-    def _make_request(self, endpoint: str, params: Optional[Dict] = None) -> Dict:
+    def _rate_limit(self):
+        """Wait for a rate limit token (safe to call from several threads)"""
+        self._rate_limiter.acquire()
+
+    def _cache_lookup(self, endpoint: str, params: Optional[Dict],
+                      no_cache: bool) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """Return the cache key and the stored entry (None on miss or no_cache)"""
+        key = self._cache.make_key(endpoint, params)
+        return key, (None if no_cache else self._cache.get(key))
+
+    @staticmethod
+    def _validator_headers(entry: Optional[Dict[str, Any]]) -> Optional[Dict[str, str]]:
+        """Conditional request headers for revalidating a stale entry"""
+        if entry is None:
+            return None
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers or None
+
+    def _make_request(self, endpoint: str, params: Optional[Dict] = None,
+                      no_cache: bool = False, ttl: Optional[float] = None) -> bytes:
         """
         Make API request with error handling
 
+        Fresh cached responses are returned without touching the network;
+        stale ones are revalidated with If-None-Match / If-Modified-Since and
+        reused on 304. Timeouts, transport errors and RETRY_STATUSES are
+        retried up to max_retries times with exponential backoff.
+
         Args:
             endpoint: API endpoint
             params: Query parameters
+            no_cache: Skip the cache lookup (the response is still stored)
+            ttl: Freshness of the stored response when it has no max-age
+                (default: cache_ttl)
 
         Returns:
-            Response JSON data
+            Raw JSON response body, to be validated with model_validate_json
 
         Raises:
             BDNSAPIError: If request fails
         """
-        self._rate_limit()
+        key, entry = self._cache_lookup(endpoint, params, no_cache)
+        if entry is not None and self._cache.is_fresh(entry):
+            logger.debug("💾 Cache hit: GET %s", endpoint)
+            return entry['body']
 
         url = f"{self.BASE_URL}{endpoint}"
+        headers = self._validator_headers(entry)
 
-        try:
-            logger.debug(f"🔍 Request: GET {endpoint}")
-            if params:
-                logger.debug(f"📋 Parameters: {params}")
-
-            response = self.session.get(url, params=params, timeout=self.timeout)
-
-            if response.status_code == 200:
-                data = response.json()
-                logger.debug(f"✅ Success: {response.status_code}")
-                return data
-            else:
-                error_msg = f"BDNS API error {response.status_code}: {response.text[:200]}"
-                logger.error(f"❌ {error_msg}")
-                raise BDNSAPIError(error_msg)
-
-        except requests.exceptions.Timeout:
+        for attempt in range(self.max_retries + 1):
+            self._rate_limit()
+            retry_delay = self.backoff_factor * (2 ** attempt)
+
+            try:
+                logger.debug("🔍 Request: GET %s", endpoint)
+                if params and logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("📋 Parameters: %s", params)
+
+                response = self._client.get(url, params=params, headers=headers)
+
+            except httpx.TransportError as e:
+                if attempt < self.max_retries:
+                    time.sleep(retry_delay)
+                    continue
+                raise self._request_error(e)
+
+            except httpx.HTTPError as e:
+                raise self._request_error(e)
+
+            if response.status_code in self.RETRY_STATUSES and attempt < self.max_retries:
+                time.sleep(retry_delay)
+                continue
+
+            return self._handle_response(response, endpoint, key, entry, ttl)
+
+    def _request_error(self, error: Exception) -> BDNSAPIError:
+        """Log a failed request and wrap it in a BDNSAPIError"""
+        if isinstance(error, httpx.TimeoutException):
             error_msg = f"Request timeout after {self.timeout}s"
-            logger.error(f"⏱️  {error_msg}")
+            logger.error("⏱️  %s", error_msg)
+        elif isinstance(error, httpx.TransportError):
+            error_msg = f"Connection error: {str(error)}"
+            logger.error("🔌 %s", error_msg)
+        else:
+            error_msg = f"Request exception: {str(error)}"
+            logger.error("❌ %s", error_msg)
+        return BDNSAPIError(error_msg)
+
+    def _handle_response(self, response: httpx.Response, endpoint: str, key: str,
+                         entry: Optional[Dict[str, Any]], ttl: Optional[float] = None) -> bytes:
+        """Return the body of a final (non-retried) response and update the cache"""
+        if response.status_code == 304 and entry is not None:
+            logger.debug("💾 Not modified: GET %s", endpoint)
+            self._cache.store(key, entry['body'], response.headers, previous=entry, ttl=ttl)
+            return entry['body']
+
+        if response.status_code != 200:
+            error_msg = f"BDNS API error {response.status_code}: {response.text[:200]}"
+            logger.error("❌ %s", error_msg)
             raise BDNSAPIError(error_msg)
 
-        except requests.exceptions.ConnectionError as e:
-            error_msg = f"Connection error: {str(e)}"
-            logger.error(f"🔌 {error_msg}")
-            raise BDNSAPIError(error_msg)
+        # The body is validated by the caller straight from bytes
+        # (model_validate_json), so no intermediate dict is built here
+        body = response.content
+        logger.debug("✅ Success: %s", response.status_code)
+        self._cache.store(key, body, response.headers, ttl=ttl)
+        return body
 
-        except requests.exceptions.RequestException as e:
-            error_msg = f"Request exception: {str(e)}"
-            logger.error(f"❌ {error_msg}")
-            raise BDNSAPIError(error_msg)
+    async def _rate_limit_async(self):
+        """Async counterpart of _rate_limit, drawing from the same bucket"""
+        await self._rate_limiter.acquire_async()
 
-        except ValueError as e:
-            error_msg = f"Invalid JSON response: {str(e)}"
-            logger.error(f"📄 {error_msg}")
-            raise BDNSAPIError(error_msg)
+    async def _make_request_async(self, client: httpx.AsyncClient, endpoint: str,
+                                  params: Optional[Dict], ttl: Optional[float] = None,
+                                  no_cache: bool = False) -> bytes:
+        """
+        Async version of _make_request, with the same retry policy and cache
+
+        Args:
+            client: Shared async HTTP client
+            endpoint: API endpoint
+            params: Query parameters
+            ttl: Freshness of the stored response when it has no max-age
+            no_cache: Skip the cache lookup (the response is still stored)
+
+        Returns:
+            Raw JSON response body
+
+        Raises:
+            BDNSAPIError: If request fails after all retries
+        """
+        key, entry = self._cache_lookup(endpoint, params, no_cache)
+        if entry is not None and self._cache.is_fresh(entry):
+            logger.debug("💾 Cache hit: GET %s", endpoint)
+            return entry['body']
+
+        url = f"{self.BASE_URL}{endpoint}"
+        headers = self._validator_headers(entry)
+
+        for attempt in range(self.max_retries + 1):
+            await self._rate_limit_async()
+            retry_delay = self.backoff_factor * (2 ** attempt)
+
+            try:
+                logger.debug("🔍 Request: GET %s", endpoint)
+                if params and logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("📋 Parameters: %s", params)
+
+                response = await client.get(url, params=params, headers=headers)
+
+            except httpx.TransportError as e:
+                if attempt < self.max_retries:
+                    await asyncio.sleep(retry_delay)
+                    continue
+                raise self._request_error(e)
+
+            except httpx.HTTPError as e:
+                raise self._request_error(e)
+
+            if response.status_code in self.RETRY_STATUSES and attempt < self.max_retries:
+                await asyncio.sleep(retry_delay)
+                continue
+
+            return self._handle_response(response, endpoint, key, entry, ttl)
 
     def search_convocatorias(self, params: BDNSSearchParams) -> BDNSSearchResponse:
         """
@@ -181,51 +580,114 @@ class BDNSAPIClient:
         """
         try:
             params_dict = params.to_params_dict()
-            data = self._make_request('/convocatorias/busqueda', params_dict)
+            body = self._make_request('/convocatorias/busqueda', params_dict)
 
-            response = BDNSSearchResponse(**data)
-            logger.info(f"📊 Found {response.totalElements} convocatorias")
+            response = BDNSSearchResponse.model_validate_json(body)
+            logger.info("📊 Found %s convocatorias", response.totalElements)
 
             return response
 
         except Exception as e:
-            logger.error(f"❌ Search failed: {str(e)}")
+            logger.error("❌ Search failed: %s", e)
             raise BDNSAPIError(f"Search failed: {str(e)}")
 
-    def get_convocatoria_detail(self, num_conv: str, vpd: str = "GE") -> Optional[BDNSConvocatoriaDetail]:
+    def get_convocatoria_detail(self, num_conv: str, vpd: str = "GE",
+                                refresh: bool = False) -> Optional[BDNSConvocatoriaDetail]:
         """
         Get detailed information for a convocatoria
 
         Args:
             num_conv: Convocatoria number
             vpd: Portal ID (default: GE)
+            refresh: Bypass the detail and response caches and fetch it again
 
         Returns:
-            Detailed convocatoria data or None if not found
+            Detailed convocatoria data or None if not found. Found details
+            are memoized and shared between callers; don't mutate them.
 
         Raises:
             BDNSAPIError: If request fails
         """
+        detail = None if refresh else self._detail_cache.get((num_conv, vpd))
+        if detail is not None:
+            return detail
+
         try:
-            params = {
-                'numConv': num_conv,
-                'vpd': vpd
-            }
+            body = self._make_request('/convocatorias', self._detail_params(num_conv, vpd),
+                                      no_cache=refresh, ttl=self.detail_disk_ttl)
+            return self._parse_detail(num_conv, vpd, body)
+
+        except Exception as e:
+            logger.error("❌ Failed to get detail for %s: %s", num_conv, e)
+            raise BDNSAPIError(f"Get detail failed: {str(e)}")
 
-            data = self._make_request('/convocatorias', params)
+    async def _get_convocatoria_detail_async(self, client: httpx.AsyncClient, num_conv: str,
+                                             vpd: str = "GE",
+                                             refresh: bool = False) -> Optional[BDNSConvocatoriaDetail]:
+        """Async version of get_convocatoria_detail, sharing its detail cache"""
+        detail = None if refresh else self._detail_cache.get((num_conv, vpd))
+        if detail is not None:
+            return detail
 
-            if 'codigoBDNS' in data:
-                detail = BDNSConvocatoriaDetail(**data)
-                logger.info(f"📄 Retrieved detail for {num_conv}")
-                return detail
-            else:
-                logger.warning(f"⚠️  No detail found for {num_conv}")
-                return None
+        try:
+            body = await self._make_request_async(client, '/convocatorias',
+                                                  self._detail_params(num_conv, vpd),
+                                                  ttl=self.detail_disk_ttl, no_cache=refresh)
+            return self._parse_detail(num_conv, vpd, body)
 
         except Exception as e:
-            logger.error(f"❌ Failed to get detail for {num_conv}: {str(e)}")
+            logger.error("❌ Failed to get detail for %s: %s", num_conv, e)
             raise BDNSAPIError(f"Get detail failed: {str(e)}")
 
+    async def get_convocatoria_details_async(self, codes: List[str], vpd: str = "GE",
+                                             refresh: bool = False) -> List[Any]:
+        """
+        Fetch the details of many convocatorias concurrently
+
+        Requests share one async client, with at most max_concurrency in
+        flight and each one drawing from the shared rate limiter.
+
+        Args:
+            codes: Convocatoria numbers
+            vpd: Portal ID (default: GE)
+            refresh: Bypass the detail and response caches
+
+        Returns:
+            One item per code, in order: the detail (None if not found) or
+            the BDNSAPIError raised while fetching it
+        """
+        async with self._async_client() as client:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+
+            async def fetch_detail(num_conv: str) -> Optional[BDNSConvocatoriaDetail]:
+                async with semaphore:
+                    return await self._get_convocatoria_detail_async(client, num_conv, vpd, refresh)
+
+            return await asyncio.gather(*(fetch_detail(code) for code in codes),
+                                        return_exceptions=True)
+
+    @staticmethod
+    def _detail_params(num_conv: str, vpd: str) -> Dict[str, str]:
+        return {
+            'numConv': num_conv,
+            'vpd': vpd
+        }
+
+    def _parse_detail(self, num_conv: str, vpd: str, body: bytes) -> Optional[BDNSConvocatoriaDetail]:
+        """Validate a raw detail response and memoize it"""
+        try:
+            detail = BDNSConvocatoriaDetail.model_validate_json(body)
+        except ValidationError as e:
+            # The API answers unknown convocatorias with a body lacking codigoBDNS
+            if any(err['type'] == 'missing' and err['loc'] == ('codigoBDNS',) for err in e.errors()):
+                logger.warning("⚠️  No detail found for %s", num_conv)
+                return None
+            raise
+
+        self._detail_cache.put((num_conv, vpd), detail)
+        logger.info("📄 Retrieved detail for %s", num_conv)
+        return detail
+
     def get_latest_convocatorias(self, page: int = 0, page_size: int = 50) -> BDNSSearchResponse:
         """
         Get latest convocatorias
@@ -261,7 +723,17 @@ class BDNSAPIClient:
         Returns:
             Search response filtered for nonprofits
         """
-        params = BDNSSearchParams(
+        params = self._nonprofit_params(page, page_size, fecha_desde, fecha_hasta)
+
+        logger.info("🔍 Searching for nonprofit convocatorias (page %s)", page)
+        return self.search_convocatorias(params)
+
+    @staticmethod
+    def _nonprofit_params(page: int, page_size: int,
+                          fecha_desde: Optional[str],
+                          fecha_hasta: Optional[str]) -> BDNSSearchParams:
+        """Search parameters for one page of the nonprofit search"""
+        return BDNSSearchParams(
             page=page,
             pageSize=page_size,
             order='fechaRecepcion',
@@ -272,69 +744,121 @@ class BDNSAPIClient:
             fechaHasta=fecha_hasta
         )
 
-        logger.info(f"🔍 Searching for nonprofit convocatorias (page {page})")
-        return self.search_convocatorias(params)
+    def _build_keyword_index(self):
+        """
+        Pre-lower NONPROFIT_KEYWORDS and compile them into one Aho-Corasick automaton
+
+        Exclusions come first, followed by the weighted categories in
+        declaration order, so analyze_nonprofit reports keywords and
+        accumulates the score in the same order as a keyword-by-keyword scan.
+        Without pyahocorasick each keyword is checked with `in`.
+        """
+        exclusions = [('excluded', keyword, keyword.lower(), 0.0)
+                      for keyword in self.NONPROFIT_KEYWORDS['excluded']]
+        self._exclusion_count = len(exclusions)
+        self._keyword_entries = exclusions + [
+            (category, keyword, keyword.lower(), weight)
+            for category, weight in self.KEYWORD_WEIGHTS.items()
+            for keyword in self.NONPROFIT_KEYWORDS[category]
+        ]
 
-    def analyze_nonprofit(self, text: str) -> BDNSNonprofitAnalysis:
+        self._keyword_automaton = None
+        if ahocorasick is not None:
+            automaton = ahocorasick.Automaton()
+            for index, (_, _, keyword_lower, _) in enumerate(self._keyword_entries):
+                if automaton.exists(keyword_lower):
+                    automaton.get(keyword_lower).append(index)
+                else:
+                    automaton.add_word(keyword_lower, [index])
+            automaton.make_automaton()
+            self._keyword_automaton = automaton
+
+    def _find_keywords(self, text_lower: str) -> List[int]:
+        """
+        Indexes into _keyword_entries of the keywords present in text_lower, in order
+
+        An exclusion decides the result on its own, so the scan stops at the
+        first one found and only its index is returned.
+        """
+        exclusion_count = self._exclusion_count
+
+        if self._keyword_automaton is None:
+            # A regex alternation can't replace this loop: it needs a
+            # lookahead to report overlapping keywords and then scans slower
+            # than ~20 C-level substring searches over a short title
+            contains = text_lower.__contains__
+            entries = self._keyword_entries
+            for index in range(exclusion_count):
+                if contains(entries[index][2]):
+                    return [index]
+            return [index for index in range(exclusion_count, len(entries))
+                    if contains(entries[index][2])]
+
+        found = set()
+        for _, indexes in self._keyword_automaton.iter(text_lower):
+            # Index lists are built in increasing order
+            if indexes[0] < exclusion_count:
+                return [indexes[0]]
+            found.update(indexes)
+        return sorted(found)
+
+    def analyze_nonprofit(self, text: str, *, already_lower: bool = False) -> BDNSNonprofitAnalysis:
         """
         Analyze text to determine if it's for nonprofit organizations
 
+        Texts with an exclusion keyword are rejected straight away with a
+        zero score; only the first exclusion found is reported.
+
         Args:
             text: Text to analyze (title + description)
+            already_lower: The caller already lowercased text
 
         Returns:
             Nonprofit analysis result
         """
-        text_lower = text.lower()
+        found = self._find_keywords(text if already_lower else text.lower())
 
-        analysis = BDNSNonprofitAnalysis(
-            is_nonprofit=False,
-            confidence_score=0.0,
-            primary_keywords_found=[],
-            entity_type_keywords_found=[],
-            exclusion_keywords_found=[],
-            has_exclusions=False,
-            matched_keywords=[]
-        )
+        if found and found[0] < self._exclusion_count:
+            return BDNSNonprofitAnalysis(
+                is_nonprofit=False,
+                confidence_score=0.0,
+                exclusion_keywords_found=[self._keyword_entries[found[0]][1]],
+                has_exclusions=True
+            )
 
-        # Check primary nonprofit keywords (REQUIRED)
-        for keyword in self.NONPROFIT_KEYWORDS['primary']:
-            if keyword.lower() in text_lower:
-                analysis.primary_keywords_found.append(keyword)
-                analysis.matched_keywords.append(keyword)
-                analysis.confidence_score += 0.4
-
-        # Check entity type keywords (POSITIVE INDICATOR)
-        for keyword in self.NONPROFIT_KEYWORDS['entity_types']:
-            if keyword.lower() in text_lower:
-                analysis.entity_type_keywords_found.append(keyword)
-                analysis.matched_keywords.append(keyword)
-                analysis.confidence_score += 0.15
-
-        # Check exclusion keywords (NEGATIVE INDICATOR)
-        for keyword in self.NONPROFIT_KEYWORDS['excluded']:
-            if keyword.lower() in text_lower:
-                analysis.exclusion_keywords_found.append(keyword)
-                analysis.has_exclusions = True
-                analysis.confidence_score -= 0.5
+        primary = []
+        entity_types = []
+        score = 0.0
+
+        found_lists = {'primary': primary, 'entity_types': entity_types}
+
+        for index in found:
+            category, keyword, _, weight = self._keyword_entries[index]
+            found_lists[category].append(keyword)
+            score += weight
 
         # Determine if nonprofit based on rules:
         # 1. Must have at least one primary keyword
-        # 2. Must NOT have exclusion keywords
+        # 2. Must NOT have exclusion keywords (handled above)
         # 3. Confidence score must be > 0.3
-        if analysis.primary_keywords_found and not analysis.has_exclusions and analysis.confidence_score > 0.3:
-            analysis.is_nonprofit = True
-
-        # Cap confidence score
-        analysis.confidence_score = max(0.0, min(1.0, analysis.confidence_score))
-
-        return analysis
+        return BDNSNonprofitAnalysis(
+            is_nonprofit=bool(primary) and score > 0.3,
+            # Cap confidence score
+            confidence_score=min(1.0, score),
+            primary_keywords_found=primary,
+            entity_type_keywords_found=entity_types,
+            matched_keywords=primary + entity_types
+        )
 
     def filter_nonprofit_results(self, convocatorias: List[BDNSConvocatoriaSummary],
                                 fetch_details: bool = False) -> List[Dict[str, Any]]:
         """
         Filter convocatorias for nonprofit organizations
 
+        All convocatorias are classified first; details for the matches are
+        then fetched concurrently (up to max_concurrency threads, still
+        subject to the shared rate limit).
+
         Args:
             convocatorias: List of convocatorias to filter
             fetch_details: Whether to fetch full details for each
@@ -342,32 +866,47 @@ class BDNSAPIClient:
         Returns:
             List of filtered convocatorias with nonprofit analysis
         """
-        filtered = []
+        hits = self._classify_nonprofit(convocatorias)
+        filtered = [self._nonprofit_result(conv, analysis) for conv, analysis in hits]
+
+        # Fetch details if requested
+        if fetch_details and hits:
+            num_convs = [conv.numeroConvocatoria for conv, _ in hits]
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(hits))) as executor:
+                for result, detail in zip(filtered, executor.map(self._get_detail_or_none, num_convs)):
+                    if detail:
+                        result['detail'] = detail.model_dump()
+
+        logger.info("✅ Filtered %s nonprofit convocatorias from %s", len(filtered), len(convocatorias))
+        return filtered
 
+    def _classify_nonprofit(self, convocatorias: List[BDNSConvocatoriaSummary]
+                            ) -> List[Tuple[BDNSConvocatoriaSummary, BDNSNonprofitAnalysis]]:
+        """Convocatorias classified as nonprofit, with their analysis"""
+        hits = []
         for conv in convocatorias:
             # Analyze text
-            text = f"{conv.descripcion} {conv.nivel1} {conv.nivel2 or ''}"
-            analysis = self.analyze_nonprofit(text)
-
+            text_lower = f"{conv.descripcion} {conv.nivel1} {conv.nivel2 or ''}".lower()
+            analysis = self.analyze_nonprofit(text_lower, already_lower=True)
             if analysis.is_nonprofit:
-                result = {
-                    'convocatoria': conv.dict(),
-                    'nonprofit_analysis': analysis.dict()
-                }
-
-                # Fetch details if requested
-                if fetch_details:
-                    try:
-                        detail = self.get_convocatoria_detail(conv.numeroConvocatoria)
-                        if detail:
-                            result['detail'] = detail.dict()
-                    except Exception as e:
-                        logger.warning(f"⚠️  Could not fetch detail for {conv.numeroConvocatoria}: {e}")
-
-                filtered.append(result)
+                hits.append((conv, analysis))
+        return hits
+
+    @staticmethod
+    def _nonprofit_result(conv: BDNSConvocatoriaSummary,
+                          analysis: BDNSNonprofitAnalysis) -> Dict[str, Any]:
+        return {
+            'convocatoria': conv.model_dump(),
+            'nonprofit_analysis': analysis.model_dump()
+        }
 
-        logger.info(f"✅ Filtered {len(filtered)} nonprofit convocatorias from {len(convocatorias)}")
-        return filtered
+    def _get_detail_or_none(self, num_conv: str) -> Optional[BDNSConvocatoriaDetail]:
+        """get_convocatoria_detail that logs failures instead of raising"""
+        try:
+            return self.get_convocatoria_detail(num_conv)
+        except Exception as e:
+            logger.warning("⚠️  Could not fetch detail for %s: %s", num_conv, e)
+            return None
 
     def search_nonprofit_all_pages(self, max_pages: int = 10,
                                   fecha_desde: Optional[str] = None,
@@ -375,6 +914,9 @@ class BDNSAPIClient:
         """
         Search all pages for nonprofit convocatorias
 
+        List wrapper around iter_nonprofit_all_pages for callers that need
+        every result at once.
+
         Args:
             max_pages: Maximum pages to fetch
             fecha_desde: Start date (dd/MM/yyyy)
@@ -383,40 +925,190 @@ class BDNSAPIClient:
         Returns:
             List of all nonprofit convocatorias found
         """
-        all_results = []
-        page = 0
+        logger.info("🔍 Fetching nonprofit convocatorias (max %s pages)...", max_pages)
 
-        logger.info(f"🔍 Fetching nonprofit convocatorias (max {max_pages} pages)...")
+        all_results = list(self.iter_nonprofit_all_pages(max_pages, fecha_desde, fecha_hasta))
 
-        while page < max_pages:
+        logger.info("✅ Total nonprofit convocatorias fetched: %s", len(all_results))
+        return all_results
+
+    def iter_nonprofit_all_pages(self, max_pages: int = 10,
+                                 fecha_desde: Optional[str] = None,
+                                 fecha_hasta: Optional[str] = None) -> Iterator[BDNSConvocatoriaSummary]:
+        """
+        Iterate over nonprofit convocatorias from all pages
+
+        Page 0 is fetched first to learn the page count; the remaining pages
+        are then requested concurrently (see _iter_nonprofit_pages_async) and
+        their results yielded in page order as they arrive, so only about a
+        page's worth of results is held at a time. Pages download while the
+        generator is being advanced. Must not be used from inside a running
+        event loop.
+
+        Args:
+            max_pages: Maximum pages to fetch
+            fecha_desde: Start date (dd/MM/yyyy)
+            fecha_hasta: End date (dd/MM/yyyy)
+
+        Yields:
+            Nonprofit convocatorias found
+        """
+        loop = asyncio.new_event_loop()
+        client = self._async_client()
+        pages = self._iter_nonprofit_pages_async(client, max_pages, fecha_desde, fecha_hasta)
+
+        try:
+            while True:
+                try:
+                    response = loop.run_until_complete(pages.__anext__())
+                except StopAsyncIteration:
+                    break
+                yield from response.content
+        finally:
+            loop.run_until_complete(pages.aclose())
+            loop.run_until_complete(client.aclose())
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    def _async_client(self) -> httpx.AsyncClient:
+        """Async client configured like the sync one"""
+        return httpx.AsyncClient(headers=self._client.headers, http2=self.http2,
+                                 timeout=self.timeout, limits=self._limits())
+
+    async def _iter_nonprofit_pages_async(self, client: httpx.AsyncClient, max_pages: int,
+                                          fecha_desde: Optional[str],
+                                          fecha_hasta: Optional[str],
+                                          page_size: int = 50) -> AsyncIterator[BDNSSearchResponse]:
+        """
+        Yield nonprofit search pages in order, fetching them concurrently
+
+        After page 0, every remaining page is requested at once, with at
+        most max_concurrency in flight and each request drawing from the
+        shared rate limiter. Pages are yielded as soon as they and all
+        earlier pages have arrived, and iteration stops at the first failed
+        or empty page, exactly as the sequential loop did.
+        """
+        if max_pages <= 0:
+            return
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        # Only the page number changes between requests, so the validated
+        # params are serialized once and copied per page (concurrent
+        # requests and the cache keys each need their own dict)
+        base_params = self._nonprofit_params(0, page_size, fecha_desde, fecha_hasta).to_params_dict()
+
+        async def fetch_page(page: int) -> BDNSSearchResponse:
+            params = dict(base_params, page=page)
+            async with semaphore:
+                body = await self._make_request_async(client, '/convocatorias/busqueda', params)
             try:
-                response = self.search_nonprofit(
-                    page=page,
-                    page_size=50,
-                    fecha_desde=fecha_desde,
-                    fecha_hasta=fecha_hasta
-                )
+                return BDNSSearchResponse.model_validate_json(body)
+            except Exception as e:
+                raise BDNSAPIError(f"Search failed: {str(e)}")
+
+        try:
+            first = await fetch_page(0)
+        except BDNSAPIError as e:
+            logger.error("❌ Error fetching page 0: %s", e)
+            return
+
+        if not first.content:
+            logger.info("📄 No more results at page 0")
+            return
+
+        fetched = len(first.content)
+        logger.info("📄 Page 1: %s results (%s/%s total)", fetched, fetched, first.totalElements)
+        yield first
+
+        if first.last or fetched >= first.totalElements:
+            return
+
+        page_count = min(max_pages, first.totalPages)
+        tasks = [asyncio.ensure_future(fetch_page(page)) for page in range(1, page_count)]
+
+        try:
+            for page, task in enumerate(tasks, start=1):
+                try:
+                    response = await task
+                except BDNSAPIError as e:
+                    logger.error("❌ Error fetching page %s: %s", page, e)
+                    return
 
                 if not response.content:
-                    logger.info(f"📄 No more results at page {page}")
-                    break
+                    logger.info("📄 No more results at page %s", page)
+                    return
+
+                fetched += len(response.content)
+                logger.info("📄 Page %s: %s results (%s/%s total)", page + 1, len(response.content), fetched, response.totalElements)
+                yield response
+
+                if response.last or fetched >= response.totalElements:
+                    return
+        finally:
+            # Pages past the stopping point are not needed
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def stream_nonprofit_with_details(self, max_pages: int = 10,
+                                            fecha_desde: Optional[str] = None,
+                                            fecha_hasta: Optional[str] = None
+                                            ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream nonprofit convocatorias with their details
 
-                all_results.extend(response.content)
-                logger.info(f"📄 Page {page + 1}: {len(response.content)} results ({len(all_results)}/{response.totalElements} total)")
+        Pipelines search and detail fetching: as soon as a page arrives its
+        nonprofit matches are classified and their detail requests started,
+        while the following pages are still downloading. Yields the same
+        dicts as filter_nonprofit_results(fetch_details=True), in page order.
 
-                # Stop if we've reached the last page
-                if response.last or len(all_results) >= response.totalElements:
-                    break
+        Args:
+            max_pages: Maximum pages to fetch
+            fecha_desde: Start date (dd/MM/yyyy)
+            fecha_hasta: End date (dd/MM/yyyy)
 
-                page += 1
-                time.sleep(0.5)  # Extra rate limiting for multi-page requests
+        Yields:
+            Filtered convocatorias with nonprofit analysis and detail
+        """
+        async with self._async_client() as client:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
 
-            except BDNSAPIError as e:
-                logger.error(f"❌ Error fetching page {page}: {e}")
-                break
+            async def fetch_detail(num_conv: str) -> Optional[BDNSConvocatoriaDetail]:
+                async with semaphore:
+                    try:
+                        return await self._get_convocatoria_detail_async(client, num_conv)
+                    except Exception as e:
+                        logger.warning("⚠️  Could not fetch detail for %s: %s", num_conv, e)
+                        return None
 
-        logger.info(f"✅ Total nonprofit convocatorias fetched: {len(all_results)}")
-        return all_results
+            def with_detail(result: Dict[str, Any], task: "asyncio.Future") -> Dict[str, Any]:
+                detail = task.result()
+                if detail:
+                    result['detail'] = detail.model_dump()
+                return result
+
+            pending = deque()
+            try:
+                async for response in self._iter_nonprofit_pages_async(client, max_pages,
+                                                                       fecha_desde, fecha_hasta):
+                    for conv, analysis in self._classify_nonprofit(response.content):
+                        task = asyncio.ensure_future(fetch_detail(conv.numeroConvocatoria))
+                        pending.append((self._nonprofit_result(conv, analysis), task))
+
+                    # Hand out whatever is ready without holding up the next page
+                    while pending and pending[0][1].done():
+                        yield with_detail(*pending.popleft())
+
+                while pending:
+                    result, task = pending[0]
+                    await task
+                    pending.popleft()
+                    yield with_detail(result, task)
+            finally:
+                for _, task in pending:
+                    task.cancel()
+                await asyncio.gather(*(task for _, task in pending), return_exceptions=True)
 
     def get_statistics(self, fecha_desde: Optional[str] = None,
                       fecha_hasta: Optional[str] = None) -> Dict[str, Any]:
@@ -449,7 +1141,7 @@ class BDNSAPIClient:
             'timestamp': datetime.now().isoformat()
         }
 
-        logger.info(f"📊 Statistics: {response.totalElements} nonprofit convocatorias found")
+        logger.info("📊 Statistics: %s nonprofit convocatorias found", response.totalElements)
         return stats
 
 
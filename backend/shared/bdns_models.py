@@ -4,10 +4,49 @@ BDNS Pydantic Models
 Data models for BDNS (Base de Datos Nacional de Subvenciones) API
 """
 
-from pydantic import BaseModel, Field, validator
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, BeforeValidator, ConfigDict, Field, field_serializer
+from typing import Annotated, Optional, List, Dict, Any
 from datetime import date, datetime
 from enum import Enum
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_bdns_date(value: Any) -> Any:
+    """
+    Parse the date formats BDNS uses: YYYY-MM-DD, dd/MM/yyyy and ISO or SQL
+    datetimes (cut to their date part). Empty strings are missing dates.
+
+    Raises:
+        ValueError: If a string is in none of those formats
+    """
+    if isinstance(value, str):
+        if not value:
+            return None
+        if '/' in value:
+            return datetime.strptime(value, "%d/%m/%Y").date()
+        return date.fromisoformat(value[:10])
+    return value
+
+
+def _coerce_bdns_date(value: Any) -> Any:
+    """
+    _parse_bdns_date for dates in API responses: an unparseable value is
+    logged and read as missing, so one bad date never fails a whole
+    results page or detail
+    """
+    try:
+        return _parse_bdns_date(value)
+    except ValueError:
+        logger.warning("⚠️ Could not parse BDNS date: %r", value)
+        return None
+
+
+# Response date fields (tolerant, see _coerce_bdns_date)
+OptionalBDNSDate = Annotated[Optional[date], BeforeValidator(_coerce_bdns_date)]
+# Search parameters: caller input, so a malformed date is still an error
+OptionalBDNSDateParam = Annotated[Optional[date], BeforeValidator(_parse_bdns_date)]
 
 
 class BDNSAdministrationType(str, Enum):
@@ -24,8 +63,7 @@ class BDNSOrgan(BaseModel):
     nivel2: Optional[str] = Field(None, description="Level 2 organization")
     nivel3: Optional[str] = Field(None, description="Level 3 organization")
 
-    class Config:
-        extra = "allow"
+    model_config = ConfigDict(extra="allow")
 
 
 class BDNSBeneficiaryType(BaseModel):
@@ -33,8 +71,7 @@ class BDNSBeneficiaryType(BaseModel):
     codigo: Optional[str] = Field(None, description="Beneficiary code")
     descripcion: str = Field(..., description="Beneficiary description")
 
-    class Config:
-        extra = "allow"
+    model_config = ConfigDict(extra="allow")
 
 
 class BDNSSector(BaseModel):
@@ -42,32 +79,28 @@ class BDNSSector(BaseModel):
     codigo: Optional[str] = Field(None, description="Sector code (CNAE)")
     descripcion: str = Field(..., description="Sector description")
 
-    class Config:
-        extra = "allow"
+    model_config = ConfigDict(extra="allow")
 
 
 class BDNSRegion(BaseModel):
     """Geographic region"""
     descripcion: str = Field(..., description="Region description (e.g., ES41 - CASTILLA Y LEON)")
 
-    class Config:
-        extra = "allow"
+    model_config = ConfigDict(extra="allow")
 
 
 class BDNSInstrument(BaseModel):
     """Funding instrument"""
     descripcion: str = Field(..., description="Instrument description")
 
-    class Config:
-        extra = "allow"
+    model_config = ConfigDict(extra="allow", defer_build=True)
 
 
 class BDNSFund(BaseModel):
     """European or other fund"""
     descripcion: str = Field(..., description="Fund description (e.g., FEDER)")
 
-    class Config:
-        extra = "allow"
+    model_config = ConfigDict(extra="allow", defer_build=True)
 
 
 class BDNSRegulation(BaseModel):
@@ -75,16 +108,14 @@ class BDNSRegulation(BaseModel):
     descripcion: str = Field(..., description="Regulation description")
     autorizacion: Optional[int] = Field(None, description="Authorization type")
 
-    class Config:
-        extra = "allow"
+    model_config = ConfigDict(extra="allow", defer_build=True)
 
 
 class BDNSObjective(BaseModel):
     """Policy objective"""
     descripcion: str = Field(..., description="Objective description")
 
-    class Config:
-        extra = "allow"
+    model_config = ConfigDict(extra="allow", defer_build=True)
 
 
 class BDNSDocument(BaseModel):
@@ -96,8 +127,7 @@ class BDNSDocument(BaseModel):
     datMod: Optional[str] = Field(None, description="Modification date")
     datPublicacion: Optional[str] = Field(None, description="Publication date")
 
-    class Config:
-        extra = "allow"
+    model_config = ConfigDict(extra="allow", defer_build=True)
 
 
 class BDNSAnnouncement(BaseModel):
@@ -112,8 +142,7 @@ class BDNSAnnouncement(BaseModel):
     desDiarioOficial: Optional[str] = Field(None, description="Official bulletin name")
     datPublicacion: Optional[str] = Field(None, description="Publication date")
 
-    class Config:
-        extra = "allow"
+    model_config = ConfigDict(extra="allow", defer_build=True)
 
 
 class BDNSConvocatoriaSummary(BaseModel):
@@ -122,15 +151,14 @@ class BDNSConvocatoriaSummary(BaseModel):
     numeroConvocatoria: str = Field(..., description="BDNS convocatoria number")
     descripcion: str = Field(..., description="Title/description")
     descripcionLeng: Optional[str] = Field(None, description="Description in co-official language")
-    fechaRecepcion: str = Field(..., description="Reception date (YYYY-MM-DD)")
+    fechaRecepcion: OptionalBDNSDate = Field(None, description="Reception date")
     nivel1: str = Field(..., description="Level 1 organization")
     nivel2: Optional[str] = Field(None, description="Level 2 organization")
     nivel3: Optional[str] = Field(None, description="Level 3 organization")
     mrr: bool = Field(False, description="EU Recovery Mechanism flag")
     codigoInvente: Optional[str] = Field(None, description="INVENTE code")
 
-    class Config:
-        extra = "allow"
+    model_config = ConfigDict(extra="allow")
 
 
 class BDNSConvocatoriaDetail(BaseModel):
@@ -139,7 +167,7 @@ class BDNSConvocatoriaDetail(BaseModel):
     codigoBDNS: str = Field(..., description="BDNS code")
     organo: Optional[BDNSOrgan] = Field(None, description="Publishing organization")
     sedeElectronica: Optional[str] = Field(None, description="Electronic headquarters URL")
-    fechaRecepcion: str = Field(..., description="Reception date")
+    fechaRecepcion: OptionalBDNSDate = Field(None, description="Reception date")
     descripcion: str = Field(..., description="Description/title")
     descripcionLeng: Optional[str] = Field(None, description="Description in co-official language")
 
@@ -154,8 +182,8 @@ class BDNSConvocatoriaDetail(BaseModel):
     regiones: Optional[List[BDNSRegion]] = Field(None, description="Geographic regions")
 
     # Dates
-    fechaInicioSolicitud: Optional[str] = Field(None, description="Application start date")
-    fechaFinSolicitud: Optional[str] = Field(None, description="Application end date")
+    fechaInicioSolicitud: OptionalBDNSDate = Field(None, description="Application start date")
+    fechaFinSolicitud: OptionalBDNSDate = Field(None, description="Application end date")
     abierto: Optional[bool] = Field(None, description="Is open for applications")
 
     # EU and regulatory information
@@ -179,8 +207,7 @@ class BDNSConvocatoriaDetail(BaseModel):
     # Products/sectors (less common)
     sectoresProductos: Optional[List[Any]] = Field(None, description="Product sectors")
 
-    class Config:
-        extra = "allow"
+    model_config = ConfigDict(extra="allow")
 
 
 class BDNSSearchParams(BaseModel):
@@ -198,8 +225,8 @@ class BDNSSearchParams(BaseModel):
     mrr: Optional[bool] = Field(None, description="Filter by MRR flag")
 
     # Date filters
-    fechaDesde: Optional[str] = Field(None, description="Start date (dd/MM/yyyy)")
-    fechaHasta: Optional[str] = Field(None, description="End date (dd/MM/yyyy)")
+    fechaDesde: OptionalBDNSDateParam = Field(None, description="Start date (date or dd/MM/yyyy)")
+    fechaHasta: OptionalBDNSDateParam = Field(None, description="End date (date or dd/MM/yyyy)")
 
     # Organization filters
     tipoAdministracion: Optional[str] = Field(None, description="Administration type (C/A/L/O)")
@@ -212,19 +239,20 @@ class BDNSSearchParams(BaseModel):
     finalidad: Optional[int] = Field(None, description="Purpose/finalidad ID")
     ayudaEstado: Optional[str] = Field(None, description="State aid number")
 
-    class Config:
-        extra = "allow"
+    model_config = ConfigDict(extra="allow")
+
+    @field_serializer('fechaDesde', 'fechaHasta')
+    def _serialize_date_filter(self, value: Optional[date]) -> Optional[str]:
+        # The search endpoint only understands dd/MM/yyyy
+        if value is None:
+            return None
+        return f"{value.day:02d}/{value.month:02d}/{value.year:04d}"
 
     def to_params_dict(self) -> Dict[str, Any]:
         """Convert to query parameters dictionary"""
-        params = {}
-        for field_name, field_value in self.dict(exclude_none=True).items():
-            if isinstance(field_value, list):
-                # Convert lists to comma-separated strings or handle as per API
-                params[field_name] = field_value
-            else:
-                params[field_name] = field_value
-        return params
+        # Lists are sent as repeated query parameters, so the dump is
+        # already in the shape the API expects
+        return self.model_dump(exclude_none=True)
 
 
 class BDNSSearchResponse(BaseModel):
@@ -241,8 +269,7 @@ class BDNSSearchResponse(BaseModel):
     empty: bool = Field(..., description="Is empty")
     advertencia: Optional[str] = Field(None, description="Legal notice")
 
-    class Config:
-        extra = "allow"
+    model_config = ConfigDict(extra="allow")
 
 
 class BDNSNonprofitAnalysis(BaseModel):
@@ -255,8 +282,7 @@ class BDNSNonprofitAnalysis(BaseModel):
     has_exclusions: bool = Field(False, description="Has for-profit exclusion keywords")
     matched_keywords: List[str] = Field(default_factory=list, description="All matched keywords")
 
-    class Config:
-        extra = "allow"
+    model_config = ConfigDict(extra="allow", frozen=True, defer_build=True)
 
 
 class BDNSEnrichedGrant(BaseModel):
@@ -301,5 +327,4 @@ class BDNSEnrichedGrant(BaseModel):
     enrichment_date: Optional[str] = Field(None, description="When enrichment occurred")
     relevance_score: Optional[float] = Field(None, description="Overall relevance score")
 
-    class Config:
-        extra = "allow"
+    model_config = ConfigDict(extra="allow", frozen=True, defer_build=True)
@@ -0,0 +1,50 @@
+"""
+Main PDF selection for BDNS convocatorias
+
+Single place for the priority order used by the BDNS scripts:
+attached documents, then announcements, then the regulatory bases URL.
+"""
+
+from typing import Optional, Tuple
+
+from .bdns_models import BDNSConvocatoriaDetail
+
+# Public download URL of a BDNS document, by document id
+document_url = "https://www.infosubvenciones.es/bdnstrans/api/documento/{}".format
+
+
+def _from_documentos(detail: BDNSConvocatoriaDetail) -> Optional[str]:
+    docs = detail.documentos
+    return document_url(docs[0].id) if docs else None
+
+
+def _from_anuncios(detail: BDNSConvocatoriaDetail) -> Optional[str]:
+    anuncios = detail.anuncios
+    return anuncios[0].url if anuncios else None
+
+
+def _from_bases_reguladoras(detail: BDNSConvocatoriaDetail) -> Optional[str]:
+    return detail.urlBasesReguladoras
+
+
+# (source name, getter) in priority order
+PDF_SOURCES = (
+    ('documentos', _from_documentos),
+    ('anuncios', _from_anuncios),
+    ('urlBasesReguladoras', _from_bases_reguladoras),
+)
+
+
+def pick_pdf_url(detail: BDNSConvocatoriaDetail) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Pick the main PDF URL of a convocatoria
+
+    Returns:
+        (url, name of the source it came from), or (None, None) if the
+        detail has no usable URL
+    """
+    for source, getter in PDF_SOURCES:
+        url = getter(detail)
+        if url:
+            return url, source
+    return None, None
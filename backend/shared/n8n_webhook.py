@@ -6,18 +6,33 @@ Este módulo maneja el envío de información de subvenciones del BOE a webhooks
 para su procesamiento con agentes, incluyendo reintentos, formateo de datos y logging.
 """
 
+import asyncio
+import importlib.util
 import os
+import re
 import sys
-import json
-import time
 import uuid
 import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, asdict
-from urllib.parse import urlparse
+from functools import cached_property, lru_cache
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Any, Tuple
+from dataclasses import dataclass
 import requests
+from requests.adapters import HTTPAdapter
+import gzip
 import logging
+import msgspec
+
+if TYPE_CHECKING:
+    import httpx
+
+# zstandard es opcional: sin él, los payloads de la cola se comprimen con gzip
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 
 # Configurar logging
@@ -27,6 +42,59 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# URL http(s) con host; el grupo 1 es el esquema
+_WEBHOOK_URL_RE = re.compile(r'^(https?)://[^/\s]+', re.IGNORECASE)
+
+# Tamaño máximo (en bytes UTF-8) del texto y markdown enviados por payload
+MAX_PDF_TEXT_BYTES = 10_000
+
+
+def _truncate_utf8(text: str, max_bytes: int = MAX_PDF_TEXT_BYTES) -> str:
+    """Recorta el texto para que ocupe como mucho max_bytes en UTF-8"""
+    # Cada carácter ocupa como mucho 4 bytes: los textos cortos no se codifican
+    if len(text) * 4 <= max_bytes:
+        return text
+    encoded = text.encode('utf-8')
+    if len(encoded) <= max_bytes:
+        return text
+    # errors='ignore' descarta el carácter multibyte que quede partido al final
+    return encoded[:max_bytes].decode('utf-8', errors='ignore')
+
+
+def _safe_float(value: Any) -> Optional[float]:
+    """Convierte a float un valor de N8n; None si está vacío o no es numérico"""
+    if not value:
+        return None
+    # N8n suele devolver números ya tipados: sin conversión ni excepción
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+# Los frames zstd empiezan por este número mágico; el resto de BLOBs son gzip
+_ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+
+def _compress_payload(data: bytes) -> bytes:
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _decompress_payload(stored) -> bytes:
+    """JSON de un payload de la cola, sea cual sea el formato en que se guardó"""
+    # Filas anteriores a la compresión: JSON en texto plano
+    if isinstance(stored, str):
+        return stored.encode('utf-8')
+    if stored.startswith(_ZSTD_MAGIC):
+        if zstandard is None:
+            raise RuntimeError("Payload comprimido con zstd y zstandard no está instalado")
+        return zstandard.ZstdDecompressor().decompress(stored)
+    return gzip.decompress(stored)
+
 
 @dataclass
 class WebhookPayload:
@@ -64,44 +132,124 @@ class WebhookPayload:
             self.metadata = {}
         if self.processing_info is None:
             self.processing_info = {}
+    
+    @cached_property
+    def json_bytes(self) -> bytes:
+        """
+        JSON del payload, codificado directamente desde el dataclass
+        
+        Se codifica una sola vez y se reutiliza (envío, cola y reintentos),
+        así que el payload no debe modificarse después de leerlo. msgspec solo
+        serializa los campos del dataclass, no esta caché.
+        """
+        return msgspec.json.encode(self)
+    
+    @classmethod
+    def from_json(cls, raw: bytes) -> 'WebhookPayload':
+        """Reconstruye un payload guardado en la cola, conservando su JSON"""
+        payload = cls(**msgspec.json.decode(raw))
+        # Se envía tal cual se guardó, sin volver a codificar
+        payload.__dict__['json_bytes'] = raw
+        return payload
+
+
+@lru_cache(maxsize=1)
+def _get_main_db_path() -> str:
+    """Ruta de la base de datos principal (la configuración se lee una sola vez)"""
+    from boe_to_n8n import load_config
+    config = load_config()
+    return config.get('db_path', 'boe_processing.db')
 
 
 class WebhookQueue:
     """Cola de envío de webhooks con persistencia"""
     
+    # Ajustes de concurrencia de SQLite: WAL permite leer mientras se escribe
+    # y synchronous=NORMAL evita un fsync por transacción (seguro con WAL)
+    PRAGMAS = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA busy_timeout=5000",
+        "PRAGMA temp_store=MEMORY",
+    )
+    
+    # Espera máxima (segundos) antes de reintentar un elemento fallido
+    MAX_RETRY_DELAY = 60
+    
+    # Un elemento fallido no vuelve a entregarse hasta pasados 2**attempts
+    # segundos (con tope MAX_RETRY_DELAY) desde su último intento
+    _DUE_SQL = '''
+        AND (last_attempt IS NULL
+             OR last_attempt <= datetime('now', printf('-%d seconds', min(?, 1 << attempts))))
+    '''
+    
+    _MARK_SUCCESS_SQL = '''
+        UPDATE webhook_queue 
+        SET status = 'success', success_at = CURRENT_TIMESTAMP 
+        WHERE id = ?
+    '''
+    
+    _MARK_ERROR_SQL = '''
+        UPDATE webhook_queue 
+        SET attempts = attempts + 1, 
+            last_attempt = CURRENT_TIMESTAMP,
+            error_message = ?,
+            status = CASE 
+                WHEN attempts >= 4 THEN 'failed'
+                ELSE 'pending'
+            END
+        WHERE id = ?
+    '''
+    
     def __init__(self, db_path: str = "webhook_queue.db"):
         self.db_path = db_path
+        # Una única conexión de larga duración (en modo autocommit) compartida
+        # por todos los métodos; el lock serializa el acceso entre hilos
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        for pragma in self.PRAGMAS:
+            self._conn.execute(pragma)
         self._init_database()
     
+    def close(self):
+        """Cierra la conexión con la base de datos"""
+        with self._lock:
+            self._conn.close()
+    
     def _init_database(self):
         """Inicializa la base de datos SQLite para la cola"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS webhook_queue (
-                id TEXT PRIMARY KEY,
-                webhook_url TEXT NOT NULL,
-                payload TEXT NOT NULL,
-                status TEXT DEFAULT 'pending',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_attempt TIMESTAMP,
-                attempts INTEGER DEFAULT 0,
-                error_message TEXT,
-                success_at TIMESTAMP
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_status ON webhook_queue(status);
-        ''')
-        
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_created_at ON webhook_queue(created_at);
-        ''')
-        
-        conn.commit()
-        conn.close()
+        with self._lock:
+            cursor = self._conn.cursor()
+            
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS webhook_queue (
+                    id TEXT PRIMARY KEY,
+                    webhook_url TEXT NOT NULL,
+                    payload BLOB NOT NULL,
+                    status TEXT DEFAULT 'pending',
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    last_attempt TIMESTAMP,
+                    attempts INTEGER DEFAULT 0,
+                    error_message TEXT,
+                    success_at TIMESTAMP
+                )
+            ''')
+            
+            # get_pending filtra por estado y ordena por fecha: con el índice
+            # compuesto recorre el índice en orden, sin ordenar. Sustituye al
+            # antiguo idx_status, que es prefijo suyo
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_status_created ON webhook_queue(status, created_at);
+            ''')
+            
+            cursor.execute('''
+                DROP INDEX IF EXISTS idx_status;
+            ''')
+            
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_created_at ON webhook_queue(created_at);
+            ''')
     
     def add_to_queue(self, webhook_url: str, payload: WebhookPayload) -> str:
         """
@@ -114,23 +262,46 @@ class WebhookQueue:
         Returns:
             ID del elemento en cola
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         queue_id = str(uuid.uuid4())
-        payload_json = json.dumps(asdict(payload), ensure_ascii=False)
-        
-        cursor.execute('''
-            INSERT INTO webhook_queue (id, webhook_url, payload)
-            VALUES (?, ?, ?)
-        ''', (queue_id, webhook_url, payload_json))
+        payload_blob = _compress_payload(payload.json_bytes)
         
-        conn.commit()
-        conn.close()
+        with self._lock:
+            self._conn.execute('''
+                INSERT INTO webhook_queue (id, webhook_url, payload)
+                VALUES (?, ?, ?)
+            ''', (queue_id, webhook_url, payload_blob))
         
-        logger.info(f"📥 Webhook añadido a cola: {queue_id}")
+        logger.info("📥 Webhook añadido a cola: %s", queue_id)
         return queue_id
     
+    def add_many_to_queue(self, webhook_url: str, payloads: List[WebhookPayload]) -> List[str]:
+        """
+        Añade varios webhooks a la cola en una sola transacción
+        
+        Args:
+            webhook_url: URL del webhook de N8n
+            payloads: Datos a enviar
+            
+        Returns:
+            IDs de los elementos en cola, en el mismo orden que payloads
+        """
+        rows = [(str(uuid.uuid4()), webhook_url, _compress_payload(payload.json_bytes))
+                for payload in payloads]
+        if not rows:
+            return []
+        
+        with self._lock:
+            # Un único commit para todo el lote en lugar de uno por elemento
+            self._conn.execute("BEGIN")
+            with self._conn:
+                self._conn.executemany('''
+                    INSERT INTO webhook_queue (id, webhook_url, payload)
+                    VALUES (?, ?, ?)
+                ''', rows)
+        
+        logger.info(f"📥 {len(rows)} webhooks añadidos a cola")
+        return [row[0] for row in rows]
+    
     def get_pending(self, limit: int = 10) -> List[Dict[str, Any]]:
         """
         Obtiene elementos pendientes de la cola
@@ -139,78 +310,100 @@ class WebhookQueue:
             limit: Máximo número de elementos
             
         Returns:
-            Lista de elementos pendientes
+            Lista de elementos pendientes cuyo reintento ya toca
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        with self._lock:
+            rows = self._conn.execute('''
+                SELECT * FROM webhook_queue 
+                WHERE status = 'pending' ''' + self._DUE_SQL + '''
+                ORDER BY created_at ASC 
+                LIMIT ?
+            ''', (self.MAX_RETRY_DELAY, limit)).fetchall()
         
-        cursor.execute('''
-            SELECT * FROM webhook_queue 
-            WHERE status = 'pending' 
-            ORDER BY created_at ASC 
-            LIMIT ?
-        ''', (limit,))
+        return [dict(row) for row in rows]
+    
+    def iter_pending(self, batch_size: int = 10) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Recorre todos los elementos pendientes en lotes
         
-        rows = cursor.fetchall()
-        conn.close()
+        Paginación por clave (created_at, rowid) sobre idx_status_created: cada
+        lote continúa donde acabó el anterior, sin volver a recorrer el prefijo
+        ya entregado y sin repetir los elementos que siguen pendientes tras un
+        error. Entre lotes no se retiene la conexión.
         
-        return [dict(row) for row in rows]
+        Args:
+            batch_size: Elementos por lote
+            
+        Yields:
+            Listas de elementos pendientes cuyo reintento ya toca, en orden de llegada
+        """
+        last_created, last_rowid = '', 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute('''
+                    SELECT rowid, * FROM webhook_queue 
+                    WHERE status = 'pending' AND (created_at, rowid) > (?, ?) ''' + self._DUE_SQL + '''
+                    ORDER BY created_at ASC, rowid ASC 
+                    LIMIT ?
+                ''', (last_created, last_rowid, self.MAX_RETRY_DELAY, batch_size)).fetchall()
+            
+            if not rows:
+                return
+            last_created, last_rowid = rows[-1]['created_at'], rows[-1]['rowid']
+            yield [dict(row) for row in rows]
+            if len(rows) < batch_size:
+                return
     
     def mark_success(self, queue_id: str):
         """Marca un elemento como enviado exitosamente"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            UPDATE webhook_queue 
-            SET status = 'success', success_at = CURRENT_TIMESTAMP 
-            WHERE id = ?
-        ''', (queue_id,))
-        
-        conn.commit()
-        conn.close()
+        with self._lock:
+            self._conn.execute(self._MARK_SUCCESS_SQL, (queue_id,))
     
     def mark_error(self, queue_id: str, error_message: str):
         """Marca un elemento con error y actualiza intentos"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            UPDATE webhook_queue 
-            SET attempts = attempts + 1, 
-                last_attempt = CURRENT_TIMESTAMP,
-                error_message = ?,
-                status = CASE 
-                    WHEN attempts >= 4 THEN 'failed'
-                    ELSE 'pending'
-                END
-            WHERE id = ?
-        ''', (error_message, queue_id))
-        
-        conn.commit()
-        conn.close()
+        with self._lock:
+            self._conn.execute(self._MARK_ERROR_SQL, (error_message, queue_id))
     
-    def get_stats(self) -> Dict[str, int]:
-        """Obtiene estadísticas de la cola"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def mark_bulk(self, successes: List[str], errors: List[Tuple[str, str]]):
+        """
+        Registra el resultado de un lote de envíos en una sola transacción
         
-        cursor.execute('''
-            SELECT status, COUNT(*) as count 
-            FROM webhook_queue 
-            GROUP BY status
-        ''')
+        Args:
+            successes: IDs enviados correctamente
+            errors: Pares (id, mensaje de error) de los envíos fallidos
+        """
+        if not successes and not errors:
+            return
         
-        stats = {row[0]: row[1] for row in cursor.fetchall()}
-        conn.close()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            with self._conn:
+                self._conn.executemany(self._MARK_SUCCESS_SQL,
+                                       [(queue_id,) for queue_id in successes])
+                self._conn.executemany(self._MARK_ERROR_SQL,
+                                       [(message, queue_id) for queue_id, message in errors])
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Obtiene estadísticas de la cola"""
+        with self._lock:
+            rows = self._conn.execute('''
+                SELECT status, COUNT(*) as count 
+                FROM webhook_queue 
+                GROUP BY status
+            ''').fetchall()
         
-        return stats
+        return {row[0]: row[1] for row in rows}
 
 
 class N8nWebhookClient:
     """Cliente para envío de webhooks a N8n"""
     
+    # Conexiones persistentes por host de N8n
+    POOL_SIZE = 16
+    
+    # Envíos simultáneos al vaciar la cola (no debe superar POOL_SIZE)
+    MAX_CONCURRENCY = 8
+    
     def __init__(self, webhook_url: str, api_key: Optional[str] = None):
         """
         Inicializa el cliente de webhooks
@@ -219,14 +412,19 @@ class N8nWebhookClient:
             webhook_url: URL del webhook de N8n
             api_key: Clave API opcional para autenticación
         """
+        # Validar URL antes de abrir la cola, para no dejar la base de datos
+        # abierta si la URL no sirve
+        url_match = _WEBHOOK_URL_RE.match(webhook_url)
+        if not url_match:
+            raise ValueError(f"URL de webhook inválida: {webhook_url}")
+        
         self.webhook_url = webhook_url
         self.api_key = api_key
         self.queue = WebhookQueue()
         
-        # Validar URL
-        parsed_url = urlparse(webhook_url)
-        if not parsed_url.scheme or not parsed_url.netloc:
-            raise ValueError(f"URL de webhook inválida: {webhook_url}")
+        # Conexión a la base de datos principal, abierta en el primer análisis
+        self._main_conn: Optional[sqlite3.Connection] = None
+        self._main_lock = threading.Lock()
         
         # Configurar sesión HTTP
         self.session = requests.Session()
@@ -234,12 +432,30 @@ class N8nWebhookClient:
             'Content-Type': 'application/json',
             'User-Agent': 'BOE-N8n-Integration/1.0'
         })
+        # La sesión se reutiliza en todos los envíos (incluido el vaciado de
+        # la cola), así que la conexión TCP/TLS con N8n se mantiene abierta.
+        # Los reintentos los gestiona la cola, no urllib3.
+        self.session.mount(f'{url_match.group(1).lower()}://', HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=self.POOL_SIZE,
+            max_retries=0
+        ))
         
         if api_key:
             self.session.headers.update({
                 'Authorization': f'Bearer {api_key}'
             })
     
+    def _get_main_conn(self) -> sqlite3.Connection:
+        """Conexión reutilizable a la base de datos principal (llamar con _main_lock)"""
+        if self._main_conn is None:
+            conn = sqlite3.connect(_get_main_db_path(), check_same_thread=False,
+                                   isolation_level=None)
+            for pragma in WebhookQueue.PRAGMAS:
+                conn.execute(pragma)
+            self._main_conn = conn
+        return self._main_conn
+    
     def _update_analysis_data(self, grant_id: str, analysis_data: Dict[str, Any]):
         """
         Actualiza la base de datos con datos de análisis de N8n
@@ -249,14 +465,6 @@ class N8nWebhookClient:
             analysis_data: Datos de análisis devueltos por N8n
         """
         try:
-            # Abrir conexión a la base de datos principal
-            from boe_to_n8n import load_config
-            config = load_config()
-            db_path = config.get('db_path', 'boe_processing.db')
-            
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            
             # Extraer datos de análisis
             priority = analysis_data.get('priority', '')
             priority_score = analysis_data.get('priority_score', '')
@@ -264,31 +472,23 @@ class N8nWebhookClient:
             notification_sent = analysis_data.get('notification_sent', '') == 'true'
             
             # Convertir a números si es posible
-            try:
-                priority_score = float(priority_score) if priority_score else None
-            except (ValueError, TypeError):
-                priority_score = None
-            
-            try:
-                strategic_value = float(strategic_value) if strategic_value else None
-            except (ValueError, TypeError):
-                strategic_value = None
-            
-            # Actualizar registro
-            cursor.execute('''
-                UPDATE processed_documents 
-                SET priority = ?, 
-                    priority_score = ?, 
-                    strategic_value = ?, 
-                    notification_sent = ?,
-                    analysis_timestamp = CURRENT_TIMESTAMP
-                WHERE id = ?
-            ''', (priority, priority_score, strategic_value, notification_sent, grant_id))
+            priority_score = _safe_float(priority_score)
+            strategic_value = _safe_float(strategic_value)
             
-            conn.commit()
-            conn.close()
+            # Actualizar registro (la conexión está en modo autocommit)
+            with self._main_lock:
+                self._get_main_conn().execute('''
+                    UPDATE processed_documents 
+                    SET priority = ?, 
+                        priority_score = ?, 
+                        strategic_value = ?, 
+                        notification_sent = ?,
+                        analysis_timestamp = CURRENT_TIMESTAMP
+                    WHERE id = ?
+                ''', (priority, priority_score, strategic_value, notification_sent, grant_id))
             
-            logger.info(f"📊 Análisis actualizado - {grant_id}: {priority} (score: {priority_score}, valor: {strategic_value})")
+            logger.info("📊 Análisis actualizado - %s: %s (score: %s, valor: %s)",
+                        grant_id, priority, priority_score, strategic_value)
             
         except Exception as e:
             logger.error(f"❌ Error actualizando datos de análisis para {grant_id}: {e}")
@@ -321,6 +521,47 @@ class N8nWebhookClient:
             logger.error(f"❌ Error preparando envío: {e}")
             return False
     
+    def send_grants_data(self, grants: List[Dict[str, Any]],
+                         pdf_results: Optional[List[Optional[Dict[str, Any]]]] = None) -> int:
+        """
+        Envía un lote de subvenciones a N8n
+        
+        Igual que send_grant_data para cada subvención, pero los envíos
+        fallidos se añaden a la cola de una vez al final del lote.
+        
+        Args:
+            grants: Información de las subvenciones del capturador
+            pdf_results: Resultados del procesamiento de PDF, alineados con grants
+            
+        Returns:
+            Número de subvenciones enviadas o añadidas a cola
+        """
+        if pdf_results is None:
+            pdf_results = [None] * len(grants)
+        
+        handled = 0
+        failed = []
+        for grant_info, pdf_result in zip(grants, pdf_results):
+            try:
+                payload = self._create_payload(grant_info, pdf_result)
+            except Exception as e:
+                logger.error(f"❌ Error preparando envío: {e}")
+                continue
+            
+            if self._send_immediate(payload):
+                handled += 1
+            else:
+                failed.append(payload)
+        
+        if failed:
+            try:
+                self.queue.add_many_to_queue(self.webhook_url, failed)
+                handled += len(failed)
+            except Exception as e:
+                logger.error(f"❌ Error añadiendo {len(failed)} webhooks a la cola: {e}")
+        
+        return handled
+    
     def _create_payload(self, grant_info: Dict[str, Any],
                        pdf_result: Optional[Dict[str, Any]] = None) -> WebhookPayload:
         """Crea el payload estructurado para N8n"""
@@ -329,15 +570,13 @@ class N8nWebhookClient:
         source = grant_info.get('source', 'BOE')
         section = grant_info.get('section', '')
         grant_id = grant_info.get('id', '')
-        is_bdns = source == 'BDNS' or section == 'BDNS' or grant_id.startswith('BDNS-')
+        is_bdns = 'BDNS' in (source, section) or grant_id.startswith('BDNS-')
 
-        # DEBUG: Log para ver qué está pasando
+        # Traza de depuración: con argumentos %s solo se formatea si se emite
         if is_bdns:
-            logger.info(f"🔍 DEBUG BDNS - ID: {grant_id}")
-            logger.info(f"   source={source}, section={section}")
-            logger.info(f"   bdns_code={grant_info.get('bdns_code')}")
-            logger.info(f"   budget_amount={grant_info.get('budget_amount')}")
-            logger.info(f"   application_end_date={grant_info.get('application_end_date')}")
+            logger.debug("🔍 DEBUG BDNS - id=%s source=%s section=%s bdns_code=%s budget=%s end=%s",
+                         grant_id, source, section, grant_info.get('bdns_code'),
+                         grant_info.get('budget_amount'), grant_info.get('application_end_date'))
 
         # Metadatos extraídos del PDF
         extracted_metadata = {}
@@ -345,16 +584,21 @@ class N8nWebhookClient:
         pdf_markdown = ""
 
         if is_bdns:
+            # Valores usados tanto en los metadatos como en el texto
+            budget = grant_info.get('budget_amount')
+            is_open = grant_info.get('is_open', False)
+            confidence = grant_info.get('nonprofit_confidence')
+
             # Para BDNS, crear metadatos estructurados completos
             extracted_metadata = {
                 'bdns_code': grant_info.get('bdns_code'),
                 'bdns_id': grant_info.get('bdns_id'),
-                'budget_amount': grant_info.get('budget_amount'),
+                'budget_amount': budget,
                 'application_start_date': grant_info.get('application_start_date'),
                 'application_end_date': grant_info.get('application_end_date'),
-                'is_open': grant_info.get('is_open', False),
+                'is_open': is_open,
                 'is_nonprofit': grant_info.get('is_nonprofit', True),
-                'nonprofit_confidence': grant_info.get('nonprofit_confidence'),
+                'nonprofit_confidence': confidence,
                 'beneficiary_types': grant_info.get('beneficiary_types'),
                 'sectors': grant_info.get('sectors'),
                 'regions': grant_info.get('regions'),
@@ -368,10 +612,12 @@ class N8nWebhookClient:
                 'state_aid_url': grant_info.get('state_aid_url')
             }
 
-            # Crear texto descriptivo enriquecido para BDNS
-            budget_text = f"{grant_info.get('budget_amount')} EUR" if grant_info.get('budget_amount') else "No especificado"
-            open_status = "ABIERTA" if grant_info.get('is_open') else "CERRADA"
-            confidence_text = f"{grant_info.get('nonprofit_confidence', 0) * 100:.0f}%" if grant_info.get('nonprofit_confidence') else "No disponible"
+            # Crear texto descriptivo enriquecido para BDNS (el f-string se
+            # compila una sola vez; no merece la pena str.format_map, que
+            # vuelve a analizar la plantilla en cada llamada)
+            budget_text = f"{budget} EUR" if budget else "No especificado"
+            open_status = "ABIERTA" if is_open else "CERRADA"
+            confidence_text = f"{confidence * 100:.0f}%" if confidence else "No disponible"
 
             pdf_text = f"""CONVOCATORIA BDNS - {grant_info.get('title', 'Sin título')}
 =====================================
@@ -443,8 +689,11 @@ https://www.infosubvenciones.es/bdnstrans/GE/es/convocatoria/{grant_info.get('bd
                 'purposes': extracted_info.get('purposes', []),
                 'confidence_score': len([v for v in extracted_info.values() if v]) / len(extracted_info) if extracted_info else 0
             }
-            pdf_text = pdf_result.get('text', '')[:10000]  # Limitar a 10KB
-            pdf_markdown = pdf_result.get('markdown', '')
+            pdf_text = pdf_result.get('text', '')
+            pdf_markdown = _truncate_utf8(pdf_result.get('markdown', ''))
+        
+        # Limitar el texto a 10KB, tanto el del PDF como el generado para BDNS
+        pdf_text = _truncate_utf8(pdf_text)
         
         # Si no hay texto del PDF, crear un fallback con información básica
         if not pdf_text or len(pdf_text.strip()) < 50:
@@ -524,6 +773,40 @@ Este documento puede contener información sobre:
         
         return description
     
+    def _store_analysis(self, payload: WebhookPayload, response):
+        """Guarda los datos de análisis que N8n devuelve en la respuesta (requests o httpx)"""
+        try:
+            response_data = response.json()
+            if response_data.get('success') and 'data' in response_data:
+                analysis_data = response_data['data']
+                self._update_analysis_data(payload.id, analysis_data)
+                logger.info("📊 Datos de análisis guardados para %s", payload.id)
+        except (ValueError, KeyError) as e:
+            logger.warning(f"⚠️  Error procesando respuesta de N8n: {e}")
+    
+    def _post_payload(self, payload: WebhookPayload):
+        """
+        Envía el payload a N8n y guarda el análisis que devuelva
+        
+        Raises:
+            requests.exceptions.RequestException: Error de red o estado HTTP de error
+        """
+        logger.info("🚀 Enviando webhook a N8n: %.60s...", payload.title)
+
+        # Enviamos el payload plano (N8n automáticamente lo envuelve en body),
+        # serializado desde el dataclass sin pasar por asdict(); la cabecera
+        # Content-Type ya la fija la sesión
+        response = self.session.post(
+            self.webhook_url,
+            data=payload.json_bytes,
+            timeout=30
+        )
+
+        response.raise_for_status()
+        self._store_analysis(payload, response)
+
+        logger.info("✅ Webhook enviado exitosamente: %s", payload.id)
+    
     def _send_immediate(self, payload: WebhookPayload) -> bool:
         """
         Intenta envío inmediato del webhook
@@ -535,31 +818,7 @@ Este documento puede contener información sobre:
             True si se envió exitosamente
         """
         try:
-            logger.info(f"🚀 Enviando webhook a N8n: {payload.title[:60]}...")
-
-            # Convertir payload a dict plano (N8n automáticamente lo envuelve en body)
-            # Enviamos directamente los datos sin anidamiento adicional
-            payload_dict = asdict(payload)
-
-            response = self.session.post(
-                self.webhook_url,
-                json=payload_dict,
-                timeout=30
-            )
-
-            response.raise_for_status()
-
-            # Procesar respuesta de N8n con datos de análisis
-            try:
-                response_data = response.json()
-                if response_data.get('success') and 'data' in response_data:
-                    analysis_data = response_data['data']
-                    self._update_analysis_data(payload.id, analysis_data)
-                    logger.info(f"📊 Datos de análisis guardados para {payload.id}")
-            except (ValueError, KeyError) as e:
-                logger.warning(f"⚠️  Error procesando respuesta de N8n: {e}")
-
-            logger.info(f"✅ Webhook enviado exitosamente: {payload.id}")
+            self._post_payload(payload)
             return True
 
         except requests.exceptions.RequestException as e:
@@ -569,10 +828,83 @@ Este documento puede contener información sobre:
             logger.error(f"❌ Error inesperado enviando webhook: {e}")
             return False
     
+    def _send_queued(self, item: Dict[str, Any]) -> Tuple[Optional[str], bool]:
+        """
+        Envía un elemento de la cola
+        
+        Returns:
+            Mensaje de error (None si se envió correctamente) y si N8n
+            rechazó la conexión
+        """
+        try:
+            payload = WebhookPayload.from_json(_decompress_payload(item['payload']))
+        except Exception as e:
+            error_msg = f"Error procesando item: {str(e)}"
+            logger.error(f"❌ {error_msg}")
+            return error_msg, False
+        
+        network_error = f"Error de red después de {item['attempts']} intentos"
+        try:
+            self._post_payload(payload)
+            return None, False
+        except requests.exceptions.ConnectionError as e:
+            logger.warning(f"🔌 N8n no acepta conexiones: {e}")
+            return network_error, True
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"⚠️  Error de red enviando webhook: {e}")
+        except Exception as e:
+            logger.error(f"❌ Error inesperado enviando webhook: {e}")
+        return network_error, False
+    
+    def _send_batch(self, items: List[Dict[str, Any]]
+                    ) -> Tuple[List[str], List[Tuple[str, str]], bool]:
+        """
+        Envía un lote de elementos de la cola y registra los resultados
+        
+        Returns:
+            IDs enviados, pares (id, error) de los fallidos y si N8n no era
+            alcanzable (en ese caso solo se ha intentado el primer elemento)
+        """
+        # El primer envío hace de sonda: si N8n está caído se corta aquí, sin
+        # gastar un intento de cada elemento del lote
+        first_error, unreachable = self._send_queued(items[0])
+        if unreachable:
+            logger.warning("🔌 N8n no responde: se pospone el resto de la cola")
+            return (*self._record_results(items[:1], [first_error]), True)
+        
+        results = [first_error]
+        rest = items[1:]
+        if rest:
+            # Los envíos son pura espera de red: se lanzan en paralelo sobre el
+            # pool de conexiones de la sesión en lugar de uno a uno con pausas
+            workers = min(self.MAX_CONCURRENCY, len(rest))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results.extend(error_msg for error_msg, _ in executor.map(self._send_queued, rest))
+        
+        return (*self._record_results(items, results), False)
+    
+    def _record_results(self, items: List[Dict[str, Any]],
+                        results: List[Optional[str]]) -> Tuple[List[str], List[Tuple[str, str]]]:
+        """Registra en la cola el resultado (None o mensaje de error) de cada elemento"""
+        successes = []
+        errors = []
+        for item, error_msg in zip(items, results):
+            if error_msg is None:
+                successes.append(item['id'])
+            else:
+                errors.append((item['id'], error_msg))
+        
+        # Un único commit para todos los resultados del lote
+        self.queue.mark_bulk(successes, errors)
+        return successes, errors
+    
     def process_queue(self, batch_size: int = 5) -> Dict[str, int]:
         """
         Procesa elementos pendientes en la cola
         
+        Los elementos fallidos esperan 2**intentos segundos (máximo 60) antes
+        de volver a enviarse, y el lote se aborta si N8n no acepta conexiones.
+        
         Args:
             batch_size: Número de elementos a procesar
             
@@ -589,33 +921,128 @@ Este documento puede contener información sobre:
         
         logger.info(f"🔄 Procesando {len(pending_items)} elementos de la cola...")
         
-        for item in pending_items:
-            stats['processed'] += 1
+        successes, errors, _ = self._send_batch(pending_items)
+        stats['processed'] = len(successes) + len(errors)
+        stats['success'] = len(successes)
+        stats['errors'] = len(errors)
+        
+        logger.info(f"📊 Procesamiento completado: {stats['success']} éxitos, {stats['errors']} errores")
+        return stats
+    
+    async def _send_queued_async(self, client: 'httpx.AsyncClient',
+                                 item: Dict[str, Any]) -> Tuple[Optional[str], bool]:
+        """Versión asíncrona de _send_queued"""
+        import httpx
+        
+        try:
+            payload = WebhookPayload.from_json(_decompress_payload(item['payload']))
+        except Exception as e:
+            error_msg = f"Error procesando item: {str(e)}"
+            logger.error(f"❌ {error_msg}")
+            return error_msg, False
+        
+        network_error = f"Error de red después de {item['attempts']} intentos"
+        try:
+            logger.info("🚀 Enviando webhook a N8n: %.60s...", payload.title)
+            response = await client.post(self.webhook_url, content=payload.json_bytes)
+            response.raise_for_status()
+            self._store_analysis(payload, response)
+            logger.info("✅ Webhook enviado exitosamente: %s", payload.id)
+            return None, False
+        except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+            logger.warning(f"🔌 N8n no acepta conexiones: {e}")
+            return network_error, True
+        except httpx.HTTPError as e:
+            logger.warning(f"⚠️  Error de red enviando webhook: {e}")
+        except Exception as e:
+            logger.error(f"❌ Error inesperado enviando webhook: {e}")
+        return network_error, False
+    
+    async def process_queue_async(self, batch_size: int = 50) -> Dict[str, int]:
+        """
+        Procesa elementos pendientes en la cola con un cliente asíncrono
+        
+        Todos los envíos del lote comparten una conexión (HTTP/2 multiplexado
+        si h2 está instalado) y se solapan en el bucle de eventos. El camino
+        síncrono (process_queue) sigue disponible para quien no tenga bucle.
+        Igual que allí, el primer envío hace de sonda y el lote se aborta si
+        N8n no acepta conexiones.
+        
+        Args:
+            batch_size: Número de elementos a procesar
             
-            try:
-                payload_data = json.loads(item['payload'])
-                payload = WebhookPayload(**payload_data)
-                
-                if self._send_immediate(payload):
-                    self.queue.mark_success(item['id'])
-                    stats['success'] += 1
-                else:
-                    error_msg = f"Error de red después de {item['attempts']} intentos"
-                    self.queue.mark_error(item['id'], error_msg)
-                    stats['errors'] += 1
-                
-                # Pausa entre envíos para no saturar
-                time.sleep(1)
-                
-            except Exception as e:
-                error_msg = f"Error procesando item: {str(e)}"
-                self.queue.mark_error(item['id'], error_msg)
-                stats['errors'] += 1
-                logger.error(f"❌ {error_msg}")
+        Returns:
+            Estadísticas del procesamiento
+        """
+        stats = {'processed': 0, 'success': 0, 'errors': 0}
+        
+        pending_items = self.queue.get_pending(batch_size)
+        
+        if not pending_items:
+            logger.info("📭 No hay elementos pendientes en la cola")
+            return stats
+        
+        logger.info(f"🔄 Procesando {len(pending_items)} elementos de la cola...")
+        
+        # httpx solo se importa para el camino asíncrono
+        import httpx
+        
+        # Mismas cabeceras que la sesión, salvo Connection (prohibida en HTTP/2)
+        headers = {k: v for k, v in self.session.headers.items() if k.lower() != 'connection'}
+        async with httpx.AsyncClient(
+            headers=headers,
+            timeout=30,
+            http2=importlib.util.find_spec("h2") is not None,
+            # Con HTTP/1.1 no se abren más conexiones que en el pool síncrono
+            limits=httpx.Limits(max_connections=self.POOL_SIZE,
+                                max_keepalive_connections=self.MAX_CONCURRENCY)
+        ) as client:
+            first_error, unreachable = await self._send_queued_async(client, pending_items[0])
+            results = [first_error]
+            if unreachable:
+                logger.warning("🔌 N8n no responde: se pospone el resto de la cola")
+                pending_items = pending_items[:1]
+            else:
+                rest = await asyncio.gather(
+                    *(self._send_queued_async(client, item) for item in pending_items[1:])
+                )
+                results.extend(error_msg for error_msg, _ in rest)
+        
+        successes, errors = self._record_results(pending_items, results)
+        stats['processed'] = len(pending_items)
+        stats['success'] = len(successes)
+        stats['errors'] = len(errors)
         
         logger.info(f"📊 Procesamiento completado: {stats['success']} éxitos, {stats['errors']} errores")
         return stats
     
+    def drain_queue(self, batch_size: int = 5) -> Dict[str, int]:
+        """
+        Procesa todos los elementos pendientes, lote a lote
+        
+        Cada elemento se intenta como mucho una vez por llamada; los que
+        fallan quedan pendientes para la siguiente. Si N8n no acepta
+        conexiones, el vaciado se detiene en ese lote.
+        
+        Args:
+            batch_size: Número de elementos enviados en paralelo por lote
+            
+        Returns:
+            Estadísticas del procesamiento
+        """
+        stats = {'processed': 0, 'success': 0, 'errors': 0}
+        
+        for items in self.queue.iter_pending(batch_size):
+            successes, errors, unreachable = self._send_batch(items)
+            stats['processed'] += len(successes) + len(errors)
+            stats['success'] += len(successes)
+            stats['errors'] += len(errors)
+            if unreachable:
+                break
+        
+        logger.info(f"📊 Cola vaciada: {stats['success']} éxitos, {stats['errors']} errores")
+        return stats
+    
     def get_queue_status(self) -> Dict[str, Any]:
         """Obtiene estado de la cola de webhooks"""
         stats = self.queue.get_stats()
@@ -653,6 +1080,15 @@ Este documento puede contener información sobre:
             logger.error("❌ Error enviando webhook de prueba")
         
         return success
+    
+    def close(self):
+        """Cierra las conexiones HTTP abiertas, la cola y la base de datos principal"""
+        self.session.close()
+        self.queue.close()
+        with self._main_lock:
+            if self._main_conn is not None:
+                self._main_conn.close()
+                self._main_conn = None
 
 
 def main():
@@ -5,6 +5,7 @@ import sys
 sys.path.insert(0, '.')
 
 from shared.bdns_api import BDNSAPIClient
+from shared.bdns_pdf import PDF_SOURCES, document_url, pick_pdf_url
 import json
 
 # Test with the BDNS codes we know have documents
@@ -20,12 +21,13 @@ for code in test_codes:
     detail = client.get_convocatoria_detail(code)
 
     # Check documentos
-    print(f"\n📄 DOCUMENTOS: {len(detail.documentos) if detail.documentos else 0}")
-    if detail.documentos:
-        for doc in detail.documentos:
+    documentos = detail.documentos or ()
+    print(f"\n📄 DOCUMENTOS: {len(documentos)}")
+    if documentos:
+        for doc in documentos:
             print(f"  - ID: {doc.id}")
             print(f"    Nombre: {doc.nombreFic}")
-            print(f"    URL: https://www.infosubvenciones.es/bdnstrans/api/documento/{doc.id}")
+            print(f"    URL: {document_url(doc.id)}")
 
     # Check anuncios
     print(f"\n📰 ANUNCIOS: {len(detail.anuncios) if detail.anuncios else 0}")
@@ -38,17 +40,11 @@ for code in test_codes:
 
     # Simulate our priority logic
     print(f"\n✅ RESULTADO CON NUEVA LÓGICA:")
-    pdf_url = None
-
-    if detail.documentos and len(detail.documentos) > 0:
-        pdf_url = f"https://www.infosubvenciones.es/bdnstrans/api/documento/{detail.documentos[0].id}"
-        print(f"  Priority 1 (documentos): {pdf_url}")
-    elif detail.anuncios and len(detail.anuncios) > 0 and detail.anuncios[0].url:
-        pdf_url = detail.anuncios[0].url
-        print(f"  Priority 2 (anuncios): {pdf_url}")
-    elif detail.urlBasesReguladoras:
-        pdf_url = detail.urlBasesReguladoras
-        print(f"  Priority 3 (urlBasesReguladoras): {pdf_url}")
+    pdf_url, source = pick_pdf_url(detail)
+
+    if source:
+        priority = [name for name, _ in PDF_SOURCES].index(source) + 1
+        print(f"  Priority {priority} ({source}): {pdf_url}")
     else:
         print(f"  ❌ NO PDF URL FOUND")
 
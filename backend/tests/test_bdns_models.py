@@ -0,0 +1,49 @@
+import unittest
+from datetime import date
+
+from pydantic import ValidationError
+
+from shared.bdns_models import BDNSConvocatoriaSummary, BDNSSearchParams
+
+
+class TestBDNSDates(unittest.TestCase):
+
+    SUMMARY = {
+        "id": 1,
+        "numeroConvocatoria": "123456",
+        "descripcion": "Convocatoria de prueba",
+        "nivel1": "ESTADO",
+    }
+
+    def _fecha_recepcion(self, value):
+        return BDNSConvocatoriaSummary(**self.SUMMARY, fechaRecepcion=value).fechaRecepcion
+
+    def test_iso_date(self):
+        self.assertEqual(self._fecha_recepcion("2024-03-05"), date(2024, 3, 5))
+
+    def test_iso_datetime(self):
+        self.assertEqual(self._fecha_recepcion("2024-03-05T10:30:00"), date(2024, 3, 5))
+
+    def test_spanish_format(self):
+        self.assertEqual(self._fecha_recepcion("05/03/2024"), date(2024, 3, 5))
+
+    def test_empty_and_missing(self):
+        self.assertIsNone(self._fecha_recepcion(""))
+        self.assertIsNone(BDNSConvocatoriaSummary(**self.SUMMARY).fechaRecepcion)
+
+    def test_malformed_is_logged_and_dropped(self):
+        for value in ("31/02/2024", "2024-13-01", "pendiente"):
+            with self.assertLogs("shared.bdns_models", level="WARNING"):
+                self.assertIsNone(self._fecha_recepcion(value))
+
+    def test_search_params_stay_strict(self):
+        self.assertEqual(
+            BDNSSearchParams(fechaDesde="01/02/2024").to_params_dict()["fechaDesde"],
+            "01/02/2024",
+        )
+        with self.assertRaises(ValidationError):
+            BDNSSearchParams(fechaDesde="pendiente")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,75 +4,132 @@ Update existing BDNS grants with documents and PDF URLs
 import sys
 sys.path.insert(0, '.')
 
+from sqlalchemy import select, update
 from app.database import SessionLocal
 from app.models import Grant
-from shared.bdns_api import BDNSAPIClient
-import json
-
-db = SessionLocal()
-client = BDNSAPIClient()
-
-# Get all BDNS grants that don't have bdns_documents
-grants = db.query(Grant).filter(
-    Grant.source == 'BDNS',
-    Grant.bdns_documents == None
-).limit(10).all()  # Limit to 10 for testing
-
-print(f"Found {len(grants)} BDNS grants to update\n")
-
-updated = 0
-errors = 0
-
-for grant in grants:
-    try:
-        # Extract BDNS code from ID (BDNS-XXXXX)
-        bdns_code = grant.bdns_code or grant.id.replace('BDNS-', '')
-
-        print(f"Updating {grant.id}...")
-
-        # Fetch detail from BDNS
-        detail = client.get_convocatoria_detail(bdns_code)
-
-        # Extract documents
-        bdns_documents = []
-        if detail.documentos and len(detail.documentos) > 0:
-            for doc in detail.documentos:
-                doc_info = {
-                    'id': doc.id,
-                    'nombre': doc.nombreFic,
-                    'url': f"https://www.infosubvenciones.es/bdnstrans/api/documento/{doc.id}",
-                    'descripcion': doc.descripcion if doc.descripcion else None,
-                    'size': doc.long if hasattr(doc, 'long') else None
-                }
-                bdns_documents.append(doc_info)
-
-        # Extract PDF URL with priority logic
-        pdf_url = None
-        if bdns_documents and len(bdns_documents) > 0:
-            pdf_url = bdns_documents[0]['url']
-            print(f"  ✅ Found {len(bdns_documents)} document(s), PDF: {pdf_url}")
-        elif detail.anuncios and len(detail.anuncios) > 0 and detail.anuncios[0].url:
-            pdf_url = detail.anuncios[0].url
-            print(f"  ✅ Found PDF from anuncios: {pdf_url}")
-        elif detail.urlBasesReguladoras:
-            pdf_url = detail.urlBasesReguladoras
-            print(f"  ✅ Using urlBasesReguladoras: {pdf_url}")
-
-        # Update grant
-        grant.bdns_documents = bdns_documents if bdns_documents else None
-        grant.pdf_url = pdf_url
-
-        updated += 1
-
-    except Exception as e:
-        print(f"  ❌ Error: {str(e)}")
-        errors += 1
-
-# Commit all updates
-db.commit()
-db.close()
-
-print(f"\n{'='*60}")
-print(f"✅ Updated: {updated}")
-print(f"❌ Errors: {errors}")
-print('='*60)
+from shared.bdns_api import BDNSAPIClient, user_cache_path
+from shared.bdns_pdf import document_url, pick_pdf_url
+import argparse
+import asyncio
+
+# Rows written per bulk UPDATE
+UPDATE_BATCH_SIZE = 1000
+# Progress lines buffered before each write to stdout
+PROGRESS_FLUSH_LINES = 100
+
+
+def build_update(detail):
+    """
+    Build the documents and PDF URL of a convocatoria from its detail
+
+    Returns:
+        (bdns_documents, pdf_url, message describing where the PDF came from)
+    """
+    # Extract documents ('long' is a required field of BDNSDocument)
+    bdns_documents = [
+        {
+            'id': doc.id,
+            'nombre': doc.nombreFic,
+            'url': document_url(doc.id),
+            'descripcion': doc.descripcion or None,
+            'size': doc.long
+        }
+        for doc in detail.documentos or ()
+    ]
+
+    # Extract PDF URL with priority logic
+    pdf_url, source = pick_pdf_url(detail)
+    message = None
+    if source == 'documentos':
+        message = f"  ✅ Found {len(bdns_documents)} document(s), PDF: {pdf_url}"
+    elif source == 'anuncios':
+        message = f"  ✅ Found PDF from anuncios: {pdf_url}"
+    elif source == 'urlBasesReguladoras':
+        message = f"  ✅ Using urlBasesReguladoras: {pdf_url}"
+
+    return bdns_documents, pdf_url, message
+
+
+async def main(args):
+    db = SessionLocal()
+    # Details are kept on disk (private per-user cache) so reruns skip the API
+    client = BDNSAPIClient(max_concurrency=args.concurrency,
+                           cache_path=user_cache_path('bdns_cache.sqlite3'))
+
+    # Get BDNS grants that don't have bdns_documents (only the columns needed,
+    # no ORM objects to track)
+    query = select(Grant.id, Grant.bdns_code).where(
+        Grant.source == 'BDNS',
+        Grant.bdns_documents.is_(None)
+    )
+    if args.limit:
+        query = query.limit(args.limit)
+    grants = db.execute(query).all()
+
+    print(f"Found {len(grants)} BDNS grants to update\n")
+
+    updates = []
+    errors = 0
+    progress = []
+
+    def flush_progress():
+        """Write the buffered progress lines in a single stdout call"""
+        if progress:
+            sys.stdout.write("\n".join(progress) + "\n")
+            sys.stdout.flush()
+            progress.clear()
+
+    # Extract BDNS codes from IDs (BDNS-XXXXX)
+    bdns_codes = [grant.bdns_code or grant.id.replace('BDNS-', '') for grant in grants]
+
+    # Details are fetched concurrently over one async client (at most
+    # --concurrency in flight, sharing the client's rate limiter); results
+    # come back in grant order
+    details = await client.get_convocatoria_details_async(bdns_codes, refresh=args.refresh)
+
+    for grant, detail in zip(grants, details):
+        if len(progress) >= PROGRESS_FLUSH_LINES:
+            flush_progress()
+        progress.append(f"Updating {grant.id}...")
+
+        if isinstance(detail, Exception) or detail is None:
+            error = detail if detail is not None else "No detail found"
+            progress.append(f"  ❌ Error: {str(error)}")
+            errors += 1
+            continue
+
+        bdns_documents, pdf_url, message = build_update(detail)
+        if message:
+            progress.append(message)
+
+        updates.append({
+            'id': grant.id,
+            'bdns_documents': bdns_documents if bdns_documents else None,
+            'pdf_url': pdf_url
+        })
+    flush_progress()
+
+    # Bulk UPDATE by primary key (executemany) in chunks, committed once
+    for start in range(0, len(updates), UPDATE_BATCH_SIZE):
+        db.execute(update(Grant), updates[start:start + UPDATE_BATCH_SIZE])
+    db.commit()
+    db.close()
+    client.close()
+
+    updated = len(updates)
+
+    print(f"\n{'='*60}")
+    print(f"✅ Updated: {updated}")
+    print(f"❌ Errors: {errors}")
+    print('='*60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--limit', type=int, default=10,
+                        help="Maximum grants to update (0 = all; default: 10, for testing)")
+    parser.add_argument('--concurrency', type=int, default=8,
+                        help="BDNS detail requests in flight at once (default: 8)")
+    parser.add_argument('--refresh', action='store_true',
+                        help="Ignore cached BDNS details and fetch them again")
+    asyncio.run(main(parser.parse_args()))
@@ -10,8 +10,11 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 def verify_placsp():
-    print("Creating tables...")
-    Base.metadata.create_all(bind=engine)
+    # Schema comes from the Alembic migrations; set CREATE_TABLES=1 to create
+    # it here (e.g. against a scratch database)
+    if os.getenv("CREATE_TABLES") == "1":
+        print("Creating tables...")
+        Base.metadata.create_all(bind=engine)
     
     print("Initializing DB session...")
     db = SessionLocal()
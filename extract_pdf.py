@@ -1,25 +1,79 @@
-import pdfplumber
+import fitz  # PyMuPDF: C-backed text extraction, much faster than pdfplumber
 import sys
 import os
+import hashlib
+import shutil
+from concurrent.futures import ProcessPoolExecutor
 
 # Adjust path if running from backend or root
 # Assuming running from project root
 pdf_path = os.path.abspath("docs/especificacion-sindicacion.pdf")
 output_path = os.path.abspath("docs/especificacion-sindicacion.txt")
+# Extracted text of PDFs seen before, by SHA-256 of the PDF bytes. Kept in
+# the user's own cache dir (created 0700) so nobody else can plant entries
+cache_dir = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "subvenciones", "extract_pdf"
+)
 
-print(f"Reading from: {pdf_path}")
-
-try:
-    with pdfplumber.open(pdf_path) as pdf:
-        text = ""
-        for i, page in enumerate(pdf.pages):
-            print(f"Processing page {i+1}...")
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text + "\n\n"
-    
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(text)
-    print(f"Successfully extracted {len(text)} characters to {output_path}")
-except Exception as e:
-    print(f"Error: {e}")
+
+def file_sha256(path):
+    """Hex SHA-256 of a file, read in 1 MiB blocks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def extract_pages(path, start, stop):
+    """Text of pages [start, stop), one entry per page"""
+    # Each worker opens its own document: PyMuPDF handles can't be shared
+    # across processes
+    with fitz.open(path) as doc:
+        return [doc.load_page(i).get_text("text") for i in range(start, stop)]
+
+
+def main():
+    print(f"Reading from: {pdf_path}")
+
+    try:
+        # Same PDF as a previous run: reuse its text without opening it
+        cache_path = os.path.join(cache_dir, f"{file_sha256(pdf_path)}.txt")
+        if os.path.exists(cache_path):
+            shutil.copyfile(cache_path, output_path)
+            print(f"Cached text found, copied to {output_path}")
+            return
+
+        with fitz.open(pdf_path) as doc:
+            page_count = doc.page_count
+
+        # One contiguous page range per worker, so each process opens the
+        # PDF once; results come back in page order
+        workers = max(1, min(os.cpu_count() or 1, page_count))
+        step = -(-page_count // workers) if page_count else 1
+        ranges = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+
+        # Pages are written as each range arrives instead of building the
+        # whole text in memory first
+        total = 0
+        with ProcessPoolExecutor(max_workers=workers) as executor, \
+                open(output_path, "w", encoding="utf-8", buffering=1 << 20) as f:
+            futures = [executor.submit(extract_pages, pdf_path, start, stop) for start, stop in ranges]
+            for (start, stop), future in zip(ranges, futures):
+                print(f"Processing pages {start+1}-{stop}...")
+                for page_text in future.result():
+                    if page_text:
+                        f.write(page_text)
+                        f.write("\n\n")
+                        total += len(page_text) + 2
+        print(f"Successfully extracted {total} characters to {output_path}")
+
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        shutil.copyfile(output_path, cache_path)
+    except Exception as e:
+        print(f"Error: {e}")
+
+
+if __name__ == "__main__":
+    main()